@@ -0,0 +1,261 @@
+"""
+AvailabilityService - Horários Livres em Comum
+Agendas ocupadas de vários participantes (getSchedule do Graph ou cache local)
+viram mapas de bits por minuto; a interseção dá os primeiros horários em que
+todos estão livres
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable
+
+from data import AvailabilityConfig, DefaultValues
+from tool import tool
+from Service.OutlookService import OutlookService
+from Service.TimezoneService import TimezoneService, EPOCH
+
+
+@dataclass
+class FreeSlot:
+    """Janela em que todos os participantes estão livres (RFC3339 no timezone da busca)"""
+    date_start: str
+    date_end: str
+
+
+@dataclass
+class AvailabilityService:
+    """
+    Horários livres em comum dentro de [range_start, range_end).
+
+    Cada agenda é um int do Python em que o bit i é o minuto i da janela (1 = ocupado);
+    um mês inteiro são ~44 mil bits, então juntar 50 agendas custa 50 ORs sobre
+    ~700 palavras de máquina. O livre em comum é o complemento da união dos ocupados
+    (o AND dos mapas de livres), recortado pelo expediente.
+
+    Para exigir N minutos seguidos, o mapa de livres é dobrado sobre si mesmo
+    (livre &= livre >> k, com k dobrando): em ~log2(N) passos o bit i só fica ligado
+    se os minutos i..i+N-1 estão todos livres.
+    """
+    range_start: str
+    range_end: str
+    timezone: str = None
+    config: AvailabilityConfig = None
+    # False considera o dia inteiro, todos os dias
+    working_hours: bool = True
+
+    # agenda → mapa de minutos ocupados
+    busy: dict = field(default_factory=dict, init=False, repr=False)
+    # agenda → erro do Graph ao ler a agenda (ela fica de fora da busca)
+    errors: dict = field(default_factory=dict, init=False, repr=False)
+    # Primeiro minuto da janela (minutos desde a época) e quantidade de minutos
+    _origin: int = field(default=0, init=False, repr=False)
+    _size: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.config is None:
+            self.config = AvailabilityConfig()
+        if self.timezone is None:
+            self.timezone = DefaultValues().TIMEZONE
+        TimezoneService.zone(self.timezone)
+        # Início arredondado para cima e fim para baixo: só minutos inteiros dentro da janela
+        self._origin = -int(-self._timestamp(self.range_start) // 60)
+        self._size = max(0, int(self._timestamp(self.range_end) // 60) - self._origin)
+
+    def _timestamp(self, iso_str: str) -> float:
+        """RFC3339 → epoch (sem offset, é horário de parede do timezone da busca)"""
+        dt = datetime.fromisoformat(iso_str)
+        if dt.tzinfo is None:
+            dt = tool.to_zone(dt, self.timezone)
+        return dt.timestamp()
+
+    @property
+    def full(self) -> int:
+        """Mapa com todos os minutos da janela ligados"""
+        return (1 << self._size) - 1
+
+    # ═══════════════════════════════════════════════════════════════
+    # RASTERIZAÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def rasterize(self, spans: Iterable[tuple[float, float]]) -> int:
+        """
+        Mapa de bits dos intervalos [início, fim) em epoch. Minutos parcialmente
+        ocupados contam como ocupados; intervalos encostados ou sobrepostos são
+        unidos antes, para que cada trecho contínuo custe um único OR.
+        """
+        ranges = []
+        for start, end in spans:
+            low = max(0, int(start // 60) - self._origin)
+            high = min(self._size, -int(-end // 60) - self._origin)
+            if low < high:
+                ranges.append((low, high))
+        ranges.sort()
+
+        mask = 0
+        low, high = None, None
+        for start, end in ranges:
+            if high is not None and start <= high:
+                high = max(high, end)
+                continue
+            if high is not None:
+                mask |= ((1 << (high - low)) - 1) << low
+            low, high = start, end
+        if high is not None:
+            mask |= ((1 << (high - low)) - 1) << low
+        return mask
+
+    def add_busy(self, schedule: str, intervals: Iterable[tuple[str, str]]):
+        """Marca como ocupados os intervalos (date_start, date_end) em RFC3339 da agenda"""
+        spans = ((self._timestamp(date_start), self._timestamp(date_end)) for date_start, date_end in intervals)
+        self.busy[schedule] = self.busy.get(schedule, 0) | self.rasterize(spans)
+
+    def _wall_minute(self, wall: datetime) -> int:
+        """Horário de parede (sem tz) do timezone da busca → minuto da janela"""
+        seconds = (wall - EPOCH).total_seconds() - TimezoneService.wall_offset(self.timezone, wall)
+        return int(seconds // 60) - self._origin
+
+    def working_mask(self) -> int:
+        """Minutos dentro do expediente (WORK_START–WORK_END nos WORKDAYS, no relógio local)"""
+        if not self.working_hours:
+            return self.full
+        work_start, work_end = self._clock(self.config.WORK_START), self._clock(self.config.WORK_END)
+        if work_end <= work_start:
+            raise ValueError(f"Expediente inválido: {self.config.WORK_START}–{self.config.WORK_END}")
+
+        first = self._local(0).date()
+        last = self._local(self._size).date()
+        spans = []
+        for offset in range((last - first).days + 1):
+            day = datetime.combine(first + timedelta(days=offset), datetime.min.time())
+            if day.weekday() in self.config.WORKDAYS:
+                spans.append((self._wall_minute(day + timedelta(minutes=work_start)),
+                               self._wall_minute(day + timedelta(minutes=work_end))))
+        mask = 0
+        for low, high in spans:
+            low, high = max(0, low), min(self._size, high)
+            if low < high:
+                mask |= ((1 << (high - low)) - 1) << low
+        return mask
+
+    def step_mask(self, step_minutes: int) -> int:
+        """
+        Minutos em que um horário pode começar: múltiplos do passo no relógio local.
+        O alinhamento acompanha as mudanças de offset (horário de verão) dentro da janela.
+        """
+        mask = 0
+        for low, high, offset in self._offset_spans():
+            pattern, width = 1 << ((-(self._origin + offset // 60)) % step_minutes), step_minutes
+            while width < high:
+                pattern |= pattern << width
+                width *= 2
+            mask |= pattern & ((1 << high) - (1 << low))
+        return mask
+
+    def _offset_spans(self) -> list[tuple[int, int, int]]:
+        """Trechos (início, fim, offset em segundos) da janela com offset constante"""
+        offset = TimezoneService.utc_offset(self.timezone, self._origin * 60)
+        spans, low = [], 0
+        for year in range(self._local(0).year, self._local(self._size).year + 1):
+            utc_starts, _, offsets = TimezoneService.transitions(self.timezone, year)
+            for start, new_offset in zip(utc_starts, offsets):
+                minute = start // 60 - self._origin
+                if low < minute < self._size and new_offset != offset:
+                    spans.append((low, minute, offset))
+                    low, offset = minute, new_offset
+        spans.append((low, self._size, offset))
+        return spans
+
+    @staticmethod
+    def _clock(text: str) -> int:
+        """"09:30" → 570 (minutos desde a meia-noite)"""
+        hours, _, minutes = text.partition(":")
+        return int(hours) * 60 + int(minutes or 0)
+
+    def _local(self, minute: int) -> datetime:
+        return tool.to_zone(datetime.fromtimestamp((self._origin + minute) * 60, dt_timezone.utc), self.timezone)
+
+    # ═══════════════════════════════════════════════════════════════
+    # BUSCA
+    # ═══════════════════════════════════════════════════════════════
+
+    def find(self, duration_minutes: int = None, count: int = None, step_minutes: int = None) -> list[FreeSlot]:
+        """
+        Os primeiros `count` horários sem sobreposição em que todas as agendas
+        estão livres por `duration_minutes` seguidos.
+
+        Raises:
+            ValueError: Duração ou passo inválidos
+        """
+        duration = int(duration_minutes or DefaultValues().EVENT_DURATION_HOURS * 60)
+        count = self.config.SLOTS if count is None else count
+        step = int(step_minutes or self.config.STEP_MINUTES)
+        if duration <= 0 or step <= 0:
+            raise ValueError(f"Duração/passo inválidos: {duration}/{step} min")
+
+        busy = 0
+        for mask in self.busy.values():
+            busy |= mask
+        # bit i ligado ⇔ minutos i..i+length-1 livres para todos
+        run, length = self.full & ~busy & self.working_mask(), 1
+        while length < duration and run:
+            shift = min(length, duration - length)
+            run &= run >> shift
+            length += shift
+
+        candidates = run & self.step_mask(step)
+        slots = []
+        while candidates and len(slots) < count:
+            first = (candidates & -candidates).bit_length() - 1
+            slots.append(FreeSlot(date_start=tool.to_rfc3339(self._local(first)),
+                                  date_end=tool.to_rfc3339(self._local(first + duration))))
+            # O próximo horário só começa depois que este termina
+            candidates = candidates >> (first + duration) << (first + duration)
+        return slots
+
+    # ═══════════════════════════════════════════════════════════════
+    # FONTES
+    # ═══════════════════════════════════════════════════════════════
+
+    def from_store(self, store, schedule: str = "me") -> int:
+        """
+        Ocupa `schedule` com os eventos do cache local (EventStore) na janela.
+
+        Returns:
+            Quantidade de eventos lidos
+        """
+        events = store.list_events(self.range_start, self.range_end)
+        self.add_busy(schedule, ((event.date_start, event.date_end) for event in events))
+        return len(events)
+
+    def build_command(self, attendees: list[str]) -> list[str]:
+        cmd = [OutlookService.core_path(), "schedule", "--start", self.range_start, "--end", self.range_end]
+        for attendee in attendees:
+            cmd.extend(["--attendee", attendee])
+        return cmd
+
+    def from_graph(self, attendees: list[str]) -> str:
+        """
+        Lê a agenda dos participantes no Graph (`core schedule`, NDJSON no stdout).
+        Agendas que o Graph não conseguiu ler ficam em `errors` e fora da busca.
+
+        Returns:
+            None em caso de sucesso, ou a mensagem de erro do core
+        """
+        intervals = {attendee: [] for attendee in attendees}
+        with OutlookService.stream_core(self.build_command(attendees), default="schedule") as stream:
+            for item in stream:
+                schedule = item.get("schedule", "")
+                if "error" in item:
+                    self.errors[schedule] = item["error"]
+                elif item.get("date_start") and item.get("date_end"):
+                    intervals.setdefault(schedule, []).append((item["date_start"], item["date_end"]))
+        if stream.error:
+            return stream.error
+
+        for schedule, spans in intervals.items():
+            if schedule not in self.errors:
+                self.add_busy(schedule, spans)
+        return None
@@ -0,0 +1,230 @@
+"""
+ConflictIndex - Detecção de Duplicatas e Sobreposições
+Índice de intervalos (arrays ordenados + bisect) sobre os eventos já conhecidos
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+
+from Service.Event import Event
+
+
+@dataclass
+class Conflict:
+    """
+    Evento conhecido que conflita com o candidato.
+
+    Guarda só a linha no índice: assunto e datas são lidos (e um Event formata as
+    datas) quando usados, e numa importação a maioria dos conflitos só é contada.
+    """
+    kind: str               # "duplicate" (mesmo assunto, início e término) ou "overlap"
+    row: int
+    events: list = field(repr=False)
+
+    @property
+    def event(self):
+        return self.events[self.row]
+
+    @property
+    def subject(self) -> str:
+        return self.event.subject
+
+    @property
+    def date_start(self) -> str:
+        return self.event.date_start
+
+    @property
+    def date_end(self) -> str:
+        return self.event.date_end
+
+
+@dataclass
+class ConflictIndex:
+    """
+    Índice de intervalos dos eventos conhecidos.
+
+    Os intervalos ficam em arrays ordenados pelo início, com o maior término
+    acumulado (prefix max) ao lado. Como esse máximo nunca diminui, duas buscas
+    binárias acham um evento sobreposto: `k` = eventos que começam antes do fim
+    do candidato, `j` = primeiro cujo máximo acumulado passa do início dele;
+    se j < k, o evento j sobrepõe. Duplicatas exatas saem de um dicionário.
+
+    Os eventos conhecidos ficam numa lista (a linha é a posição); os arrays
+    ordenados, em array('d')/array('l'), guardam os epochs e o número da linha.
+
+    Eventos adicionados depois da construção ficam numa lista pendente (busca
+    linear) até passar de REBUILD_AT, quando os pendentes são intercalados nos
+    arrays. Só a parte a partir do menor início pendente é refeita: eventos que
+    chegam em ordem (ex: o cache lido mês a mês) apenas estendem os arrays.
+
+    Com `store` (EventStore), os eventos do cache são carregados sob demanda,
+    um mês por vez, conforme os candidatos chegam.
+
+    Séries recorrentes são expandidas preguiçosamente até SERIES_LIMIT ocorrências.
+    """
+    store: object = None
+
+    REBUILD_AT = 256
+    SERIES_LIMIT = 400
+
+    events: list = field(default_factory=list, init=False, repr=False)
+    _starts: array = field(default_factory=lambda: array("d"), init=False, repr=False)
+    _ends: array = field(default_factory=lambda: array("d"), init=False, repr=False)
+    _max_ends: array = field(default_factory=lambda: array("d"), init=False, repr=False)
+    _rows: array = field(default_factory=lambda: array("l"), init=False, repr=False)
+    # (início, término, linha) ainda fora dos arrays ordenados
+    _pending: list = field(default_factory=list, init=False, repr=False)
+    _keys: dict = field(default_factory=dict, init=False, repr=False)
+    _loaded_ids: set = field(default_factory=set, init=False, repr=False)
+    _loaded_months: set = field(default_factory=set, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    @staticmethod
+    def _epoch(iso_str: str) -> float:
+        dt = datetime.fromisoformat(iso_str)
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        return dt.timestamp()
+
+    @staticmethod
+    def _key(subject: str, start_ts: float, end_ts: float) -> tuple:
+        return (subject or "").strip().casefold(), start_ts, end_ts
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSTRUÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def add(self, event):
+        """Adiciona um evento (qualquer objeto com subject/date_start/date_end)"""
+        self._append(event)
+        if len(self._pending) > self.REBUILD_AT:
+            self._rebuild()
+
+    def add_many(self, events):
+        """Adiciona vários eventos com uma única reconstrução dos arrays"""
+        for event in events:
+            self._append(event)
+        if len(self._pending) > self.REBUILD_AT:
+            self._rebuild()
+
+    def add_series(self, event, recurrence):
+        """Adiciona as primeiras SERIES_LIMIT ocorrências de uma série"""
+        self.add_many(islice(self._occurrences(event, recurrence), self.SERIES_LIMIT))
+
+    @staticmethod
+    def _occurrences(event, recurrence):
+        for start, end in recurrence.occurrences(event.date_start, event.date_end, event.timezone):
+            yield Event(subject=event.subject, start=start, end=end, timezone=event.timezone)
+
+    @staticmethod
+    def _span(event) -> tuple[float, float]:
+        """(início, término) em epoch; um Event já traz as datas convertidas"""
+        if isinstance(event, Event):
+            return event.start.timestamp(), event.end.timestamp()
+        return ConflictIndex._epoch(event.date_start), ConflictIndex._epoch(event.date_end)
+
+    def _append(self, event):
+        # _span sem a chamada extra: é o laço da construção
+        if isinstance(event, Event):
+            start_ts, end_ts = event.start.timestamp(), event.end.timestamp()
+        else:
+            start_ts, end_ts = self._epoch(event.date_start), self._epoch(event.date_end)
+        row = len(self.events)
+        self.events.append(event)
+        self._keys.setdefault(self._key(event.subject, start_ts, end_ts), row)
+        self._pending.append((start_ts, end_ts, row))
+
+    def _rebuild(self):
+        """Intercala os pendentes (ordenados) nos arrays a partir da posição do menor deles"""
+        pending, self._pending = self._pending, []
+        pending.sort(key=itemgetter(0))
+        # Tudo antes de `cut` começa antes do primeiro pendente e fica como está
+        cut = bisect_right(self._starts, pending[0][0])
+        if cut < len(self._starts):
+            # Duas sequências já ordenadas: o timsort (estável) as intercala em tempo linear
+            merged = list(zip(self._starts[cut:], self._ends[cut:], self._rows[cut:]))
+            merged += pending
+            merged.sort(key=itemgetter(0))
+            del self._starts[cut:], self._ends[cut:], self._rows[cut:], self._max_ends[cut:]
+        else:
+            merged = pending
+        self._starts.fromlist([start for start, _, _ in merged])
+        self._ends.fromlist([end for _, end, _ in merged])
+        self._rows.fromlist([row for _, _, row in merged])
+        max_ends, running = [], self._max_ends[-1] if cut else float("-inf")
+        for _, end, _ in merged:
+            if end > running:
+                running = end
+            max_ends.append(running)
+        self._max_ends.fromlist(max_ends)
+
+    def _load_from_store(self, start_ts: float, end_ts: float):
+        """Carrega do cache os meses cobertos pelo intervalo que ainda não foram lidos"""
+        start, end = datetime.fromtimestamp(start_ts).astimezone(), datetime.fromtimestamp(end_ts).astimezone()
+        month = start.year * 12 + start.month - 1
+        while month <= end.year * 12 + end.month - 1:
+            if month not in self._loaded_months:
+                self._loaded_months.add(month)
+                first = start.replace(year=month // 12, month=month % 12 + 1, day=1,
+                                      hour=0, minute=0, second=0, microsecond=0)
+                following = first.replace(year=(month + 1) // 12, month=(month + 1) % 12 + 1)
+                events = [event for event in self.store.list_events(first.isoformat(), following.isoformat())
+                          if event.id not in self._loaded_ids]
+                self._loaded_ids.update(event.id for event in events)
+                self.add_many(events)
+            month += 1
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSULTA
+    # ═══════════════════════════════════════════════════════════════
+
+    def check(self, event) -> Conflict:
+        """
+        Procura conflito para o candidato.
+
+        Returns:
+            Conflict de tipo "duplicate" (tem prioridade) ou "overlap", ou None
+        """
+        start_ts, end_ts = self._span(event)
+        if self.store is not None:
+            self._load_from_store(start_ts, end_ts)
+
+        duplicate = self._keys.get(self._key(event.subject, start_ts, end_ts))
+        if duplicate is not None:
+            return self._conflict("duplicate", duplicate)
+
+        k = bisect_left(self._starts, end_ts)
+        j = bisect_right(self._max_ends, start_ts, 0, k)
+        if j < k:
+            return self._conflict("overlap", self._rows[j])
+        for other_start, other_end, other in self._pending:
+            if other_start < end_ts and other_end > start_ts:
+                return self._conflict("overlap", other)
+        return None
+
+    def check_series(self, event, recurrence) -> Conflict:
+        """
+        Procura conflito nas primeiras SERIES_LIMIT ocorrências de uma série.
+
+        A série só é "duplicate" se a primeira ocorrência for duplicata (a mesma
+        série enviada de novo); em qualquer outra ocorrência o conflito vira "overlap".
+        """
+        for number, occurrence in enumerate(islice(self._occurrences(event, recurrence), self.SERIES_LIMIT)):
+            conflict = self.check(occurrence)
+            if conflict is not None:
+                if number > 0:
+                    conflict.kind = "overlap"
+                return conflict
+        return None
+
+    def _conflict(self, kind: str, row: int) -> Conflict:
+        return Conflict(kind, row, self.events)
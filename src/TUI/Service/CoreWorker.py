@@ -0,0 +1,190 @@
+"""
+CoreWorker - Processo Persistente do Core
+Mantém um `core serve` vivo e conversa com ele via JSON por linha (stdin/stdout)
+"""
+from dataclasses import dataclass, field
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import itertools
+import subprocess
+import threading
+import json
+
+
+class CoreWorkerError(Exception):
+    """Erro retornado pelo worker ou falha de comunicação com o processo"""
+
+    def __init__(self, message: str, details: dict = None):
+        super().__init__(message)
+        # Detalhes estruturados enviados pelo core (ex: status, attempts, permanent)
+        self.details = details or {}
+
+
+@dataclass
+class CoreWorker:
+    """
+    Cliente do worker persistente do core.
+
+    Cada requisição recebe um id e fica pendente até a resposta com o mesmo id
+    chegar, então várias requisições podem estar em andamento ao mesmo tempo.
+    O processo é iniciado na primeira requisição e reiniciado se tiver morrido.
+    """
+    core_path: str = ""
+    core_dir: str = ""
+    timeout: float = 30.0
+    # Ambiente do processo (ex: OUTLOOK_TOKEN já resolvido pelo TokenService)
+    env: dict = None
+    # Recebe cada linha do stderr do worker (ex: spans do OUTLOOK_TRACE); sem ele o stderr é descartado
+    on_stderr: object = None
+
+    restarts: int = field(default=0, init=False)
+    _process: subprocess.Popen = field(default=None, init=False, repr=False)
+    _pending: dict = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _ids: itertools.count = field(default_factory=itertools.count, init=False, repr=False)
+    _started_once: bool = field(default=False, init=False, repr=False)
+
+    # ═══════════════════════════════════════════════════════════════
+    # CICLO DE VIDA
+    # ═══════════════════════════════════════════════════════════════
+
+    def is_alive(self) -> bool:
+        """Verifica se o processo do worker está rodando"""
+        return self._process is not None and self._process.poll() is None
+
+    def ensure_running(self):
+        """Inicia o worker se ainda não foi iniciado ou se o processo morreu"""
+        with self._lock:
+            if self.is_alive():
+                return
+            if self._started_once:
+                self.restarts += 1
+            self._start_locked()
+
+    def _start_locked(self):
+        # Cada processo tem seu próprio mapa de pendentes, falhado inteiro quando ele sai
+        self._pending = {}
+        self._process = subprocess.Popen(
+            [self.core_path, "serve"],
+            cwd=self.core_dir,
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if self.on_stderr else subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1
+        )
+        self._started_once = True
+        reader = threading.Thread(target=self._read_loop, args=(self._process, self._pending), daemon=True)
+        reader.start()
+        if self.on_stderr:
+            threading.Thread(target=self._stderr_loop, args=(self._process,), daemon=True).start()
+
+    def stop(self):
+        """Encerra o worker (fecha o stdin e espera o processo sair)"""
+        with self._lock:
+            process = self._process
+            self._process = None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+    def restart(self):
+        """Força o reinício do worker"""
+        self.stop()
+        self.ensure_running()
+
+    def health_check(self, timeout: float = 2.0) -> bool:
+        """Faz um ping; reinicia o worker se ele não responder"""
+        try:
+            return self.request("ping", timeout=timeout) == "pong"
+        except (CoreWorkerError, TimeoutError):
+            self.restart()
+            return False
+
+    # ═══════════════════════════════════════════════════════════════
+    # REQUISIÇÕES
+    # ═══════════════════════════════════════════════════════════════
+
+    def submit(self, method: str, params: dict = None, token: str = None) -> Future:
+        """
+        Envia uma requisição sem bloquear; o Future recebe o `result` da resposta.
+
+        `token` substitui, só nesta requisição, o token com que o worker foi iniciado.
+        """
+        self.ensure_running()
+        future = Future()
+        request_id = next(self._ids)
+        # Id usado pelo core nos spans e na resposta desta requisição
+        future.request_id = request_id
+        request = {"id": request_id, "method": method, "params": params or {}}
+        if token:
+            request["token"] = token
+        line = json.dumps(request, ensure_ascii=False)
+
+        with self._lock:
+            process = self._process
+            self._pending[request_id] = future
+            try:
+                process.stdin.write(line + "\n")
+                process.stdin.flush()
+            except (OSError, ValueError, AttributeError) as e:
+                self._pending.pop(request_id, None)
+                future.set_exception(CoreWorkerError(f"Falha ao enviar para o worker: {e}"))
+        return future
+
+    def request(self, method: str, params: dict = None, timeout: float = None, token: str = None):
+        """Envia uma requisição e espera a resposta"""
+        return self.wait(self.submit(method, params, token), timeout, method)
+
+    def wait(self, future: Future, timeout: float = None, method: str = "requisição"):
+        """
+        Espera a resposta de uma requisição feita com `submit`.
+
+        No tempo limite a requisição sai dos pendentes: uma resposta atrasada é descartada
+        pelo leitor em vez de resolver um Future que ninguém mais espera.
+        """
+        try:
+            return future.result(timeout=timeout if timeout is not None else self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(future.request_id, None)
+            # A resposta pode ter chegado entre o tempo limite e a remoção
+            if future.done():
+                return future.result()
+            raise TimeoutError(f"Worker não respondeu a '{method}' em {timeout or self.timeout}s")
+
+    def _read_loop(self, process: subprocess.Popen, pending: dict):
+        """Lê respostas do stdout e resolve os Futures pendentes pelo id"""
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                future = pending.pop(response.get("id"), None)
+            if future is None:
+                continue
+            if response.get("ok"):
+                future.set_result(response.get("result"))
+            else:
+                future.set_exception(CoreWorkerError(response.get("error"), response.get("details")))
+
+        # stdout fechado: o processo saiu, falha tudo que ainda estava pendente
+        with self._lock:
+            orphans = list(pending.values())
+            pending.clear()
+        for future in orphans:
+            if not future.done():
+                future.set_exception(CoreWorkerError(f"Worker encerrou (exit {process.wait()})"))
+
+    def _stderr_loop(self, process: subprocess.Popen):
+        for line in process.stderr:
+            try:
+                self.on_stderr(line.rstrip("\n"))
+            except Exception:
+                continue
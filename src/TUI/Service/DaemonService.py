@@ -0,0 +1,234 @@
+"""
+DaemonService - Criação de Eventos como Serviço
+Eventos recebidos por HTTP vão para a fila persistente e são enviados pelo backend configurado,
+com métricas Prometheus em /metrics
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import signal
+import threading
+import time
+
+from data import DaemonConfig
+from Service.OutlookService import OutlookService, EventResult
+from Service.JobQueue import Job, JobQueue, JobRunner, FAILED, PENDING, RUNNING
+from Service.Metrics import Registry
+
+
+EVENT_FIELDS = {item.name for item in fields(OutlookService)}
+
+
+@dataclass
+class DaemonService:
+    """
+    Processo de longa duração que recebe eventos por HTTP local e os cria no Graph.
+
+    POST /events  evento JSON (campos do OutlookService) ou lista; 202 quando gravado na
+                  fila, 503 com Retry-After quando ela está cheia
+    GET /metrics  contadores e histogramas no formato de texto do Prometheus
+    GET /health   200 enquanto o backend de envio responde (ex: ping no worker do core)
+
+    Os eventos aceitos ficam na JobQueue (SQLite) e um JobRunner com `concurrency`
+    threads os envia pelo backend de envio (BackendConfig). Ao encerrar, os envios em
+    andamento terminam e o que ainda estiver na fila é enviado na próxima execução.
+    """
+    host: str = None
+    port: int = None
+    concurrency: int = None
+    queue_size: int = None
+    timeout: float = None
+    jobs: JobQueue = None
+
+    def __post_init__(self):
+        config = DaemonConfig()
+        self.host = self.host or config.HOST
+        self.port = config.PORT if self.port is None else self.port
+        self.concurrency = max(1, self.concurrency or config.CONCURRENCY)
+        self.queue_size = self.queue_size or config.QUEUE_SIZE
+        self.timeout = self.timeout or config.TIMEOUT_SECONDS
+
+        self.jobs = self.jobs or OutlookService.jobs()
+        self.runner = JobRunner(self.jobs, workers=self.concurrency, lease_seconds=self.timeout,
+                                on_result=self.record)
+        self.server = None
+        self._stopping = threading.Event()
+        # Aceite de eventos serializado para respeitar o limite da fila
+        self._accept_lock = threading.Lock()
+
+        self.metrics = Registry()
+        self.submitted = self.metrics.counter("outlookfusion_events_submitted_total",
+                                              "Eventos aceitos na fila")
+        self.rejected = self.metrics.counter("outlookfusion_events_rejected_total",
+                                             "Eventos recusados antes da fila", ("reason",))
+        self.succeeded = self.metrics.counter("outlookfusion_events_succeeded_total",
+                                              "Eventos criados no Graph")
+        self.failed = self.metrics.counter("outlookfusion_events_failed_total",
+                                           "Eventos que falharam de vez, por status HTTP final", ("status",))
+        self.requeued = self.metrics.counter("outlookfusion_events_requeued_total",
+                                             "Tentativas com falha transitória devolvidas à fila")
+        self.retries = self.metrics.counter("outlookfusion_retries_total",
+                                            "Tentativas extras feitas pelo core (429/5xx/timeout)")
+        self.throttled = self.metrics.counter("outlookfusion_throttled_total",
+                                              "Respostas 429 do Graph recebidas pelo core")
+        self.restarts = self.metrics.counter("outlookfusion_core_restarts_total",
+                                             "Reinícios do processo worker do core",
+                                             collect=lambda: OutlookService._worker.restarts if OutlookService._worker else 0)
+        self.metrics.gauge("outlookfusion_queue_depth", "Eventos aguardando envio",
+                           collect=lambda: self.jobs.counts()[PENDING])
+        self.metrics.gauge("outlookfusion_in_flight", "Eventos sendo enviados agora",
+                           collect=lambda: self.jobs.counts()[RUNNING])
+        self.queue_wait = self.metrics.histogram("outlookfusion_queue_wait_seconds",
+                                                 "Tempo entre o aceite e a primeira tentativa de envio")
+        self.latency = self.metrics.histogram("outlookfusion_submit_latency_seconds",
+                                              "Tempo de envio de um evento pelo core (retries incluídos)")
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1] if self.server else self.port}"
+
+    # ═══════════════════════════════════════════════════════════════
+    # CICLO DE VIDA
+    # ═══════════════════════════════════════════════════════════════
+
+    def start(self):
+        """Sobe o servidor HTTP, o backend de envio (ex: worker do core) e as threads de envio (sem bloquear)"""
+        # Porta ocupada falha aqui, antes de iniciar qualquer processo ou thread
+        self.server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self.server.daemon_threads = True
+        self.server.service = self
+        OutlookService.backend().start()
+        self._stopping.clear()
+        self.runner.start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def serve_forever(self, on_ready=None):
+        """Roda até Ctrl+C ou SIGTERM e então encerra"""
+        self.start()
+        if on_ready:
+            on_ready()
+        signal.signal(signal.SIGTERM, lambda *_: self._stopping.set())
+        try:
+            while not self._stopping.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+
+    def stop(self, timeout: float = None):
+        """Para de aceitar eventos e espera os envios em andamento (o resto fica na fila)"""
+        self._stopping.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.runner.stop(timeout)
+        OutlookService.backend().close()
+
+    # ═══════════════════════════════════════════════════════════════
+    # FILA
+    # ═══════════════════════════════════════════════════════════════
+
+    def submit(self, events: list[OutlookService]) -> int:
+        """
+        Grava os eventos na fila, até o limite de `queue_size` aguardando envio.
+
+        Returns:
+            Quantos eventos (do início da lista) foram aceitos
+        """
+        reason = "stopping" if self._stopping.is_set() else None
+        accepted = 0
+        if reason is None:
+            with self._accept_lock:
+                counts = self.jobs.counts()
+                room = max(0, self.queue_size - counts[PENDING] - counts[RUNNING])
+                accepted = len(self.jobs.enqueue_many(events[:room])) if room else 0
+            reason = "queue_full"
+        self.submitted.inc(accepted)
+        if accepted < len(events):
+            self.rejected.inc(len(events) - accepted, reason=reason)
+        return accepted
+
+    def record(self, job: Job, result: EventResult, seconds: float):
+        """Atualiza as métricas depois de cada tentativa do JobRunner"""
+        self.latency.observe(seconds)
+        if job.attempts == 1:
+            self.queue_wait.observe(max(0.0, time.time() - seconds - job.created_at))
+        if result.ok:
+            self.succeeded.inc()
+        elif job.state == FAILED:
+            self.failed.inc(status=str(result.status or "none"))
+        elif job.state == PENDING:
+            self.requeued.inc()
+        if result.attempts > 1:
+            self.retries.inc(result.attempts - 1)
+        if result.throttled:
+            self.throttled.inc(result.throttled)
+
+    @staticmethod
+    def parse_events(body: bytes) -> list[OutlookService]:
+        """
+        Eventos do corpo do POST /events.
+
+        Raises:
+            ValueError: JSON inválido ou campo desconhecido
+        """
+        payload = json.loads(body or b"null")
+        items = payload if isinstance(payload, list) else [payload]
+        events = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError("Cada evento deve ser um objeto JSON")
+            unknown = set(item) - EVENT_FIELDS
+            if unknown:
+                raise ValueError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+            events.append(OutlookService(**item))
+        return events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Rotas HTTP do daemon (o DaemonService fica em self.server.service)"""
+
+    def do_GET(self):
+        service: DaemonService = self.server.service
+        if self.path == "/metrics":
+            self._reply(200, service.metrics.render(), "text/plain; version=0.0.4; charset=utf-8")
+        elif self.path == "/health":
+            alive = OutlookService.backend().healthy()
+            self._reply(200 if alive else 503, json.dumps({"ok": alive}))
+        else:
+            self._reply(404, json.dumps({"error": "not found"}))
+
+    def do_POST(self):
+        service: DaemonService = self.server.service
+        if self.path != "/events":
+            self._reply(404, json.dumps({"error": "not found"}))
+            return
+        try:
+            events = DaemonService.parse_events(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except (ValueError, TypeError) as e:
+            service.rejected.inc(reason="invalid")
+            self._reply(400, json.dumps({"error": str(e)}))
+            return
+
+        accepted = service.submit(events)
+        if accepted < len(events):
+            self._reply(503, json.dumps({"accepted": accepted, "error": "fila cheia"}), retry_after=1)
+        else:
+            self._reply(202, json.dumps({"accepted": accepted}))
+
+    def _reply(self, status: int, body: str, content_type: str = "application/json", retry_after: int = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
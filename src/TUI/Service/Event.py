@@ -0,0 +1,259 @@
+"""
+Event - Modelo Compacto de Eventos
+Registro com __slots__ e datas já convertidas (Event) e armazenamento em colunas
+para grandes volumes (EventBatch), separados do envio feito pelo OutlookService
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import compress
+from operator import and_, le
+from typing import Iterable, Iterator
+
+from tool import tool
+from Service.OutlookService import OutlookService
+
+
+class Event:
+    """
+    Dados de um evento, sem o caminho de envio.
+
+    `start`/`end` são datetimes com offset, convertidos uma única vez na criação:
+    tool.format_friendly, ensure_end_after_start e validate_date_range aceitam esses
+    datetimes direto. Texto sem offset é horário de parede do `timezone` do evento.
+    __slots__ tira o __dict__ de cada instância.
+
+    Raises:
+        ValueError: Data fora do formato ISO
+    """
+    __slots__ = ("subject", "descr", "content", "start", "end", "timezone", "location",
+                 "recurrence", "exceptions", "transaction_id")
+
+    def __init__(self, subject: str = "", start=None, end=None, descr: str = "", content: str = "",
+                 timezone: str = "America/Sao_Paulo", location: str = "Online", recurrence: dict = None,
+                 exceptions: list = None, transaction_id: str = None):
+        self.subject = subject
+        self.descr = descr
+        self.content = content
+        self.timezone = timezone
+        self.location = location
+        self.start = Event.parse(start, timezone)
+        self.end = Event.parse(end, timezone)
+        self.recurrence = recurrence
+        self.exceptions = exceptions
+        self.transaction_id = transaction_id
+
+    @staticmethod
+    def parse(value, timezone: str = None) -> datetime:
+        """RFC3339 ou datetime → datetime com offset (sem offset = horário de parede de `timezone`)"""
+        if value is None or value == "":
+            return None
+        dt = tool.as_datetime(value)
+        return dt if dt.tzinfo is not None else tool.to_zone(dt, timezone or None)
+
+    @property
+    def date_start(self) -> str:
+        return tool.to_rfc3339(self.start) if self.start is not None else ""
+
+    @property
+    def date_end(self) -> str:
+        return tool.to_rfc3339(self.end) if self.end is not None else ""
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in Event.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Event(subject={self.subject!r}, date_start={self.date_start!r}, date_end={self.date_end!r})"
+
+    @staticmethod
+    def from_service(event) -> "Event":
+        """Converte qualquer objeto com os campos do OutlookService (ex: StoredEvent)"""
+        if isinstance(event, Event):
+            return event
+        return Event(subject=event.subject, start=event.date_start, end=event.date_end,
+                     descr=getattr(event, "descr", "") or "", content=getattr(event, "content", "") or "",
+                     timezone=getattr(event, "timezone", "") or "", location=getattr(event, "location", "") or "",
+                     recurrence=getattr(event, "recurrence", None), exceptions=getattr(event, "exceptions", None),
+                     transaction_id=getattr(event, "transaction_id", None))
+
+    @staticmethod
+    def recurring(recurrence, **fields) -> "Event":
+        """Evento único com uma série (Recurrence), como OutlookService.recurring"""
+        event = Event(**fields)
+        event.recurrence = recurrence.to_graph(event.date_start, event.timezone)
+        event.exceptions = list(recurrence.exceptions) or None
+        return event
+
+    def to_service(self) -> OutlookService:
+        """OutlookService pronto para envio (backends e fila trabalham com ele)"""
+        return OutlookService(subject=self.subject, descr=self.descr, content=self.content,
+                              date_start=self.date_start, date_end=self.date_end, timezone=self.timezone,
+                              location=self.location, recurrence=self.recurrence, exceptions=self.exceptions,
+                              transaction_id=self.transaction_id)
+
+    def to_payload(self) -> dict:
+        """Mesmo formato de OutlookService.to_payload (linha NDJSON do `core create-batch`)"""
+        return self.to_service().to_payload()
+
+
+class EventBatch:
+    """
+    Muitos eventos guardados em colunas, para importações e índices com milhões de linhas.
+
+    Início/término ficam em array('d') como epoch (8 bytes cada, sem objeto por data)
+    com o offset original ao lado em array('i'); conteúdo, localização e timezone se
+    repetem muito e viram índices numa tabela de strings internadas. Recorrência,
+    exceções e transactionId são raros e ficam num dicionário esparso por linha.
+
+    As consultas por intervalo (`overlapping`, `invalid_ranges`) percorrem só os
+    arrays; um Event só é montado quando uma linha é lida (`batch[i]`).
+    """
+
+    def __init__(self, events: Iterable = ()):
+        self.subjects: list[str] = []
+        self.descrs: list[str] = []
+        self.starts = array("d")
+        self.ends = array("d")
+        # Offset UTC (segundos) de cada data, para devolver o RFC3339 original
+        self.start_offsets = array("i")
+        self.end_offsets = array("i")
+        # Índices na tabela `strings`
+        self.contents = array("I")
+        self.locations = array("I")
+        self.timezones = array("I")
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        # linha → (recurrence, exceptions, transaction_id)
+        self.extras: dict[int, tuple] = {}
+        self._zones: dict[int, dt_timezone] = {}
+        self.extend(events)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, row: int) -> Event:
+        if row < 0:
+            row += len(self)
+        recurrence, exceptions, transaction_id = self.extras.get(row, (None, None, None))
+        return Event(subject=self.subjects[row], start=self.start(row), end=self.end(row),
+                     descr=self.descrs[row], content=self.strings[self.contents[row]],
+                     timezone=self.strings[self.timezones[row]], location=self.strings[self.locations[row]],
+                     recurrence=recurrence, exceptions=exceptions, transaction_id=transaction_id)
+
+    def __iter__(self) -> Iterator[Event]:
+        return (self[row] for row in range(len(self)))
+
+    # ═══════════════════════════════════════════════════════════════
+    # ESCRITA
+    # ═══════════════════════════════════════════════════════════════
+
+    def _intern(self, value: str) -> int:
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def append(self, event) -> int:
+        """
+        Adiciona um Event (ou objeto com os campos do OutlookService).
+
+        Returns:
+            Número da linha
+
+        Raises:
+            ValueError: Evento sem início/término ou com data fora do formato ISO
+        """
+        if isinstance(event, Event):
+            start, end = event.start, event.end
+        else:
+            start, end = Event.parse(event.date_start, event.timezone), Event.parse(event.date_end, event.timezone)
+        if start is None or end is None:
+            raise ValueError(f"Evento sem início/término: {event.subject!r}")
+        row = len(self.starts)
+        start_offset, end_offset = start.utcoffset(), end.utcoffset()
+        self.starts.append(start.timestamp())
+        self.ends.append(end.timestamp())
+        self.start_offsets.append(start_offset.days * 86400 + start_offset.seconds)
+        self.end_offsets.append(end_offset.days * 86400 + end_offset.seconds)
+        self.subjects.append(event.subject)
+        self.descrs.append(getattr(event, "descr", "") or "")
+        self.contents.append(self._intern(getattr(event, "content", "") or ""))
+        self.locations.append(self._intern(getattr(event, "location", "") or ""))
+        self.timezones.append(self._intern(event.timezone or ""))
+        extras = (getattr(event, "recurrence", None), getattr(event, "exceptions", None),
+                  getattr(event, "transaction_id", None))
+        if extras != (None, None, None):
+            self.extras[row] = extras
+        return row
+
+    def extend(self, events: Iterable):
+        for event in events:
+            self.append(event)
+
+    # ═══════════════════════════════════════════════════════════════
+    # LEITURA
+    # ═══════════════════════════════════════════════════════════════
+
+    def _zone(self, offset: int) -> dt_timezone:
+        zone = self._zones.get(offset)
+        if zone is None:
+            zone = self._zones[offset] = dt_timezone(timedelta(seconds=offset))
+        return zone
+
+    def start(self, row: int) -> datetime:
+        return datetime.fromtimestamp(self.starts[row], self._zone(self.start_offsets[row]))
+
+    def end(self, row: int) -> datetime:
+        return datetime.fromtimestamp(self.ends[row], self._zone(self.end_offsets[row]))
+
+    def date_start(self, row: int) -> str:
+        return self._rfc3339(self.starts[row], self.start_offsets[row])
+
+    def date_end(self, row: int) -> str:
+        return self._rfc3339(self.ends[row], self.end_offsets[row])
+
+    def _rfc3339(self, timestamp: float, offset: int) -> str:
+        """Mesmo texto de tool.to_rfc3339, pelo isoformat em C"""
+        dt = datetime.fromtimestamp(timestamp, self._zone(offset))
+        if not 1000 <= dt.year < 9999:
+            return tool.to_rfc3339(dt)
+        return dt.isoformat(timespec="seconds")
+
+    def to_services(self, rows: Iterable[int] = None) -> list[OutlookService]:
+        """OutlookService das linhas (todas, se `rows` for None) para OutlookService.create_many"""
+        return [self[row].to_service() for row in (range(len(self)) if rows is None else rows)]
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSULTAS POR INTERVALO
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _epoch(value) -> float:
+        """epoch, datetime ou RFC3339 → epoch (sem offset = fuso local)"""
+        if isinstance(value, (int, float)):
+            return float(value)
+        dt = tool.as_datetime(value)
+        return (dt if dt.tzinfo is not None else dt.astimezone()).timestamp()
+
+    def overlapping(self, range_start, range_end) -> list[int]:
+        """Linhas que se sobrepõem a [range_start, range_end)"""
+        low, high = self._epoch(range_start), self._epoch(range_end)
+        # map/compress comparam os arrays sem laço em Python por linha
+        hits = map(and_, map(high.__gt__, self.starts), map(low.__lt__, self.ends))
+        return list(compress(range(len(self)), hits))
+
+    def invalid_ranges(self) -> list[int]:
+        """Linhas com término igual ou anterior ao início (o validate_date_range do lote inteiro)"""
+        return list(compress(range(len(self)), map(le, self.ends, self.starts)))
+
+    def bounds(self) -> tuple[float, float]:
+        """Menor início e maior término do lote (epoch), ou (None, None) se vazio"""
+        if not self.starts:
+            return None, None
+        return min(self.starts), max(self.ends)
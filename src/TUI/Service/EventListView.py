@@ -0,0 +1,282 @@
+"""
+EventListView - Lista Virtualizada de Eventos
+Agenda rolável sobre milhares de eventos (EventBatch) com rich.live.Live:
+só a janela visível é renderizada e as linhas são reaproveitadas entre quadros
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from rich.console import Console, Group
+from rich.text import Text
+
+from data import ThemeConfig
+from tool import tool
+from Service.Event import EventBatch
+
+
+# Teclas normalizadas por read_key
+KEY_UP, KEY_DOWN, KEY_PAGE_UP, KEY_PAGE_DOWN = "up", "down", "page_up", "page_down"
+KEY_HOME, KEY_END, KEY_ENTER, KEY_ESCAPE, KEY_BACKSPACE = "home", "end", "enter", "escape", "backspace"
+
+# Sequências ANSI (POSIX) e códigos estendidos do msvcrt (Windows) → tecla
+ANSI_KEYS = {
+    "\x1b[A": KEY_UP, "\x1b[B": KEY_DOWN, "\x1b[5~": KEY_PAGE_UP, "\x1b[6~": KEY_PAGE_DOWN,
+    "\x1b[H": KEY_HOME, "\x1b[F": KEY_END, "\x1b[1~": KEY_HOME, "\x1b[4~": KEY_END,
+    "\x1bOH": KEY_HOME, "\x1bOF": KEY_END,
+}
+MSVCRT_KEYS = {"H": KEY_UP, "P": KEY_DOWN, "I": KEY_PAGE_UP, "Q": KEY_PAGE_DOWN, "G": KEY_HOME, "O": KEY_END}
+
+
+@dataclass
+class EventListView:
+    """
+    Lista de eventos paginada e virtualizada.
+
+    Cada quadro monta só as `page_size` linhas visíveis; o Text de cada linha fica
+    num cache LRU (por número da linha no EventBatch) e é reaproveitado enquanto a
+    largura do terminal não muda, então rolar uma linha custa uma linha nova.
+
+    O filtro compara o texto digitado com assunto e local (sem diferenciar
+    maiúsculas). Quando a busca só ganha caracteres no fim, o novo resultado é
+    procurado dentro do anterior em vez de na lista inteira.
+    """
+    events: EventBatch
+    theme: ThemeConfig = None
+    title: str = "Agenda"
+    # Linhas visíveis; None = altura do terminal menos cabeçalho e rodapé
+    page_size: int = None
+
+    # Linhas do EventBatch que passam no filtro, na ordem de exibição
+    visible: list = field(default_factory=list, init=False, repr=False)
+    query: str = field(default="", init=False, repr=False)
+    cursor: int = field(default=0, init=False, repr=False)
+    offset: int = field(default=0, init=False, repr=False)
+    # True enquanto o usuário digita o filtro (após "/")
+    editing: bool = field(default=False, init=False, repr=False)
+    _haystack: list = field(default=None, init=False, repr=False)
+    _rows: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False)
+    _width: int = field(default=0, init=False, repr=False)
+    _capacity: int = field(default=0, init=False, repr=False)
+
+    # Linhas fora da tela mantidas no cache (múltiplo de page_size)
+    CACHE_PAGES = 4
+    # Título, cabeçalho, rodapé e uma linha de folga
+    CHROME_LINES = 4
+
+    def __post_init__(self):
+        if self.theme is None:
+            self.theme = ThemeConfig()
+        self.visible = list(range(len(self.events)))
+
+    # ═══════════════════════════════════════════════════════════════
+    # FILTRO E NAVEGAÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def _search_text(self) -> list[str]:
+        """Assunto + local de cada linha, em minúsculas (montado no primeiro filtro)"""
+        if self._haystack is None:
+            strings, locations = self.events.strings, self.events.locations
+            self._haystack = [f"{subject}\n{strings[location]}".casefold()
+                              for subject, location in zip(self.events.subjects, locations)]
+        return self._haystack
+
+    def filter(self, query: str):
+        """Mostra só as linhas cujo assunto ou local contém `query`"""
+        needle = query.casefold()
+        if needle == self.query.casefold():
+            self.query = query
+            return
+        haystack = self._search_text()
+        # Busca estendida no fim: o resultado novo é subconjunto do atual
+        source = self.visible if needle.startswith(self.query.casefold()) else range(len(self.events))
+        self.visible = [row for row in source if needle in haystack[row]] if needle else list(range(len(self.events)))
+        self.query = query
+        self.cursor, self.offset = 0, 0
+
+    def move(self, delta: int, page_size: int):
+        """Move o cursor `delta` linhas, rolando a janela só quando ele sai dela"""
+        if not self.visible:
+            self.cursor, self.offset = 0, 0
+            return
+        self.cursor = max(0, min(len(self.visible) - 1, self.cursor + delta))
+        if self.cursor < self.offset:
+            self.offset = self.cursor
+        elif self.cursor >= self.offset + page_size:
+            self.offset = self.cursor - page_size + 1
+
+    def handle_key(self, key: str, page_size: int) -> bool:
+        """
+        Aplica uma tecla ao estado da lista.
+
+        Returns:
+            False quando a lista deve fechar
+        """
+        if self.editing:
+            if key in (KEY_ENTER, KEY_ESCAPE):
+                self.editing = False
+                if key == KEY_ESCAPE:
+                    self.filter("")
+            elif key == KEY_BACKSPACE:
+                self.filter(self.query[:-1])
+            elif len(key) == 1 and key.isprintable():
+                self.filter(self.query + key)
+            return True
+
+        if key in ("q", KEY_ESCAPE):
+            return False
+        moves = {KEY_UP: -1, "k": -1, KEY_DOWN: 1, "j": 1, KEY_PAGE_UP: -page_size, KEY_PAGE_DOWN: page_size,
+                 KEY_HOME: -len(self.visible), "g": -len(self.visible), KEY_END: len(self.visible), "G": len(self.visible)}
+        if key in moves:
+            self.move(moves[key], page_size)
+        elif key == "/":
+            self.editing = True
+        return True
+
+    # ═══════════════════════════════════════════════════════════════
+    # RENDERIZAÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def _page_size(self, console: Console) -> int:
+        return self.page_size or max(1, console.size.height - self.CHROME_LINES)
+
+    def _columns(self, width: int) -> tuple[int, int, int]:
+        """Larguras de (início/término, local, assunto) para a largura do terminal"""
+        when = 15
+        location = max(8, min(24, width // 5))
+        return when, location, max(10, width - 2 * when - location - 4)
+
+    def row_text(self, row: int, width: int) -> Text:
+        """Text de uma linha do EventBatch (do cache, se já montado nesta largura)"""
+        if width != self._width:
+            self._rows.clear()
+            self._width = width
+        text = self._rows.get(row)
+        if text is not None:
+            self._rows.move_to_end(row)
+            return text
+
+        when, location_width, subject_width = self._columns(width)
+        subject = self.events.subjects[row]
+        location = self.events.strings[self.events.locations[row]]
+        text = Text.assemble(
+            (f"{tool.format_friendly(self.events.start(row)):<{when}}", self.theme.ACCENT),
+            (f"{tool.format_friendly(self.events.end(row)):<{when}}", self.theme.TEXT_DIM),
+            (f" {self._fit(subject, subject_width):<{subject_width}} ", "white"),
+            (f"{self._fit(location, location_width):<{location_width}}", self.theme.TEXT_DIM),
+            no_wrap=True, overflow="crop",
+        )
+        self._rows[row] = text
+        if len(self._rows) > self._capacity:
+            self._rows.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _fit(value: str, width: int) -> str:
+        value = value.replace("\n", " ")
+        return value if len(value) <= width else value[:width - 1] + "…"
+
+    def render(self, console: Console) -> Group:
+        """Quadro atual: cabeçalho, só as linhas visíveis e rodapé com posição e filtro"""
+        width = console.size.width
+        page_size = self._page_size(console)
+        self._capacity = self.CACHE_PAGES * page_size
+        # Terminal redimensionado: mantém o cursor na janela
+        self.move(0, page_size)
+
+        when, location_width, subject_width = self._columns(width)
+        header = Text(f"{'Início':<{when}}{'Término':<{when}} {'Assunto':<{subject_width}} {'Local':<{location_width}}",
+                      style=f"bold {self.theme.PRIMARY}", no_wrap=True, overflow="crop")
+        lines = [Text(self.title, style="bold white", no_wrap=True, overflow="crop"), header]
+
+        window = self.visible[self.offset:self.offset + page_size]
+        for position, row in enumerate(window, start=self.offset):
+            text = self.row_text(row, width)
+            if position == self.cursor:
+                text = text.copy()
+                text.stylize("reverse")
+            lines.append(text)
+        lines.extend(Text("") for _ in range(page_size - len(window)))
+        lines.append(self._footer(page_size))
+        return Group(*lines)
+
+    def _footer(self, page_size: int) -> Text:
+        total = len(self.visible)
+        position = f"{self.offset + 1}–{min(total, self.offset + page_size)} de {total}" if total else "nenhum evento"
+        footer = Text(position, style=self.theme.TEXT_DIM, no_wrap=True, overflow="crop")
+        if self.editing or self.query:
+            footer.append("  filtro: ", style=self.theme.TEXT_DIM)
+            footer.append(self.query + ("▏" if self.editing else ""), style=f"bold {self.theme.ACCENT}")
+        footer.append("   ↑↓/jk · PgUp/PgDn · / filtrar · q sair", style=self.theme.TEXT_DIM)
+        return footer
+
+    # ═══════════════════════════════════════════════════════════════
+    # LOOP INTERATIVO
+    # ═══════════════════════════════════════════════════════════════
+
+    def run(self, console: Console):
+        """Mostra a lista em tela cheia até o usuário sair (q ou Esc)"""
+        from rich.live import Live
+
+        with Live(self.render(console), console=console, screen=True, auto_refresh=False) as live, \
+                _RawTerminal() as terminal:
+            while self.handle_key(terminal.read_key(), self._page_size(console)):
+                live.update(self.render(console), refresh=True)
+
+
+class _RawTerminal:
+    """Leitura de uma tecla por vez (termios no POSIX, msvcrt no Windows)"""
+
+    def __enter__(self) -> "_RawTerminal":
+        self._saved = None
+        if os.name != "nt":
+            import termios
+            import tty
+            self._fd = sys.stdin.fileno()
+            self._saved = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            import termios
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+
+    def read_key(self) -> str:
+        if os.name == "nt":
+            import msvcrt
+            char = msvcrt.getwch()
+            if char in ("\x00", "\xe0"):
+                return MSVCRT_KEYS.get(msvcrt.getwch(), "")
+            return self._plain(char)
+
+        import select
+        data = os.read(self._fd, 1)
+        if data == b"\x1b":
+            # Esc sozinho ou início de uma sequência ANSI (setas, PgUp/PgDn): termina numa letra ou "~"
+            while select.select([self._fd], [], [], 0.01)[0]:
+                data += os.read(self._fd, 1)
+                if len(data) > 2 and (data[-1:].isalpha() or data[-1:] == b"~"):
+                    break
+            sequence = data.decode("utf-8", errors="ignore")
+            return ANSI_KEYS.get(sequence, KEY_ESCAPE if sequence == "\x1b" else "")
+        # Caracteres multibyte (ex: acentos) chegam um byte por read
+        while True:
+            try:
+                return self._plain(data.decode("utf-8"))
+            except UnicodeDecodeError:
+                if len(data) >= 4:
+                    return ""
+                data += os.read(self._fd, 1)
+
+    @staticmethod
+    def _plain(char: str) -> str:
+        if char in ("\r", "\n"):
+            return KEY_ENTER
+        if char in ("\x7f", "\x08"):
+            return KEY_BACKSPACE
+        if char == "\x1b":
+            return KEY_ESCAPE
+        return char
@@ -0,0 +1,362 @@
+"""
+EventStore - Cache Local de Eventos
+SQLite com índices para listar e buscar eventos sem consultar o Graph
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable
+import sqlite3
+import threading
+import time
+import uuid
+
+from data import CacheConfig
+
+
+@dataclass
+class StoredEvent:
+    """Evento como guardado no cache"""
+    id: str
+    subject: str
+    date_start: str
+    date_end: str
+    timezone: str = ""
+    location: str = ""
+    content: str = ""
+    descr: str = ""
+    version: str = None
+    cached_at: float = 0.0
+
+
+@dataclass
+class EventStore:
+    """
+    Cache de eventos em SQLite (modo WAL).
+
+    Os horários ficam também como epoch (start_ts/end_ts) para que consultas por
+    intervalo usem o índice. Invalidação:
+    - SCHEMA_VERSION diferente do banco em disco → cache recriado do zero
+    - ttl_seconds → entradas mais antigas são ignoradas nas leituras e removidas em `invalidate`
+    - version (ex: changeKey do Graph) → um upsert com versão igual à guardada é ignorado
+
+    A busca por texto usa os índices de subject/location (prefixo) e a tabela FTS5
+    events_fts com tokenizer trigram (substring). A events_fts é atualizada junto com
+    cada escrita por comandos em lote (_write/_delete_where): com triggers, o FTS5
+    indexa linha a linha e uma carga de 5k eventos fica ~4x mais lenta.
+    """
+    path: str = None
+    ttl_seconds: float = None
+
+    SCHEMA_VERSION = 2
+    # Acima disso, uma fase da busca percorre idx_events_start em ordem em vez de ordenar os candidatos
+    SEARCH_CANDIDATES = 100
+
+    _conn: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _max_duration: float = field(default=0.0, init=False, repr=False)
+    # False quando o SQLite não tem FTS5 com trigram (a busca por substring varre a tabela)
+    _fts: bool = field(default=False, init=False, repr=False)
+
+    def __post_init__(self):
+        config = CacheConfig()
+        if self.path is None:
+            self.path = config.DB_PATH
+        if self.ttl_seconds is None:
+            self.ttl_seconds = config.TTL_SECONDS
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._migrate()
+
+    # ═══════════════════════════════════════════════════════════════
+    # ESQUEMA
+    # ═══════════════════════════════════════════════════════════════
+
+    def _migrate(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            current = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if current != self.SCHEMA_VERSION:
+                # Esquema antigo: o cache é descartável, recria do zero
+                self._conn.execute("DROP TABLE IF EXISTS events_fts")
+                self._conn.execute("DROP TABLE IF EXISTS events")
+                self._conn.execute("DROP TABLE IF EXISTS meta")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    -- rowid explícito: events_fts aponta para ele e um VACUUM não o renumera
+                    seq        INTEGER PRIMARY KEY,
+                    id         TEXT NOT NULL UNIQUE,
+                    subject    TEXT NOT NULL COLLATE NOCASE,
+                    location   TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+                    start_ts   REAL NOT NULL,
+                    end_ts     REAL NOT NULL,
+                    date_start TEXT NOT NULL,
+                    date_end   TEXT NOT NULL,
+                    timezone   TEXT NOT NULL DEFAULT '',
+                    content    TEXT NOT NULL DEFAULT '',
+                    descr      TEXT NOT NULL DEFAULT '',
+                    version    TEXT,
+                    cached_at  REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+                CREATE INDEX IF NOT EXISTS idx_events_subject ON events (subject);
+                CREATE INDEX IF NOT EXISTS idx_events_location ON events (location);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            self._fts = self._create_fts()
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            row = self._conn.execute("SELECT MAX(end_ts - start_ts) FROM events").fetchone()
+            self._max_duration = row[0] or 0.0
+
+    def _create_fts(self) -> bool:
+        """Índice de substring (trigram) sobre subject/location; False se o SQLite não suportar"""
+        try:
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+                    subject, location, content='events', content_rowid='seq', tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+        # Ids tocados por uma escrita em lote (por conexão, fora do arquivo)
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS touched_ids (id TEXT PRIMARY KEY)")
+        return True
+
+    def close(self):
+        self._conn.close()
+
+    # ═══════════════════════════════════════════════════════════════
+    # ESCRITA
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _epoch(iso_str: str) -> float:
+        dt = datetime.fromisoformat(iso_str)
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        return dt.timestamp()
+
+    def _row(self, event, event_id: str, version: str, now: float) -> tuple:
+        start_ts, end_ts = self._epoch(event.date_start), self._epoch(event.date_end)
+        self._max_duration = max(self._max_duration, end_ts - start_ts)
+        return (event_id or f"local:{uuid.uuid4().hex}", event.subject, event.location or "",
+                start_ts, end_ts, event.date_start, event.date_end, event.timezone or "",
+                event.content or "", event.descr or "", version, now)
+
+    _UPSERT = """
+        INSERT INTO events (id, subject, location, start_ts, end_ts, date_start, date_end,
+                            timezone, content, descr, version, cached_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            subject = excluded.subject, location = excluded.location,
+            start_ts = excluded.start_ts, end_ts = excluded.end_ts,
+            date_start = excluded.date_start, date_end = excluded.date_end,
+            timezone = excluded.timezone, content = excluded.content, descr = excluded.descr,
+            version = excluded.version, cached_at = excluded.cached_at
+        WHERE events.version IS NULL OR excluded.version IS NULL OR events.version != excluded.version
+    """
+
+    def upsert(self, event, event_id: str = None, version: str = None) -> str:
+        """
+        Grava um evento (qualquer objeto com subject/date_start/date_end/...).
+
+        Returns:
+            Id do evento no cache (o id do Graph, ou um id local gerado)
+        """
+        row = self._row(event, event_id, version, time.time())
+        with self._lock, self._conn:
+            self._write([row])
+        return row[0]
+
+    def upsert_many(self, items: Iterable[tuple]):
+        """Grava vários (evento, event_id, version) numa única transação"""
+        now = time.time()
+        rows = [self._row(event, event_id, version, now) for event, event_id, version in items]
+        with self._lock, self._conn:
+            self._write(rows)
+
+    def delete(self, event_id: str):
+        with self._lock, self._conn:
+            self._delete_where("id = ?", (event_id,))
+
+    def delete_many(self, event_ids: Iterable[str]):
+        with self._lock, self._conn:
+            if not self._fts:
+                self._conn.executemany("DELETE FROM events WHERE id = ?", ((event_id,) for event_id in event_ids))
+                return
+            self._touch_ids(event_ids)
+            self._delete_where("id IN (SELECT id FROM touched_ids)")
+
+    def _touch_ids(self, event_ids: Iterable[str]):
+        self._conn.execute("DELETE FROM touched_ids")
+        self._conn.executemany("INSERT OR IGNORE INTO touched_ids (id) VALUES (?)", ((event_id,) for event_id in event_ids))
+
+    def _write(self, rows: list[tuple]):
+        """Upsert das linhas (dentro da transação do chamador), tirando da events_fts o texto antigo e indexando o novo"""
+        if not self._fts:
+            self._conn.executemany(self._UPSERT, rows)
+            return
+        self._touch_ids(row[0] for row in rows)
+        self._conn.execute("""
+            INSERT INTO events_fts (events_fts, rowid, subject, location)
+            SELECT 'delete', seq, subject, location FROM events WHERE id IN (SELECT id FROM touched_ids)
+        """)
+        self._conn.executemany(self._UPSERT, rows)
+        self._conn.execute("""
+            INSERT INTO events_fts (rowid, subject, location)
+            SELECT seq, subject, location FROM events WHERE id IN (SELECT id FROM touched_ids)
+        """)
+
+    def _delete_where(self, condition: str, params: tuple = ()) -> int:
+        """Remove as linhas que atendem `condition` (e o texto delas na events_fts); retorna quantas"""
+        if self._fts:
+            self._conn.execute(f"""
+                INSERT INTO events_fts (events_fts, rowid, subject, location)
+                SELECT 'delete', seq, subject, location FROM events WHERE {condition}
+            """, params)
+        return self._conn.execute(f"DELETE FROM events WHERE {condition}", params).rowcount
+
+    def sync(self, range_start: str, range_end: str, events: Iterable[tuple]):
+        """
+        Substitui o conteúdo do cache no intervalo pelo que veio do Graph.
+
+        Args:
+            range_start, range_end: Intervalo RFC3339 que foi consultado
+            events: (evento, event_id, version) retornados para o intervalo
+        """
+        start_ts, end_ts = self._epoch(range_start), self._epoch(range_end)
+        now = time.time()
+        rows = [self._row(event, event_id, version, now) for event, event_id, version in events]
+        with self._lock, self._conn:
+            self._delete_where("start_ts < ? AND end_ts > ?", (end_ts, start_ts))
+            self._write(rows)
+
+    def touch(self, range_start: str, range_end: str):
+        """Renova o TTL dos eventos do intervalo (ex: após uma sincronização confirmada pelo Graph)"""
+        start_ts, end_ts = self._epoch(range_start), self._epoch(range_end)
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE events SET cached_at = ? WHERE start_ts < ? AND end_ts > ?",
+                               (time.time(), end_ts, start_ts))
+
+    def invalidate(self, older_than: float = None) -> int:
+        """Remove entradas vencidas pelo TTL (ou mais antigas que `older_than` epoch); retorna quantas"""
+        cutoff = older_than if older_than is not None else time.time() - self.ttl_seconds
+        with self._lock, self._conn:
+            return self._delete_where("cached_at < ?", (cutoff,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events")
+            if self._fts:
+                self._conn.execute("INSERT INTO events_fts (events_fts) VALUES ('delete-all')")
+            self._max_duration = 0.0
+
+    # ═══════════════════════════════════════════════════════════════
+    # METADADOS
+    # ═══════════════════════════════════════════════════════════════
+
+    def get_meta(self, key: str, default: str = None) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSULTAS
+    # ═══════════════════════════════════════════════════════════════
+
+    def _fresh_after(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    @staticmethod
+    def _to_event(row: sqlite3.Row) -> StoredEvent:
+        return StoredEvent(id=row["id"], subject=row["subject"], date_start=row["date_start"],
+                           date_end=row["date_end"], timezone=row["timezone"], location=row["location"],
+                           content=row["content"], descr=row["descr"], version=row["version"],
+                           cached_at=row["cached_at"])
+
+    def list_events(self, range_start: str, range_end: str, limit: int = None) -> list[StoredEvent]:
+        """
+        Eventos que se sobrepõem ao intervalo [range_start, range_end), ordenados pelo início.
+
+        O limite inferior em start_ts (início do intervalo menos a maior duração
+        guardada) deixa a consulta inteira dentro do índice idx_events_start.
+        """
+        start_ts, end_ts = self._epoch(range_start), self._epoch(range_end)
+        sql = """
+            SELECT * FROM events
+            WHERE start_ts >= ? AND start_ts < ? AND end_ts > ? AND cached_at >= ?
+            ORDER BY start_ts
+        """
+        params = [start_ts - self._max_duration, end_ts, start_ts, self._fresh_after()]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_event(row) for row in rows]
+
+    def search(self, text: str, limit: int = 50) -> list[StoredEvent]:
+        """
+        Busca por assunto ou local (sem diferenciar maiúsculas), ordenada pelo início:
+        primeiro os que começam com `text`, depois os que o contêm em outra posição.
+
+        Cada fase junta até SEARCH_CANDIDATES linhas pelos índices (subject/location
+        para prefixo, events_fts para substring) e ordena só essas. Termos mais comuns
+        percorrem idx_events_start em ordem e param no `limit`-ésimo resultado, então
+        nenhuma fase ordena todos os eventos que casam.
+        """
+        fresh_after = self._fresh_after()
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        prefix, substring = f"{escaped}%", f"%{escaped}%"
+        with self._lock:
+            rows = self._search_phase(self._prefix_candidates(prefix), prefix, fresh_after, limit)
+            if len(rows) < limit:
+                seen = {row["id"] for row in rows}
+                more = self._search_phase(self._substring_candidates(text), substring, fresh_after, limit)
+                rows += [row for row in more if row["id"] not in seen][:limit - len(rows)]
+        return [self._to_event(row) for row in rows]
+
+    def _prefix_candidates(self, pattern: str) -> set:
+        candidates = set()
+        for column in ("subject", "location"):
+            candidates.update(row[0] for row in self._conn.execute(
+                f"SELECT seq FROM events WHERE {column} LIKE ? ESCAPE '\\' LIMIT ?",
+                (pattern, self.SEARCH_CANDIDATES + 1)))
+        return candidates
+
+    def _substring_candidates(self, text: str) -> set:
+        """Linhas que contêm `text` pela events_fts; None se não der para usá-la (menos de 3 caracteres)"""
+        if not self._fts or len(text) < 3:
+            return None
+        phrase = '"' + text.replace('"', '""') + '"'
+        return {row[0] for row in self._conn.execute(
+            "SELECT rowid FROM events_fts WHERE events_fts MATCH ? LIMIT ?", (phrase, self.SEARCH_CANDIDATES + 1))}
+
+    def _search_phase(self, candidates: set, pattern: str, fresh_after: float, limit: int) -> list[sqlite3.Row]:
+        if candidates is not None and len(candidates) <= self.SEARCH_CANDIDATES:
+            if not candidates:
+                return []
+            return self._conn.execute(f"""
+                SELECT * FROM events WHERE seq IN ({",".join("?" * len(candidates))}) AND cached_at >= ?
+                ORDER BY start_ts LIMIT ?
+            """, (*candidates, fresh_after, limit)).fetchall()
+        # Termo comum (ou sem índice): na ordem do início, os primeiros `limit` aparecem logo
+        return self._conn.execute("""
+            SELECT * FROM events INDEXED BY idx_events_start
+            WHERE (subject LIKE ? ESCAPE '\\' OR location LIKE ? ESCAPE '\\') AND cached_at >= ?
+            ORDER BY start_ts LIMIT ?
+        """, (pattern, pattern, fresh_after, limit)).fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
@@ -0,0 +1,525 @@
+"""
+HttpBackend - Envio ao Graph pelo Próprio Python
+Mesmo corpo JSON, rate limit e retentativas do core, com conexões keep-alive
+reaproveitadas (http.client) e sem processo externo
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from urllib.parse import urlencode, urlsplit
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+
+from data import BackendConfig
+from Service.OutlookService import OutlookService, EventResult
+from Service.SubmitBackend import SubmitBackend
+from Service.TokenService import TokenError
+
+
+DEFAULT_GRAPH_URL = "https://graph.microsoft.com"
+EVENTS_PATH = "/v1.0/me/events"
+BATCH_PATH = "/v1.0/$batch"
+# Limite de sub-requisições por chamada ao /$batch do Graph
+GRAPH_BATCH_LIMIT = 20
+# Respostas que vale repetir (as mesmas do RetryPolicy::is_transient do core)
+TRANSIENT = frozenset((408, 429, 500, 502, 503, 504))
+
+
+# ═══════════════════════════════════════════════════════════════
+# RATE LIMIT E RETENTATIVAS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class RateLimiter:
+    """
+    Token bucket compartilhado entre as threads de envio.
+    Um 429 com Retry-After pausa o bucket inteiro, não só a requisição que o recebeu.
+    """
+    rate: float = 15.0
+    burst: int = 15
+
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _last_refill: float = field(default=0.0, init=False, repr=False)
+    _blocked_until: float = field(default=0.0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        self.rate = max(self.rate, 0.001)
+        self.burst = max(self.burst, 1)
+        self._tokens = float(self.burst)
+        self._last_refill = self._blocked_until = time.monotonic()
+
+    def acquire(self, n: int = 1):
+        """
+        Espera e consome `n` tokens de uma vez (um por sub-requisição de um /$batch).
+
+        Com `n` acima do burst, espera o balde encher e fica devendo a diferença: os
+        próximos envios esperam a dívida ser paga, então a taxa média continua `rate`.
+        """
+        cost = float(max(n, 1))
+        needed = min(cost, self.burst)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._blocked_until > now:
+                    wait = self._blocked_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                    self._last_refill = now
+                    if self._tokens >= needed:
+                        self._tokens -= cost
+                        return
+                    wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, delay: float):
+        """Pausa todos os envios por `delay` segundos (throttling do Graph)"""
+        with self._lock:
+            until = time.monotonic() + delay
+            if until > self._blocked_until:
+                self._blocked_until = until
+                self._tokens = 0.0
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff exponencial com jitter total"""
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Atraso aleatório em [0, min(max_delay, base * 2^attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** min(attempt, 16)))
+
+    @staticmethod
+    def retry_after(value) -> float:
+        """Retry-After em segundos, ou None"""
+        try:
+            return float(int(str(value).strip()))
+        except (TypeError, ValueError):
+            return None
+
+
+# ═══════════════════════════════════════════════════════════════
+# POOL DE CONEXÕES
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class ConnectionPool:
+    """
+    Conexões keep-alive com o Graph, reaproveitadas entre requisições e threads.
+
+    Cada requisição pega uma conexão ociosa (ou abre uma nova) e a devolve ao terminar;
+    ficam guardadas no máximo `size`. Conexão guardada que o servidor já fechou é
+    descartada e a requisição vai numa conexão nova.
+    """
+    base_url: str
+    size: int = 16
+    timeout: float = 30.0
+
+    _idle: queue.LifoQueue = field(default=None, init=False, repr=False)
+    _https: bool = field(default=True, init=False, repr=False)
+    _host: str = field(default=None, init=False, repr=False)
+    _port: int = field(default=None, init=False, repr=False)
+    _prefix: str = field(default="", init=False, repr=False)
+
+    def __post_init__(self):
+        parts = urlsplit(self.base_url)
+        self._https = parts.scheme == "https"
+        self._host, self._port = parts.hostname, parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._idle = queue.LifoQueue(maxsize=max(1, self.size))
+
+    def _connect(self) -> HTTPConnection:
+        connection = HTTPSConnection if self._https else HTTPConnection
+        return connection(self._host, self._port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None,
+                timeout: float = None) -> tuple[int, object, bytes]:
+        """
+        Uma requisição (path relativo à URL base).
+
+        Returns:
+            (status, cabeçalhos, corpo)
+
+        Raises:
+            OSError, HTTPException: Falha de rede numa conexão nova
+        """
+        while True:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            conn.timeout = timeout or self.timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(conn.timeout)
+            try:
+                conn.request(method, self._prefix + path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, HTTPException) as e:
+                conn.close()
+                if reused and not isinstance(e, TimeoutError):
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, response.headers, data
+
+    def _release(self, conn: HTTPConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ═══════════════════════════════════════════════════════════════
+# BACKEND
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class HttpBackend(SubmitBackend):
+    """
+    Cria eventos com requisições HTTP feitas pelo próprio processo.
+
+    O corpo do POST é o mesmo do `CalendarService::build_body` do core, e o envio segue
+    as mesmas regras: token bucket compartilhado, retentativas só para 408/429/5xx e
+    falhas de rede, Retry-After pausando todos os envios e ocorrências de exceção
+    canceladas depois de criar a série.
+    """
+    config: BackendConfig = None
+
+    name = "http"
+
+    pool: ConnectionPool = field(default=None, init=False, repr=False)
+    limiter: RateLimiter = field(default=None, init=False, repr=False)
+    policy: RetryPolicy = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.config is None:
+            self.config = BackendConfig()
+        graph_url = os.environ.get("OUTLOOK_GRAPH_URL", DEFAULT_GRAPH_URL).rstrip("/")
+        self.pool = ConnectionPool(graph_url, size=self.config.POOL_SIZE, timeout=self.config.TIMEOUT_SECONDS)
+        self.limiter = RateLimiter(self.config.RATE, self.config.BURST)
+        self.policy = RetryPolicy(self.config.MAX_RETRIES)
+
+    def close(self):
+        self.pool.close()
+
+    # ═══════════════════════════════════════════════════════════════
+    # CORPO DO EVENTO
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def build_body(event: OutlookService) -> dict:
+        """
+        Evento no formato do Microsoft Graph (o mesmo JSON montado pelo core).
+
+        Raises:
+            ValueError: Datas fora do RFC3339, início depois do término, recorrência ou exceções inválidas
+        """
+        start = HttpBackend._parse_rfc3339(event.date_start, "início")
+        end = HttpBackend._parse_rfc3339(event.date_end, "término")
+        if start > end:
+            raise ValueError("Start date cannot be after end date")
+        recurrence = event.recurrence
+        if recurrence is not None and (not isinstance(recurrence.get("pattern"), dict)
+                                       or not isinstance(recurrence.get("range"), dict)):
+            raise ValueError('Recorrência precisa de "pattern" e "range"')
+        if event.exceptions and recurrence is None:
+            raise ValueError("Exceções só valem para eventos recorrentes")
+        for exception in event.exceptions or []:
+            try:
+                datetime.strptime(exception, "%Y-%m-%d")
+            except ValueError as e:
+                raise ValueError(f"Exceção inválida {exception}: {e}") from e
+
+        body = {
+            "subject": event.subject,
+            "body": {"contentType": "HTML", "content": event.descr or ""},
+            "start": {"dateTime": HttpBackend._rfc3339(start), "timeZone": event.timezone},
+            "end": {"dateTime": HttpBackend._rfc3339(end), "timeZone": event.timezone},
+            "location": {"displayName": event.location},
+        }
+        if recurrence is not None:
+            body["recurrence"] = recurrence
+        # Sempre presente: uma retentativa após timeout não duplica o evento no Graph
+        body["transactionId"] = event.transaction_id or str(uuid.uuid4())
+        return body
+
+    @staticmethod
+    def _parse_rfc3339(value: str, label: str) -> datetime:
+        try:
+            dt = datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Data de {label} inválida: {e}") from e
+        if dt.tzinfo is None:
+            raise ValueError(f"Data de {label} inválida: sem offset ({value})")
+        return dt
+
+    @staticmethod
+    def _rfc3339(dt: datetime) -> str:
+        """Como o `to_rfc3339` do chrono: fração só quando existe, em ms se couber"""
+        if dt.microsecond and dt.microsecond % 1000 == 0:
+            return dt.isoformat(timespec="milliseconds")
+        return dt.isoformat()
+
+    # ═══════════════════════════════════════════════════════════════
+    # ENVIO
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _token(force_refresh: bool = False) -> str:
+        return OutlookService.tokens().get_token(force_refresh)
+
+    def _execute(self, method: str, path: str, token: str, payload=None, label=None,
+                 timeout: float = None) -> tuple[EventResult, bytes]:
+        """
+        Laço de envio e retentativas de uma requisição.
+
+        Returns:
+            (resultado, corpo da resposta de sucesso)
+        """
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Authorization": f"Bearer {token}"}
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+
+        attempt = throttled = 0
+        while True:
+            self.limiter.acquire()
+            attempt += 1
+            started = time.time_ns()
+            wait = None
+            try:
+                status, response_headers, body = self.pool.request(method, path, data, headers, timeout)
+            except (OSError, HTTPException) as e:
+                OutlookService._trace("request", started, label, attempt=attempt, error=str(e))
+                status, error, transient = None, str(e) or type(e).__name__, True
+            else:
+                OutlookService._trace("request", started, label, attempt=attempt, status=status)
+                if status == 429:
+                    throttled += 1
+                if 200 <= status < 300:
+                    return EventResult(index=0, ok=True, status=status, attempts=attempt, throttled=throttled), body
+                error = f"Microsoft Graph error {status}: {body.decode('utf-8', errors='replace')}"
+                transient = status in TRANSIENT
+                wait = RetryPolicy.retry_after(response_headers.get("Retry-After"))
+
+            if not transient or attempt > self.policy.max_retries:
+                return EventResult(index=0, ok=False, status=status, error=error, attempts=attempt,
+                                   throttled=throttled, permanent=not transient), b""
+            self._wait(wait, attempt, label)
+
+    def _wait(self, retry_after: float, attempt: int, label):
+        """Retry-After pausa o limiter inteiro; sem ele, backoff só desta requisição"""
+        if retry_after is not None:
+            self.limiter.pause(retry_after)
+            return
+        started = time.time_ns()
+        time.sleep(self.policy.backoff(attempt - 1))
+        OutlookService._trace("backoff", started, label, attempt=attempt)
+
+    def _post_event(self, event: OutlookService, token: str, index: int = 0, label=0,
+                    timeout: float = None) -> EventResult:
+        try:
+            body = self.build_body(event)
+        except ValueError as e:
+            return EventResult(index=index, ok=False, error=str(e), attempts=0, permanent=True)
+
+        result, response = self._execute("POST", EVENTS_PATH, token, body, label, timeout)
+        result.index = index
+        if result.ok:
+            result.event_id = self._event_id(response)
+            if event.exceptions and result.event_id:
+                self._cancel_exceptions(event, result.event_id, token, label)
+        return result
+
+    @staticmethod
+    def _event_id(response) -> str:
+        try:
+            body = json.loads(response) if isinstance(response, (bytes, str)) else response
+            return body.get("id")
+        except (ValueError, AttributeError):
+            return None
+
+    def _cancel_exceptions(self, event: OutlookService, event_id: str, token: str, label):
+        """
+        Remove as ocorrências das datas de exceção (o Graph não aceita exceções na criação).
+        A série já foi criada, então falhas aqui só geram aviso.
+        """
+        offset = datetime.fromisoformat(event.date_start).tzinfo
+        for exception in event.exceptions:
+            start = datetime.strptime(exception, "%Y-%m-%d").replace(tzinfo=offset)
+            query = urlencode({"startDateTime": self._rfc3339(start),
+                               "endDateTime": self._rfc3339(start + timedelta(days=1))})
+            found, response = self._execute("GET", f"{EVENTS_PATH}/{event_id}/instances?{query}", token, label=label)
+            if not found.ok:
+                print(f"[WARN] Exceção {exception} não cancelada: {found.error}")
+                continue
+            try:
+                instances = json.loads(response).get("value") or []
+            except (ValueError, AttributeError):
+                instances = []
+            for instance in instances:
+                if not instance.get("id"):
+                    continue
+                deleted, _ = self._execute("DELETE", f"{EVENTS_PATH}/{instance['id']}", token, label=label)
+                if not deleted.ok:
+                    print(f"[WARN] Exceção {exception} não cancelada: {deleted.error}")
+
+    def create(self, event: OutlookService, timeout: float = None) -> EventResult:
+        try:
+            result = self._post_event(event, self._token(), timeout=timeout)
+            if result.status == 401 and OutlookService.tokens().can_refresh:
+                result = self._post_event(event, self._token(force_refresh=True), timeout=timeout)
+        except TokenError as e:
+            return EventResult(index=0, ok=False, error=str(e), attempts=0, permanent=True)
+        OutlookService._remember([event], [result])
+        return result
+
+    def create_many(self, events: list[OutlookService], concurrency: int = 4,
+                    graph_batch: bool = False, labels: list = None) -> list[EventResult]:
+        if not events:
+            return []
+        labels = labels or list(range(len(events)))
+        try:
+            results = self._send_all(events, list(range(len(events))), self._token(), concurrency, graph_batch, labels)
+            if OutlookService._can_retry_auth(results):
+                # Token revogado/expirado antes da hora: renova uma vez e reenvia só os 401
+                rejected = [result.index for result in results if result.status == 401]
+                token = self._token(force_refresh=True)
+                for result in self._send_all(events, rejected, token, concurrency, graph_batch, labels):
+                    results[result.index] = result
+        except TokenError as e:
+            return [EventResult(index=i, ok=False, error=str(e), attempts=0, permanent=True) for i in range(len(events))]
+        OutlookService._remember(events, results)
+        return results
+
+    def _send_all(self, events: list[OutlookService], indexes: list[int], token: str, concurrency: int,
+                  graph_batch: bool, labels: list) -> list[EventResult]:
+        """Envia os eventos de `indexes` com até `concurrency` requisições simultâneas"""
+        results = [None] * len(events)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            if graph_batch:
+                # Eventos com exceções precisam do id da série: não cabem no /$batch
+                single = [i for i in indexes if events[i].exceptions]
+                batched = [i for i in indexes if not events[i].exceptions]
+                chunks = [batched[i:i + GRAPH_BATCH_LIMIT] for i in range(0, len(batched), GRAPH_BATCH_LIMIT)]
+                tasks = [pool.submit(self._post_batch, [(i, labels[i], events[i]) for i in chunk], token)
+                         for chunk in chunks]
+                tasks += [pool.submit(lambda i=i: [self._post_event(events[i], token, i, labels[i])]) for i in single]
+            else:
+                tasks = [pool.submit(lambda i=i: [self._post_event(events[i], token, i, labels[i])]) for i in indexes]
+            for task in tasks:
+                for result in task.result():
+                    results[result.index] = result
+        return [results[i] for i in indexes]
+
+    def _post_batch(self, items: list[tuple[int, object, OutlookService]], token: str) -> list[EventResult]:
+        """
+        Até GRAPH_BATCH_LIMIT eventos numa chamada ao /$batch. Cada resposta é casada pelo
+        id; só os itens com falha transitória vão para a rodada seguinte.
+        """
+        done, pending = [], {}
+        for index, label, event in items:
+            try:
+                pending[str(index)] = (index, label, self.build_body(event))
+            except ValueError as e:
+                done.append(EventResult(index=index, ok=False, error=str(e), attempts=0, permanent=True))
+        attempts = dict.fromkeys(pending, 0)
+        throttled = dict.fromkeys(pending, 0)
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+        batch_round = 0
+        while pending:
+            # O Graph conta cada sub-requisição no limite, não a chamada ao /$batch
+            self.limiter.acquire(len(pending))
+            batch_round += 1
+            for key in pending:
+                attempts[key] += 1
+            labels = [label for _, label, _ in pending.values()]
+            requests = [{"id": key, "method": "POST", "url": "/me/events",
+                         "headers": {"Content-Type": "application/json"}, "body": body}
+                        for key, (_, _, body) in pending.items()]
+
+            started = time.time_ns()
+            responses, wait = {}, None
+            try:
+                status, response_headers, data = self.pool.request(
+                    "POST", BATCH_PATH, json.dumps({"requests": requests}, ensure_ascii=False).encode("utf-8"), headers)
+            except (OSError, HTTPException) as e:
+                # Falha da chamada inteira: todos os itens ficam sem resposta nesta rodada
+                OutlookService._trace("request", started, labels, attempt=batch_round, error=str(e))
+            else:
+                OutlookService._trace("request", started, labels, attempt=batch_round, status=status)
+                if 200 <= status < 300:
+                    try:
+                        responses = {item.get("id"): item for item in json.loads(data).get("responses") or []}
+                    except (ValueError, AttributeError):
+                        responses = {}
+                else:
+                    if status == 429:
+                        for key in pending:
+                            throttled[key] += 1
+                    transient = status in TRANSIENT
+                    if not transient or batch_round > self.policy.max_retries:
+                        error = f"Microsoft Graph batch error {status}: {data.decode('utf-8', errors='replace')}"
+                        done.extend(EventResult(index=index, ok=False, status=status, error=error, attempts=attempts[key],
+                                                throttled=throttled[key], permanent=not transient)
+                                    for key, (index, _, _) in pending.items())
+                        break
+                    wait = RetryPolicy.retry_after(response_headers.get("Retry-After"))
+
+            retry = {}
+            for key, (index, label, body) in pending.items():
+                item = responses.get(key)
+                if item is None:
+                    if attempts[key] > self.policy.max_retries:
+                        done.append(EventResult(index=index, ok=False, error="Sem resposta no batch",
+                                                attempts=attempts[key], throttled=throttled[key]))
+                    else:
+                        retry[key] = (index, label, body)
+                    continue
+
+                status = int(item.get("status") or 0)
+                if status == 429:
+                    throttled[key] += 1
+                if 200 <= status < 300:
+                    done.append(EventResult(index=index, ok=True, status=status, attempts=attempts[key],
+                                            throttled=throttled[key], event_id=self._event_id(item.get("body"))))
+                    continue
+                transient = status in TRANSIENT
+                if transient and attempts[key] <= self.policy.max_retries:
+                    item_wait = RetryPolicy.retry_after((item.get("headers") or {}).get("Retry-After"))
+                    if item_wait is not None:
+                        wait = max(wait or 0.0, item_wait)
+                    retry[key] = (index, label, body)
+                else:
+                    done.append(EventResult(index=index, ok=False, status=status, attempts=attempts[key],
+                                            error=f"Microsoft Graph error {status}: {json.dumps(item.get('body'))}",
+                                            throttled=throttled[key], permanent=not transient))
+
+            if retry:
+                self._wait(wait, batch_round, labels)
+            pending = retry
+        return done
@@ -0,0 +1,496 @@
+"""
+ImportService - Importação em Lote de Eventos
+Pipeline de geradores para arquivos CSV/ICS: ler → normalizar → validar → enviar
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterator, Iterable
+import csv
+import json
+import re
+
+from data import DefaultValues
+from tool import tool
+from Service.OutlookService import OutlookService, EventResult
+from Service.Event import Event
+from Service.ConflictIndex import ConflictIndex
+from Service.Recurrence import Recurrence
+from Service.TimezoneService import TimezoneService
+
+
+# Campo do evento → nomes de coluna aceitos no CSV (comparados em minúsculas)
+CSV_COLUMNS = {
+    "subject": ("subject", "assunto"),
+    "descr": ("descr", "description", "descrição", "descricao"),
+    "content": ("content", "conteúdo", "conteudo"),
+    "date_start": ("date_start", "start", "início", "inicio"),
+    "date_end": ("date_end", "end", "término", "termino"),
+    "timezone": ("timezone", "tz"),
+    "location": ("location", "local", "localização", "localizacao"),
+    "rrule": ("rrule", "recurrence", "recorrência", "recorrencia"),
+    "exdate": ("exdate", "exceptions", "exceções", "excecoes"),
+}
+
+# Propriedade do VEVENT → campo do evento
+ICS_PROPERTIES = {
+    "SUMMARY": "subject",
+    "DESCRIPTION": "descr",
+    "DTSTART": "date_start",
+    "DTEND": "date_end",
+    "LOCATION": "location",
+    "RRULE": "rrule",
+    "EXDATE": "exdate",
+}
+
+# TZID com nome de fuso do Windows (Outlook/Exchange) → fuso IANA
+WINDOWS_ZONES = {
+    "E. South America Standard Time": "America/Sao_Paulo",
+    "SA Eastern Standard Time": "America/Cayenne",
+    "Argentina Standard Time": "America/Buenos_Aires",
+    "Pacific SA Standard Time": "America/Santiago",
+    "SA Pacific Standard Time": "America/Bogota",
+    "Central Brazilian Standard Time": "America/Cuiaba",
+    "Tocantins Standard Time": "America/Araguaina",
+    "Bahia Standard Time": "America/Bahia",
+    "Eastern Standard Time": "America/New_York",
+    "Central Standard Time": "America/Chicago",
+    "Mountain Standard Time": "America/Denver",
+    "Pacific Standard Time": "America/Los_Angeles",
+    "Central Standard Time (Mexico)": "America/Mexico_City",
+    "GMT Standard Time": "Europe/London",
+    "Greenwich Standard Time": "Atlantic/Reykjavik",
+    "W. Europe Standard Time": "Europe/Berlin",
+    "Romance Standard Time": "Europe/Paris",
+    "Central Europe Standard Time": "Europe/Budapest",
+    "GTB Standard Time": "Europe/Bucharest",
+    "Russian Standard Time": "Europe/Moscow",
+    "India Standard Time": "Asia/Calcutta",
+    "China Standard Time": "Asia/Shanghai",
+    "Tokyo Standard Time": "Asia/Tokyo",
+    "AUS Eastern Standard Time": "Australia/Sydney",
+    "UTC": "UTC",
+    "Coordinated Universal Time": "UTC",
+}
+
+# DTSTART/DTEND: 20260205T140000Z, 20260205T140000 ou 20260205 (dia inteiro)
+REGEX_ICS_DATETIME = re.compile(r'^(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})(Z)?)?$')
+
+
+@dataclass
+class ImportRow:
+    """Linha do arquivo já normalizada (ou com o motivo da rejeição)"""
+    row: int
+    # Datas já convertidas; vira OutlookService só no envio
+    event: Event = None
+    error: str = None
+    # "duplicate" ou "overlap" quando conflita com um evento conhecido
+    conflict: str = None
+    # Regra da série (quando recorrente), usada para pôr as ocorrências no índice após o envio
+    recurrence: Recurrence = None
+
+
+@dataclass
+class ImportReport:
+    """Resumo de uma importação"""
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    invalid: int = 0
+    skipped: int = 0
+    # Duplicatas não são enviadas; sobreposições são enviadas e só contadas
+    duplicates: int = 0
+    overlaps: int = 0
+    last_row: int = 0
+    # True se o core parou de responder e a importação foi interrompida
+    aborted: bool = False
+    # Amostra das falhas (limitada para manter o uso de memória constante)
+    errors: list = field(default_factory=list)
+    MAX_ERRORS = 100
+
+    def add_error(self, row: int, error: str):
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((row, error))
+
+
+@dataclass
+class ImportService:
+    """
+    Importa eventos de um arquivo CSV ou ICS sem carregar o arquivo inteiro.
+
+    Cada etapa é um gerador, então a memória depende de `batch_size` e não do
+    tamanho do arquivo. Depois de cada lote enviado, o número da última linha
+    confirmada é gravado no checkpoint; com `resume=True` uma importação
+    interrompida continua a partir dali.
+
+    Antes do envio, cada evento passa pelo ConflictIndex (eventos do cache, se
+    `store` for informado, mais os já criados do próprio arquivo) e pelas linhas
+    anteriores do mesmo lote: duplicatas exatas são puladas e sobreposições são
+    apenas contadas. Um evento só entra no índice depois que o Graph confirma a
+    criação, então uma linha que falhou não marca a mesma linha de uma nova
+    tentativa como duplicata.
+    """
+    path: str = ""
+    checkpoint_path: str = None
+    batch_size: int = 200
+    concurrency: int = 4
+    resume: bool = True
+    defaults: DefaultValues = None
+    store: object = None
+    skip_duplicates: bool = True
+
+    def __post_init__(self):
+        if self.defaults is None:
+            self.defaults = DefaultValues()
+        self.conflicts = ConflictIndex(store=self.store)
+        if self.checkpoint_path is None:
+            self.checkpoint_path = f"{self.path}.checkpoint.json"
+
+    # ═══════════════════════════════════════════════════════════════
+    # LEITURA
+    # ═══════════════════════════════════════════════════════════════
+
+    def read_rows(self) -> Iterator[tuple[int, dict]]:
+        """Escolhe o leitor pela extensão do arquivo"""
+        if self.path.lower().endswith((".ics", ".ical", ".ifb")):
+            return self.read_ics(self.path)
+        return self.read_csv(self.path)
+
+    @staticmethod
+    def read_csv(path: str) -> Iterator[tuple[int, dict]]:
+        """Gera (número da linha, campos) para cada linha de dados do CSV"""
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            header = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+            columns = {
+                key: next((header[alias] for alias in aliases if alias in header), None)
+                for key, aliases in CSV_COLUMNS.items()
+            }
+            for number, row in enumerate(reader, start=1):
+                yield number, {key: (row.get(column) or "").strip() for key, column in columns.items() if column}
+
+    @staticmethod
+    def read_ics(path: str) -> Iterator[tuple[int, dict]]:
+        """
+        Gera (número do VEVENT, campos) para cada evento do arquivo iCalendar.
+        Componentes aninhados no VEVENT (VALARM, ...) são ignorados até o END
+        correspondente, para que as propriedades deles não sobrescrevam as do evento.
+        """
+        number = 0
+        event = None
+        depth = 0
+        for line in ImportService._unfold(path):
+            upper = line.upper()
+            if event is None:
+                if upper == "BEGIN:VEVENT":
+                    event = {}
+                continue
+            if upper.startswith("BEGIN:"):
+                depth += 1
+            elif upper.startswith("END:"):
+                if depth:
+                    depth -= 1
+                elif upper == "END:VEVENT":
+                    number += 1
+                    yield number, event
+                    event = None
+            elif not depth and ":" in line:
+                name, value = line.split(":", 1)
+                prop, *params = name.split(";")
+                key = ICS_PROPERTIES.get(prop.upper())
+                if key is None:
+                    continue
+                if key in ("date_start", "date_end"):
+                    tzid = next((p.split("=", 1)[1].strip('"') for p in params if p.upper().startswith("TZID=")), None)
+                    zone = ImportService._ics_zone(tzid) if tzid else None
+                    value = ImportService._ics_datetime(value, zone)
+                    if tzid and zone is None:
+                        # Fuso não resolvido: a linha é rejeitada em _build_row
+                        event["timezone"] = tzid
+                    elif zone and key == "date_start":
+                        event.setdefault("timezone", zone)
+                elif key == "exdate" and key in event:
+                    # EXDATE pode se repetir: as datas são acumuladas
+                    value = f"{event[key]},{value}"
+                elif key not in ("rrule", "exdate"):
+                    value = ImportService._ics_text(value)
+                event[key] = value
+
+    @staticmethod
+    def _unfold(path: str) -> Iterator[str]:
+        """Junta as linhas dobradas do ICS (continuação começa com espaço ou tab)"""
+        pending = None
+        with open(path, encoding="utf-8-sig") as file:
+            for raw in file:
+                line = raw.rstrip("\r\n")
+                if line[:1] in (" ", "\t") and pending is not None:
+                    pending += line[1:]
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = line
+        if pending is not None:
+            yield pending
+
+    @staticmethod
+    def _ics_text(value: str) -> str:
+        """Remove os escapes de texto do iCalendar"""
+        return (value.replace("\\n", "\n").replace("\\N", "\n")
+                .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+    @staticmethod
+    def _ics_datetime(value: str, zone: str = None) -> str:
+        """Converte DTSTART/DTEND do ICS (no fuso IANA `zone`, se houver) para um formato aceito por parse_user_datetime"""
+        match = REGEX_ICS_DATETIME.match(value.strip())
+        if not match:
+            return value.strip()
+        year, month, day, hour, minute, second, utc = match.groups()
+        if hour is None:
+            return f"{year}-{month}-{day} 0"
+        iso = f"{year}-{month}-{day}T{hour}:{minute}:{second}"
+        if utc:
+            return iso + "Z"
+        if zone:
+            return tool.to_rfc3339(datetime.fromisoformat(iso), zone)
+        return iso
+
+    @staticmethod
+    def _ics_zone(tzid: str) -> str:
+        """Fuso IANA do TZID (nomes do Windows são traduzidos); None se desconhecido"""
+        zone = WINDOWS_ZONES.get(tzid, tzid)
+        return zone if TimezoneService.is_valid(zone) else None
+
+    # ═══════════════════════════════════════════════════════════════
+    # NORMALIZAÇÃO E VALIDAÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def normalize(self, rows: Iterable[tuple[int, dict]]) -> Iterator[ImportRow]:
+        """
+        Converte as datas em lotes (tool.parse_many) e monta os eventos.
+
+        O horário de cada linha é interpretado no fuso do próprio evento (coluna
+        timezone ou o padrão), então as linhas do lote são agrupadas por fuso.
+        """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                return
+            by_zone: dict[str, list[int]] = {}
+            for position, (_, fields) in enumerate(chunk):
+                by_zone.setdefault(self._timezone(fields), []).append(position)
+            starts = [""] * len(chunk)
+            for zone, positions in by_zone.items():
+                if not TimezoneService.is_valid(zone):
+                    continue
+                parsed = tool.parse_many((chunk[position][1].get("date_start", "") for position in positions), timezone=zone)
+                for position, date_start in zip(positions, parsed):
+                    starts[position] = date_start
+            for (number, fields), date_start in zip(chunk, starts):
+                yield self._build_row(number, fields, date_start)
+
+    def _timezone(self, fields: dict) -> str:
+        return fields.get("timezone") or self.defaults.TIMEZONE
+
+    def _build_row(self, number: int, fields: dict, date_start: str) -> ImportRow:
+        if not fields.get("subject"):
+            return ImportRow(row=number, error="Assunto vazio")
+        timezone = self._timezone(fields)
+        if not TimezoneService.is_valid(timezone):
+            return ImportRow(row=number, error=f"Timezone desconhecido: {timezone!r}")
+        # As datas são convertidas uma única vez aqui; o resto do pipeline usa os datetimes
+        try:
+            start = datetime.fromisoformat(date_start)
+        except ValueError:
+            start = None
+        if start is None or start.tzinfo is None:
+            return ImportRow(row=number, error=f"Data de início inválida: {fields.get('date_start')!r}")
+
+        raw_end = fields.get("date_end")
+        if raw_end:
+            # Término só com hora usa o dia do início
+            try:
+                end = datetime.fromisoformat(tool.parse_user_datetime(raw_end, base_date=date_start, timezone=timezone))
+            except ValueError:
+                end = None
+            if end is None or end.tzinfo is None:
+                return ImportRow(row=number, error=f"Data de término inválida: {raw_end!r}")
+        else:
+            end = tool.to_zone(start + timedelta(hours=self.defaults.EVENT_DURATION_HOURS), timezone)
+        end = tool.ensure_end_after_start(start, end, timezone)
+
+        event_fields = dict(
+            subject=fields["subject"],
+            descr=fields.get("descr", ""),
+            content=fields.get("content") or self.defaults.CONTENT,
+            start=start,
+            end=end,
+            timezone=timezone,
+            location=fields.get("location") or self.defaults.LOCATION
+        )
+        if not fields.get("rrule"):
+            return ImportRow(row=number, event=Event(**event_fields))
+
+        # Série recorrente: um único evento com `recurrence` no lugar de uma linha por ocorrência
+        exdates = fields.get("exdate", "")
+        rule = fields["rrule"] + (f";EXDATE={exdates}" if exdates else "")
+        try:
+            recurrence = Recurrence.from_rrule(rule)
+        except ValueError as e:
+            return ImportRow(row=number, error=f"Recorrência inválida: {e}")
+        return ImportRow(row=number, event=Event.recurring(recurrence, **event_fields))
+
+    @staticmethod
+    def validate(rows: Iterable[ImportRow]) -> Iterator[ImportRow]:
+        """Marca como inválidas as linhas com intervalo de datas incorreto"""
+        for row in rows:
+            if row.event is not None:
+                is_valid, error = tool.validate_date_range(row.event.start, row.event.end)
+                if not is_valid:
+                    row = ImportRow(row=row.row, error=error)
+            yield row
+
+    def detect_conflicts(self, rows: Iterable[ImportRow]) -> Iterator[ImportRow]:
+        """
+        Marca duplicatas e sobreposições de um lote, contra os eventos conhecidos e
+        contra as linhas anteriores do próprio lote (que ainda não foram enviadas).
+        """
+        batch = ConflictIndex()
+        for row in rows:
+            if row.event is None:
+                yield row
+                continue
+
+            if row.event.recurrence:
+                row.recurrence = Recurrence.from_graph(row.event.recurrence, row.event.exceptions)
+            conflict = self._check(self.conflicts, row)
+            if conflict is None or conflict.kind != "duplicate":
+                # Duplicata tem prioridade sobre sobreposição, venha de onde vier
+                in_batch = self._check(batch, row)
+                if in_batch is not None and (conflict is None or in_batch.kind == "duplicate"):
+                    conflict = in_batch
+            if conflict is not None:
+                row.conflict = conflict.kind
+                row.error = f"Conflita com '{conflict.subject}' ({conflict.date_start} → {conflict.date_end})"
+
+            if row.conflict != "duplicate":
+                self._index(batch, row)
+            yield row
+
+    @staticmethod
+    def _check(index: ConflictIndex, row: ImportRow):
+        if row.recurrence is not None:
+            return index.check_series(row.event, row.recurrence)
+        return index.check(row.event)
+
+    @staticmethod
+    def _index(index: ConflictIndex, row: ImportRow):
+        if row.recurrence is not None:
+            index.add_series(row.event, row.recurrence)
+        else:
+            index.add(row.event)
+
+    # ═══════════════════════════════════════════════════════════════
+    # CHECKPOINT
+    # ═══════════════════════════════════════════════════════════════
+
+    def load_checkpoint(self) -> int:
+        """Última linha confirmada de uma importação anterior do mesmo arquivo (0 se nenhuma)"""
+        if not self.resume or not os.path.exists(self.checkpoint_path):
+            return 0
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        if checkpoint.get("source") != os.path.abspath(self.path):
+            return 0
+        return int(checkpoint.get("last_row", 0))
+
+    def save_checkpoint(self, last_row: int):
+        """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+        tool.atomic_write(self.checkpoint_path, json.dumps({"source": os.path.abspath(self.path), "last_row": last_row}))
+
+    def clear_checkpoint(self):
+        """Remove o checkpoint ao fim de uma importação completa"""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # ═══════════════════════════════════════════════════════════════
+    # EXECUÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def run(self, on_progress=None) -> ImportReport:
+        """
+        Executa o pipeline completo.
+
+        Args:
+            on_progress: Callback opcional chamado com o ImportReport após cada lote
+
+        Returns:
+            ImportReport com os totais da importação
+        """
+        report = ImportReport()
+        start_after = self.load_checkpoint()
+        report.last_row = start_after
+
+        rows = ((n, fields) for n, fields in self.read_rows() if n > start_after)
+        report.skipped = start_after
+        pipeline = self.validate(self.normalize(rows))
+
+        while True:
+            chunk = list(self.detect_conflicts(islice(pipeline, self.batch_size)))
+            if not chunk:
+                break
+
+            valid = []
+            for row in chunk:
+                if row.event is None:
+                    report.invalid += 1
+                    report.add_error(row.row, row.error)
+                    continue
+                if row.conflict == "duplicate":
+                    report.duplicates += 1
+                    if self.skip_duplicates:
+                        continue
+                elif row.conflict == "overlap":
+                    report.overlaps += 1
+                valid.append(row)
+
+            events = [row.event.to_service() for row in valid]
+            results: list[EventResult] = OutlookService.create_many(events, self.concurrency,
+                                                                    labels=[f"linha {row.row}" for row in valid])
+            unacknowledged = None
+            for row, result in zip(valid, results):
+                if not result.acknowledged:
+                    unacknowledged = row.row if unacknowledged is None else min(unacknowledged, row.row)
+                    continue
+                report.submitted += 1
+                if result.ok:
+                    report.succeeded += 1
+                    # Criado no Graph: as próximas linhas (e lotes) conflitam com ele
+                    self._index(self.conflicts, row)
+                else:
+                    report.failed += 1
+                    report.add_error(row.row, result.error)
+
+            if unacknowledged is not None:
+                # O core parou no meio do lote: o checkpoint fica antes da primeira linha sem resposta
+                report.aborted = True
+                report.last_row = unacknowledged - 1
+                report.add_error(unacknowledged, "Core parou de responder; importação interrompida")
+                self.save_checkpoint(report.last_row)
+                return report
+
+            # Lote inteiro respondido pelo core: avança o checkpoint
+            report.last_row = chunk[-1].row
+            self.save_checkpoint(report.last_row)
+            if on_progress is not None:
+                on_progress(report)
+
+        self.clear_checkpoint()
+        return report
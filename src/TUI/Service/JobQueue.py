@@ -0,0 +1,326 @@
+"""
+JobQueue - Fila Persistente de Envios
+Eventos gravados em SQLite (WAL) antes do envio e entregues por um pool de threads,
+com pelo menos uma entrega e idempotência pelo transactionId do Graph
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from data import QueueConfig
+from Service.OutlookService import OutlookService, EventResult
+
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    """Um envio na fila; `key` é também o transactionId do evento no Graph"""
+    id: int
+    key: str
+    payload: dict
+    state: str = PENDING
+    # Tentativas já iniciadas (também serve de token de posse: ver JobQueue.complete)
+    attempts: int = 0
+    status: int = None
+    error: str = None
+    event_id: str = None
+    created_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, FAILED)
+
+    def event(self) -> OutlookService:
+        return OutlookService(**self.payload)
+
+
+@dataclass
+class JobQueue:
+    """
+    Fila de eventos em SQLite (modo WAL, synchronous=FULL).
+
+    O evento é gravado antes de qualquer tentativa de envio, então um crash ou
+    Ctrl+C não perde nada: o que não terminou volta para a fila. Quem pega um job
+    (`claim`) recebe uma concessão de `lease_seconds`; se o processo morrer no meio,
+    a concessão expira e outro worker pega o job de novo. Como o transactionId é o
+    mesmo em todas as tentativas, o Graph não cria o evento duas vezes.
+
+    `available_at` guarda quando o job pode ser pego: agora para novos, o fim do
+    backoff para retentativas e o fim da concessão para os que estão em andamento.
+    """
+    path: str = None
+
+    _conn: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.path is None:
+            self.path = QueueConfig().DB_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Transações explícitas (BEGIN IMMEDIATE): vários processos podem usar a mesma fila
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                key          TEXT NOT NULL UNIQUE,
+                payload      TEXT NOT NULL,
+                state        TEXT NOT NULL DEFAULT 'pending',
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                status       INTEGER,
+                error        TEXT,
+                event_id     TEXT,
+                created_at   REAL NOT NULL,
+                updated_at   REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (state, available_at);
+        """)
+
+    def close(self):
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(id=row["id"], key=row["key"], payload=json.loads(row["payload"]), state=row["state"],
+                   attempts=row["attempts"], status=row["status"], error=row["error"],
+                   event_id=row["event_id"], created_at=row["created_at"])
+
+    # ═══════════════════════════════════════════════════════════════
+    # ENFILEIRAR
+    # ═══════════════════════════════════════════════════════════════
+
+    def enqueue(self, event: OutlookService) -> Job:
+        return self.enqueue_many([event])[0]
+
+    def enqueue_many(self, events: list[OutlookService]) -> list[Job]:
+        """
+        Grava os eventos numa única transação.
+
+        Cada evento recebe um transaction_id (se ainda não tiver), que vira a chave do
+        job; enfileirar de novo um evento com a mesma chave devolve o job existente.
+        """
+        now = time.time()
+        for event in events:
+            event.transaction_id = event.transaction_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (key, payload, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(event.transaction_id, json.dumps(event.to_payload(), ensure_ascii=False), now, now, now)
+                 for event in events])
+        return [self.get(event.transaction_id) for event in events]
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSUMIR
+    # ═══════════════════════════════════════════════════════════════
+
+    def claim(self, limit: int = 1, lease_seconds: float = 120) -> list[Job]:
+        """Pega até `limit` jobs prontos (novos, com backoff vencido ou com concessão expirada)"""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE state IN ('pending', 'running') AND available_at <= ? "
+                "ORDER BY available_at, id LIMIT ?", (now, limit)).fetchall()
+            if not rows:
+                return []
+            conn.executemany(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, available_at = ?, updated_at = ? "
+                "WHERE id = ?", [(now + lease_seconds, now, row["id"]) for row in rows])
+        jobs = [self._job(row) for row in rows]
+        for job in jobs:
+            job.state, job.attempts = RUNNING, job.attempts + 1
+        return jobs
+
+    def complete(self, job: Job, result: EventResult) -> bool:
+        return self._finish(job, DONE, result.status, None, result.event_id)
+
+    def fail(self, job: Job, result: EventResult) -> bool:
+        return self._finish(job, FAILED, result.status, result.error, None)
+
+    def retry(self, job: Job, result: EventResult, delay: float) -> bool:
+        """Devolve o job para a fila, disponível de novo daqui a `delay` segundos"""
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET state = 'pending', available_at = ?, status = ?, error = ?, updated_at = ? "
+                "WHERE id = ? AND state = 'running' AND attempts = ?",
+                (now + delay, result.status, result.error, now, job.id, job.attempts)).rowcount
+        if updated:
+            job.state, job.status, job.error = PENDING, result.status, result.error
+        return updated == 1
+
+    def _finish(self, job: Job, state: str, status: int, error: str, event_id: str) -> bool:
+        """
+        Grava o resultado se o job ainda for desta tentativa.
+
+        Se a concessão expirou e outro worker pegou o job, `attempts` mudou e o
+        resultado atrasado é descartado (a outra tentativa grava o dela).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET state = ?, status = ?, error = ?, event_id = ?, updated_at = ? "
+                "WHERE id = ? AND state = 'running' AND attempts = ?",
+                (state, status, error, event_id, now, job.id, job.attempts)).rowcount
+        if updated:
+            job.state, job.status, job.error, job.event_id = state, status, error, event_id
+        return updated == 1
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONSULTAS E MANUTENÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def get(self, key: str) -> Job:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+        return self._job(row) if row else None
+
+    def counts(self) -> dict[str, int]:
+        """Quantidade de jobs por estado"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, **{state: count for state, count in rows}}
+
+    def failed(self, limit: int = 20) -> list[Job]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs WHERE state = 'failed' ORDER BY updated_at DESC LIMIT ?",
+                                      (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Remove jobs concluídos há mais de `older_than_seconds` (os com falha ficam para consulta)"""
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM jobs WHERE state = 'done' AND updated_at < ?",
+                                (time.time() - older_than_seconds,)).rowcount
+
+
+@dataclass
+class JobRunner:
+    """
+    Pool de threads que esvazia a JobQueue pelo worker persistente do core.
+
+    Cada thread envia um job por vez; como o worker aceita várias requisições em
+    andamento, o throughput cresce com `workers` até o rate limit do core. Falhas
+    transitórias voltam para a fila com backoff exponencial; permanentes (ou após
+    `max_attempts`) ficam como `failed`.
+    """
+    queue: JobQueue
+    workers: int = None
+    lease_seconds: float = None
+    max_attempts: int = None
+    poll_interval: float = 0.5
+    # Chamado após cada tentativa: on_result(job, result, seconds)
+    on_result: object = None
+
+    _threads: list = field(default_factory=list, init=False, repr=False)
+    _stopping: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _changed: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+
+    def __post_init__(self):
+        config = QueueConfig()
+        self.workers = max(1, self.workers or config.WORKERS)
+        self.lease_seconds = self.lease_seconds or config.LEASE_SECONDS
+        self.max_attempts = self.max_attempts or config.MAX_ATTEMPTS
+
+    def start(self, until_empty: bool = False):
+        """Inicia as threads; com `until_empty` elas saem quando não houver job pronto"""
+        self._stopping.clear()
+        self._threads = [threading.Thread(target=self._loop, args=(until_empty,), daemon=True)
+                         for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = None) -> bool:
+        """
+        Para de pegar jobs e espera os envios em andamento terminarem.
+
+        Com `timeout`, espera no máximo esse tempo no total: as threads são daemon, e o
+        job de quem não terminou volta para a fila quando o lease vencer.
+
+        Returns:
+            True quando todas as threads terminaram
+        """
+        self._stopping.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        stopped = not any(thread.is_alive() for thread in self._threads)
+        self._threads = []
+        return stopped
+
+    def drain(self):
+        """Envia tudo que está pronto na fila e retorna"""
+        self.start(until_empty=True)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def wait_for(self, key: str, timeout: float = None) -> Job:
+        """Espera o job terminar (done/failed); devolve o estado atual se o tempo acabar"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self.queue.get(key)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if job is None or job.finished or (remaining is not None and remaining <= 0):
+                    return job
+                self._changed.wait(remaining if remaining is not None else self.poll_interval * 4)
+
+    def _loop(self, until_empty: bool):
+        while not self._stopping.is_set():
+            jobs = self.queue.claim(1, self.lease_seconds)
+            if not jobs:
+                if until_empty:
+                    return
+                self._stopping.wait(self.poll_interval)
+                continue
+            self.process(jobs[0])
+
+    def process(self, job: Job):
+        """Uma tentativa de envio do job"""
+        started = time.perf_counter()
+        try:
+            result = job.event().create(timeout=self.lease_seconds * 0.9)
+        except Exception as e:
+            result = EventResult(index=0, ok=False, error=str(e), acknowledged=False)
+
+        if result.ok:
+            self.queue.complete(job, result)
+        elif result.permanent or job.attempts >= self.max_attempts:
+            self.queue.fail(job, result)
+        else:
+            self.queue.retry(job, result, self.backoff(job.attempts))
+
+        if self.on_result:
+            self.on_result(job, result, time.perf_counter() - started)
+        with self._changed:
+            self._changed.notify_all()
+
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        """1s, 2s, 4s... até 5 minutos"""
+        return min(300.0, 2.0 ** (attempts - 1))
@@ -0,0 +1,168 @@
+"""
+Metrics - Contadores e Histogramas no Formato Prometheus
+Registro mínimo (sem dependências) exportado como texto em /metrics
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import threading
+
+
+# Latência de envio: do milissegundo (validação) ao Retry-After longo do Graph
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+@dataclass
+class Counter:
+    """
+    Valor que só cresce (ex: eventos enviados), opcionalmente por labels.
+
+    Com `collect`, o valor é lido na hora da coleta de um contador mantido em
+    outro lugar (ex: CoreWorker.restarts).
+    """
+    name: str
+    help: str
+    labelnames: tuple = ()
+    collect: object = None
+    _values: dict = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counter só aumenta")
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.labelnames), 0)
+
+    def samples(self) -> list[str]:
+        if self.collect:
+            return [f"{self.name} {_number(self.collect())}"]
+        with self._lock:
+            values = dict(self._values) or ({(): 0} if not self.labelnames else {})
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in sorted(values.items())]
+
+
+@dataclass
+class Gauge:
+    """
+    Valor que sobe e desce (ex: tamanho da fila).
+
+    Com `collect`, o valor é lido na hora da coleta (ex: queue.qsize).
+    """
+    name: str
+    help: str
+    collect: object = None
+    _value: float = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    kind = "gauge"
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def value(self) -> float:
+        return self.collect() if self.collect else self._value
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_number(self.value())}"]
+
+
+@dataclass
+class Histogram:
+    """Distribuição em buckets cumulativos (ex: latência de envio em segundos)"""
+    name: str
+    help: str
+    buckets: tuple = LATENCY_BUCKETS
+    _counts: list = field(default=None, init=False, repr=False)
+    _sum: float = field(default=0.0, init=False, repr=False)
+    _count: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    kind = "histogram"
+
+    def __post_init__(self):
+        self.buckets = tuple(sorted(self.buckets))
+        # Um contador por bucket + o +Inf; acumulados só na exportação
+        self._counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        lines, cumulative = [], 0
+        for bound, amount in zip(self.buckets + (float("inf"),), counts):
+            cumulative += amount
+            lines.append(f'{self.name}_bucket{{le="{_number(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_number(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+@dataclass
+class Registry:
+    """Conjunto de métricas exportadas juntas"""
+    metrics: list = field(default_factory=list)
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = (), collect=None) -> Counter:
+        return self.register(Counter(name, help, tuple(labelnames), collect))
+
+    def gauge(self, name: str, help: str, collect=None) -> Gauge:
+        return self.register(Gauge(name, help, collect))
+
+    def histogram(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        """Formato de exposição em texto do Prometheus (versão 0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -1,6 +1,73 @@
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import ClassVar, Iterator, TYPE_CHECKING
 import subprocess
+import tempfile
+import atexit
+import json
+import time
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import BackendConfig
+from Service.CoreWorker import CoreWorker, CoreWorkerError
+from Service.TokenService import TokenService, TokenError
+from Service.Tracer import Tracer
+
+if TYPE_CHECKING:
+    import asyncio
+    from Service.JobQueue import JobQueue, Job
+    from Service.SubmitBackend import SubmitBackend
+
+
+@dataclass
+class EventResult:
+    """Resultado da criação de um evento (batch ou worker)"""
+    index: int
+    ok: bool
+    status: int = None
+    error: str = None
+    # Tentativas feitas pelo core (retries de 429/5xx incluídos)
+    attempts: int = 1
+    # Respostas 429 (throttling do Graph) recebidas pelo core até o resultado final
+    throttled: int = 0
+    # True quando repetir não adianta (ex: 400/401/403 ou evento inválido)
+    permanent: bool = False
+    # False quando o core não chegou a responder por este evento (ex: processo morreu)
+    acknowledged: bool = True
+    # Id do evento no Graph (quando criado com sucesso)
+    event_id: str = None
+
+
+@dataclass
+class CoreStream:
+    """
+    Saída NDJSON de um subcomando do core (OutlookService.stream_core).
+    Iterar entrega cada linha já como dict, conforme o core escreve; ao fim do
+    `with`, returncode e stderr estão preenchidos.
+    """
+    proc: subprocess.Popen = None
+    returncode: int = None
+    # Stderr do core sem as linhas de span (ou o erro ao iniciar o processo)
+    stderr: str = ""
+
+    def __iter__(self) -> Iterator[dict]:
+        if self.proc is None:
+            return
+        for line in self.proc.stdout:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    @property
+    def error(self) -> str:
+        """None se o core terminou com sucesso; senão o stderr dele (ou o código de saída)"""
+        if self.returncode == 0:
+            return None
+        return self.stderr or f"core saiu com código {self.returncode}"
+
 
 @dataclass
 class OutlookService:
@@ -11,30 +78,498 @@ class OutlookService:
     date_end: str = ""
     timezone: str = "America/Sao_Paulo"
     location: str = "Online"
-    
-    def run_outlookfusion(self) -> None:
-        try:
-            # Caminho relativo ao diretório do script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            core_dir = os.path.join(script_dir, "..", "..", "core")
-            core_path = os.path.join(core_dir, "target", "debug", "core")
-            
-            cmd = [
-                core_path,
-                "create",
-                "--subject", self.subject,
-                "--content", self.content,
-                "--date-start", self.date_start,
-                "--date-end", self.date_end,
-                "--timezone", self.timezone,
-                "--location", self.location
-            ]
-            
-            if self.descr:
-                cmd.extend(["--descr", self.descr])
-            
+    # Payload `recurrence` do Graph (ver Recurrence.to_graph) e datas canceladas da série
+    recurrence: dict = None
+    exceptions: list = None
+    # Chave de idempotência (transactionId do Graph): reenvios não duplicam o evento
+    transaction_id: str = None
+
+    # Worker persistente compartilhado (iniciado sob demanda)
+    _worker: ClassVar[CoreWorker] = None
+    # Cache local (EventStore) alimentado a cada evento criado, se configurado
+    _store: ClassVar[object] = None
+    # Token compartilhado por todos os processos do core (criado sob demanda)
+    _tokens: ClassVar[TokenService] = None
+    # Coleta de spans (TUI + core com OUTLOOK_TRACE=1), se configurada
+    _tracer: ClassVar[Tracer] = None
+    # Fila persistente de envios (criada sob demanda)
+    _jobs: ClassVar[object] = None
+    # Caminho de envio ao Graph (SubmitBackend, escolhido pelo BackendConfig sob demanda)
+    _backend: ClassVar[object] = None
+    _core_path: ClassVar[str] = None
+
+    @staticmethod
+    def core_dir() -> str:
+        """Diretório do core Rust (onde fica o .env)"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(script_dir, "..", "..", "core")
+
+    @classmethod
+    def core_path(cls) -> str:
+        """
+        Caminho do binário do core: OUTLOOK_CORE_PATH / BackendConfig.CORE_PATH, senão o
+        build de release e depois o de debug (o de debug é o devolvido se nenhum existir)
+        """
+        if cls._core_path is None:
+            configured = os.environ.get("OUTLOOK_CORE_PATH") or BackendConfig().CORE_PATH
+            target = os.path.join(cls.core_dir(), "target")
+            candidates = [os.path.join(target, profile, "core") for profile in ("release", "debug")]
+            cls._core_path = configured or next((path for path in candidates if os.path.exists(path)), candidates[-1])
+        return cls._core_path
+
+    @classmethod
+    def backend(cls) -> "SubmitBackend":
+        """Backend de envio compartilhado, criado na primeira chamada a partir do BackendConfig"""
+        if cls._backend is None:
+            from Service.SubmitBackend import SubmitBackend
+            cls._backend = SubmitBackend.from_config(BackendConfig())
+        return cls._backend
+
+    @classmethod
+    def use_backend(cls, backend):
+        """Troca o backend de envio (None volta à escolha pelo BackendConfig)"""
+        if cls._backend is not None and cls._backend is not backend:
+            cls._backend.close()
+        cls._backend = backend
+
+    @classmethod
+    def tokens(cls) -> TokenService:
+        """TokenService compartilhado (o .env do core é lido no máximo uma vez)"""
+        if cls._tokens is None:
+            cls._tokens = TokenService(env_file=os.path.join(cls.core_dir(), ".env"))
+        return cls._tokens
+
+    @classmethod
+    def use_tokens(cls, tokens: TokenService):
+        cls._tokens = tokens
+
+    @classmethod
+    def use_tracer(cls, tracer: Tracer):
+        """Passa a medir spawn/espera e a coletar os spans do core (None desliga)"""
+        cls._tracer = tracer
+
+    @classmethod
+    def _trace(cls, name: str, started: int, events=(), **fields):
+        if cls._tracer is not None:
+            cls._tracer.record(name, started, time.time_ns(), events, **fields)
+
+    @classmethod
+    def _core_errors(cls, stderr: str, labels=None, default=()) -> str:
+        """Stderr do core sem as linhas de span (registradas no tracer, se houver)"""
+        if cls._tracer is None:
+            return stderr.strip()
+        return cls._tracer.add_core_output(stderr, labels, default)
+
+    @classmethod
+    @contextmanager
+    def stream_core(cls, cmd: list[str], default=()) -> Iterator[CoreStream]:
+        """
+        Executa um subcomando do core que responde em NDJSON (ex: sync, schedule).
+
+        Uso:
+            with OutlookService.stream_core(cmd, default="sync") as stream:
+                for item in stream:
+                    ...
+            if stream.error: ...
+
+        Args:
+            cmd: Comando completo (binário do core + argumentos)
+            default: Rótulo dos spans do core no tracer
+        """
+        stream = CoreStream()
+        # stderr vai para um arquivo temporário para não travar o core se o pipe encher
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                stream.proc = subprocess.Popen(cmd, cwd=cls.core_dir(), env=cls.core_env(),
+                                               stdout=subprocess.PIPE, stderr=stderr, text=True, encoding="utf-8")
+            except OSError as e:
+                print(f"[ERROR] Erro ao executar OutlookFusionCLI: {e}")
+                stream.stderr = str(e)
+                yield stream
+                return
+
+            with stream.proc:
+                yield stream
+            stream.returncode = stream.proc.returncode
+            stderr.seek(0)
+            stream.stderr = cls._core_errors(stderr.read().decode("utf-8", errors="replace"), default=default)
+
+    @classmethod
+    def core_env(cls, force_refresh: bool = False) -> dict:
+        """
+        Ambiente para os processos do core com OUTLOOK_TOKEN já resolvido.
+
+        Returns:
+            None se não houver token (o core tenta o próprio .env e reporta o erro)
+        """
+        try:
+            token = cls.tokens().get_token(force_refresh)
+        except TokenError as e:
+            print(f"[ERROR] Erro ao obter token: {e}")
+            return None
+        env = {**os.environ, "OUTLOOK_TOKEN": token}
+        if cls._tracer is not None:
+            env["OUTLOOK_TRACE"] = "1"
+        return env
+
+    @classmethod
+    def _can_retry_auth(cls, results: list[EventResult]) -> bool:
+        """401 com um token que pode ser renovado: vale repetir uma vez com token novo"""
+        return any(result.status == 401 for result in results) and cls.tokens().can_refresh
+
+    @classmethod
+    def jobs(cls) -> "JobQueue":
+        """Fila persistente compartilhada (~/.outlookfusion/queue.db)"""
+        if cls._jobs is None:
+            from Service.JobQueue import JobQueue
+            cls._jobs = JobQueue()
+        return cls._jobs
+
+    @classmethod
+    def use_jobs(cls, jobs):
+        cls._jobs = jobs
+
+    def enqueue(self) -> "Job":
+        """Grava o evento na fila persistente; o envio fica com um JobRunner"""
+        return OutlookService.jobs().enqueue(self)
+
+    @classmethod
+    def use_store(cls, store):
+        """Passa a gravar no EventStore todo evento criado com sucesso (None desliga)"""
+        cls._store = store
+
+    @classmethod
+    def _remember(cls, events: list["OutlookService"], results: list[EventResult]):
+        if cls._store is None:
+            return
+        created = [(event, result.event_id, None) for event, result in zip(events, results) if result.ok]
+        if created:
+            try:
+                cls._store.upsert_many(created)
+            except Exception as e:
+                print(f"[ERROR] Erro ao gravar no cache local: {e}")
+
+    @staticmethod
+    def recurring(recurrence, **fields) -> "OutlookService":
+        """Evento único com uma série (Recurrence) no lugar de N eventos avulsos"""
+        event = OutlookService(**fields)
+        event.recurrence = recurrence.to_graph(event.date_start, event.timezone)
+        event.exceptions = list(recurrence.exceptions) or None
+        return event
+
+    def to_payload(self) -> dict:
+        """Evento no formato aceito pelo `core create-batch` (uma linha NDJSON)"""
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+    def build_command(self) -> list[str]:
+        """Linha de comando do `core create` para este evento"""
+        cmd = [
+            OutlookService.core_path(),
+            "create",
+            "--subject", self.subject,
+            "--content", self.content,
+            "--date-start", self.date_start,
+            "--date-end", self.date_end,
+            "--timezone", self.timezone,
+            "--location", self.location
+        ]
+
+        if self.descr:
+            cmd.extend(["--descr", self.descr])
+        if self.recurrence:
+            cmd.extend(["--recurrence", json.dumps(self.recurrence)])
+        for exception in self.exceptions or []:
+            cmd.extend(["--exception", exception])
+        if self.transaction_id:
+            cmd.extend(["--transaction-id", self.transaction_id])
+        return cmd
+
+    def run_outlookfusion(self, index: int = 0) -> EventResult:
+        env = OutlookService.core_env()
+        started = time.time_ns()
+        try:
             # Executa no diretório do core para que o .env seja encontrado
-            a = subprocess.run(cmd, check=True, cwd=core_dir,capture_output=True)
-            print(a)
-        except subprocess.CalledProcessError as e:
-            print(f"[ERROR] Erro ao executar OutlookFusionCLI: {e}")
\ No newline at end of file
+            proc = subprocess.Popen(self.build_command(), cwd=OutlookService.core_dir(), env=env,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"[ERROR] Erro ao executar OutlookFusionCLI: {e}")
+            return EventResult(index=index, ok=False, error=str(e))
+        OutlookService._trace("spawn", started, index)
+
+        started = time.time_ns()
+        _, stderr = proc.communicate()
+        OutlookService._trace("wait", started, index, exit=proc.returncode)
+
+        error = OutlookService._core_errors(stderr.decode("utf-8", errors="replace"), default=index)
+        if proc.returncode != 0:
+            print(f"[ERROR] Erro ao executar OutlookFusionCLI: core saiu com código {proc.returncode}")
+            return EventResult(index=index, ok=False, error=error or f"core saiu com código {proc.returncode}")
+        result = EventResult(index=index, ok=True)
+        OutlookService._remember([self], [result])
+        return result
+
+    def create(self, timeout: float = None) -> EventResult:
+        """Cria o evento pelo backend configurado (worker do core ou HTTP direto)"""
+        return OutlookService.backend().create(self, timeout=timeout)
+
+    @staticmethod
+    def create_many(events: list["OutlookService"], concurrency: int = 4,
+                    graph_batch: bool = False, labels: list = None) -> list[EventResult]:
+        """
+        Cria vários eventos pelo backend configurado, no máximo `concurrency` envios
+        ao mesmo tempo. Com `graph_batch=True` vão até 20 eventos por chamada ao /$batch
+        do Graph, reenviando só os itens que falharam.
+
+        Args:
+            labels: Rótulo de cada evento nos spans do tracer (padrão: o índice na lista)
+
+        Returns:
+            Um EventResult por evento, na mesma ordem da lista recebida
+        """
+        return OutlookService.backend().create_many(events, concurrency=concurrency, graph_batch=graph_batch,
+                                                    labels=labels)
+
+    @staticmethod
+    def create_many_core(events: list["OutlookService"], concurrency: int = 4,
+                         graph_batch: bool = False, labels: list = None) -> list[EventResult]:
+        """
+        Cria vários eventos com um único processo do core.
+
+        Os eventos são enviados como NDJSON no stdin do `core create-batch`,
+        que reutiliza o mesmo cliente HTTP (pool de conexões) para todos.
+        Com `graph_batch=True` o core agrupa até 20 eventos por chamada ao
+        /$batch do Graph e reenvia só os itens que falharam.
+
+        Args:
+            labels: Rótulo de cada evento nos spans do tracer (padrão: o índice na lista)
+
+        Returns:
+            Um EventResult por evento, na mesma ordem da lista recebida
+        """
+        if not events:
+            return []
+
+        cmd = [OutlookService.core_path(), "create-batch", "--concurrency", str(concurrency)]
+        if graph_batch:
+            cmd.append("--graph-batch")
+
+        labels = labels or list(range(len(events)))
+        ordered = OutlookService._run_batch(events, cmd, OutlookService.core_env(), labels)
+        if OutlookService._can_retry_auth(ordered):
+            # Token revogado/expirado antes da hora: renova e reenvia só os 401
+            rejected = [result.index for result in ordered if result.status == 401]
+            retried = OutlookService._run_batch([events[i] for i in rejected], cmd,
+                                                OutlookService.core_env(force_refresh=True),
+                                                [labels[i] for i in rejected])
+            for index, result in zip(rejected, retried):
+                result.index = index
+                ordered[index] = result
+
+        OutlookService._remember(events, ordered)
+        return ordered
+
+    @staticmethod
+    def _run_batch(events: list["OutlookService"], cmd: list[str], env: dict,
+                   labels: list = None) -> list[EventResult]:
+        """
+        Uma execução do `core create-batch`; resultados na ordem dos eventos.
+
+        `labels` traduz o índice de cada evento no processo para o rótulo nos spans do tracer.
+        """
+        labels = labels or list(range(len(events)))
+        payload = "".join(json.dumps(event.to_payload(), ensure_ascii=False) + "\n" for event in events)
+        started = time.time_ns()
+        try:
+            proc = subprocess.Popen(cmd, cwd=OutlookService.core_dir(), env=env, stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8")
+        except OSError as e:
+            print(f"[ERROR] Erro ao executar OutlookFusionCLI: {e}")
+            return [EventResult(index=i, ok=False, error=str(e)) for i in range(len(events))]
+        OutlookService._trace("spawn", started, labels)
+
+        started = time.time_ns()
+        stdout, stderr = proc.communicate(payload)
+        OutlookService._trace("wait", started, labels, exit=proc.returncode)
+        stderr = OutlookService._core_errors(stderr, labels, labels)
+
+        results: dict[int, EventResult] = {}
+        for line in stdout.splitlines():
+            try:
+                item = json.loads(line)
+                results[item["index"]] = EventResult(
+                    index=item["index"],
+                    ok=item["ok"],
+                    status=item.get("status"),
+                    error=item.get("error"),
+                    attempts=item.get("attempts", 1),
+                    throttled=item.get("throttled", 0),
+                    permanent=item.get("permanent", False),
+                    event_id=item.get("id")
+                )
+            except (ValueError, KeyError):
+                continue
+
+        # Eventos sem resposta (ex: core encerrou no meio do batch)
+        missing_error = stderr or f"Sem resposta do core (exit {proc.returncode})"
+        return [results.get(i, EventResult(index=i, ok=False, error=missing_error, acknowledged=False))
+                for i in range(len(events))]
+
+    # ═══════════════════════════════════════════════════════════════
+    # ASYNCIO
+    # ═══════════════════════════════════════════════════════════════
+
+    async def run_outlookfusion_async(self, timeout: float = None, index: int = 0) -> EventResult:
+        """
+        Versão assíncrona de run_outlookfusion (não bloqueia o event loop).
+
+        Se o tempo limite estourar ou a tarefa for cancelada, o processo do core é encerrado.
+        """
+        import asyncio  # importado sob demanda: a TUI síncrona não paga o custo no startup
+
+        # Renovar o token pode exigir uma chamada HTTP: fica fora do event loop
+        env = await asyncio.to_thread(OutlookService.core_env)
+        started = time.time_ns()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.build_command(),
+                cwd=OutlookService.core_dir(),
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            return EventResult(index=index, ok=False, error=str(e))
+        OutlookService._trace("spawn", started, index)
+
+        started = time.time_ns()
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await OutlookService._kill(proc)
+            return EventResult(index=index, ok=False, error=f"Tempo limite de {timeout}s excedido")
+        except asyncio.CancelledError:
+            await OutlookService._kill(proc)
+            raise
+
+        OutlookService._trace("wait", started, index, exit=proc.returncode)
+
+        error = OutlookService._core_errors(stderr.decode("utf-8", errors="replace"), default=index)
+        if proc.returncode != 0:
+            return EventResult(index=index, ok=False, error=error or f"core saiu com código {proc.returncode}")
+        result = EventResult(index=index, ok=True)
+        OutlookService._remember([self], [result])
+        return result
+
+    @staticmethod
+    async def create_many_async(events: list["OutlookService"], concurrency: int = 4,
+                                timeout: float = None) -> list[EventResult]:
+        """
+        Cria vários eventos em paralelo, no máximo `concurrency` processos do core ao mesmo tempo.
+
+        Cada `core create` tem o próprio rate limiter, então os inícios são espaçados por um
+        token bucket compartilhado (BackendConfig.RATE/BURST): a taxa somada dos processos
+        continua a do Graph, qualquer que seja a concorrência.
+
+        Args:
+            events: Eventos a criar
+            concurrency: Limite de processos simultâneos
+            timeout: Tempo limite por evento (segundos)
+
+        Returns:
+            Um EventResult por evento, na mesma ordem da lista recebida
+        """
+        import asyncio
+        from Service.HttpBackend import RateLimiter
+
+        config = BackendConfig()
+        limiter = RateLimiter(rate=config.RATE, burst=config.BURST)
+        limit = asyncio.Semaphore(max(1, concurrency))
+
+        async def submit(index: int, event: "OutlookService") -> EventResult:
+            async with limit:
+                # acquire dorme enquanto espera o token: fica fora do event loop
+                await asyncio.to_thread(limiter.acquire)
+                return await event.run_outlookfusion_async(timeout=timeout, index=index)
+
+        # Cancelar a chamada cancela todas as tarefas (e mata os processos em andamento)
+        return await asyncio.gather(*(submit(i, event) for i, event in enumerate(events)))
+
+    @staticmethod
+    async def _kill(proc: "asyncio.subprocess.Process"):
+        """Mata o processo do core e espera ele sair"""
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+
+    # ═══════════════════════════════════════════════════════════════
+    # WORKER PERSISTENTE
+    # ═══════════════════════════════════════════════════════════════
+
+    @classmethod
+    def get_worker(cls) -> CoreWorker:
+        """Retorna o worker compartilhado, iniciando o processo se necessário"""
+        if cls._worker is None:
+            on_stderr = None
+            if cls._tracer is not None:
+                tracer = cls._tracer
+                on_stderr = lambda line: tracer.add_core_line(line, labels=lambda event: f"worker:{event}")
+            cls._worker = CoreWorker(core_path=cls.core_path(), core_dir=cls.core_dir(), env=cls.core_env(),
+                                     on_stderr=on_stderr)
+            atexit.register(cls.shutdown_worker)
+        cls._worker.ensure_running()
+        return cls._worker
+
+    @classmethod
+    def shutdown_worker(cls):
+        """Encerra o worker compartilhado, se existir"""
+        if cls._worker is not None:
+            cls._worker.stop()
+
+    def create_via_worker(self, timeout: float = None) -> EventResult:
+        """Cria o evento pelo worker persistente (sem iniciar um processo novo)"""
+        result = self._create_via_worker_once(timeout)
+        if OutlookService._can_retry_auth([result]):
+            OutlookService.core_env(force_refresh=True)
+            result = self._create_via_worker_once(timeout)
+        if result.ok:
+            OutlookService._remember([self], [result])
+        return result
+
+    def _create_via_worker_once(self, timeout: float = None) -> EventResult:
+        try:
+            # O token vai em cada requisição: o worker não fica preso ao token com que foi iniciado
+            token = OutlookService.tokens().get_token()
+        except TokenError:
+            token = None
+        try:
+            worker = OutlookService.get_worker()
+            started = time.time_ns()
+            future = worker.submit("create", self.to_payload(), token=token)
+            try:
+                result = worker.wait(future, timeout, "create")
+            finally:
+                OutlookService._trace("worker_request", started, f"worker:{future.request_id}")
+            return EventResult(index=0, ok=True, status=result.get("status"), attempts=result.get("attempts", 1),
+                               throttled=result.get("throttled", 0), event_id=result.get("id"))
+        except CoreWorkerError as e:
+            return EventResult(index=0, ok=False, error=str(e), status=e.details.get("status"),
+                               attempts=e.details.get("attempts", 1), throttled=e.details.get("throttled", 0),
+                               permanent=e.details.get("permanent", False))
+        except (TimeoutError, OSError) as e:
+            return EventResult(index=0, ok=False, error=str(e), acknowledged=False)
+
+    def validate_via_worker(self, timeout: float = None) -> tuple[bool, str]:
+        """
+        Valida o evento no core sem enviá-lo ao Graph.
+
+        Returns:
+            (is_valid, error_message)
+        """
+        try:
+            OutlookService.get_worker().request("validate", self.to_payload(), timeout=timeout)
+            return True, ""
+        except (CoreWorkerError, TimeoutError, OSError) as e:
+            return False, str(e)
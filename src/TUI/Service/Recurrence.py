@@ -0,0 +1,293 @@
+"""
+Recurrence - Eventos Recorrentes
+Padrões estilo RRULE (diário/semanal/mensal), payload `recurrence` do Graph
+e expansão preguiçosa das ocorrências
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from typing import Iterator
+import re
+
+from tool import tool
+from Service.TimezoneService import TimezoneService
+
+
+# Ordem do Graph (firstDayOfWeek = sunday)
+WEEKDAYS = ("sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday")
+RRULE_DAYS = {"SU": "sunday", "MO": "monday", "TU": "tuesday", "WE": "wednesday",
+              "TH": "thursday", "FR": "friday", "SA": "saturday"}
+GRAPH_PATTERNS = {"daily": "daily", "weekly": "weekly", "monthly": "absoluteMonthly"}
+# index do relativeMonthly do Graph e o ordinal equivalente no BYDAY (1MO, 2TU, ..., -1FR)
+MONTH_INDEXES = {"first": 1, "second": 2, "third": 3, "fourth": 4, "last": -1}
+# Partes da RRULE que from_rrule entende; qualquer outra é rejeitada em vez de ignorada
+RRULE_PARTS = {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "COUNT", "UNTIL", "WKST", "EXDATE"}
+REGEX_BYDAY = re.compile(r'^([+-]?\d{1,2})?([A-Z]{2})$')
+
+
+@dataclass
+class Recurrence:
+    """
+    Regra de repetição de um evento.
+
+    freq: "daily" | "weekly" | "monthly"
+    days_of_week: dias da semana no semanal (padrão: o dia do início), ou o dia
+                  único do mensal relativo
+    index: mensal relativo ("first" ... "fourth", "last"), ex: primeira segunda do mês
+    day_of_month: dia do mensal absoluto (padrão: o dia do início); meses sem ele são pulados
+    first_day_of_week: início da semana, que decide quais semanas entram com interval > 1
+    count / until: fim da série (número de ocorrências / última data, inclusiva);
+                   sem nenhum dos dois a série não tem fim
+    exceptions: datas (YYYY-MM-DD) de ocorrências canceladas; contam no `count`
+
+    Como no Graph, a série começa na primeira data do padrão a partir do início.
+    """
+    freq: str = "weekly"
+    interval: int = 1
+    days_of_week: list = None
+    count: int = None
+    until: str = None
+    exceptions: list = None
+    index: str = None
+    day_of_month: int = None
+    first_day_of_week: str = "sunday"
+
+    def __post_init__(self):
+        self.freq = self.freq.lower()
+        if self.freq not in GRAPH_PATTERNS:
+            raise ValueError(f"Frequência não suportada: {self.freq}")
+        if self.interval < 1:
+            raise ValueError("Intervalo deve ser maior que zero")
+        if self.days_of_week:
+            self.days_of_week = [day.lower() for day in self.days_of_week]
+            unknown = [day for day in self.days_of_week if day not in WEEKDAYS]
+            if unknown:
+                raise ValueError(f"Dia da semana inválido: {', '.join(unknown)}")
+        self.first_day_of_week = self.first_day_of_week.lower()
+        if self.first_day_of_week not in WEEKDAYS:
+            raise ValueError(f"Dia da semana inválido: {self.first_day_of_week}")
+
+        if self.index is not None:
+            if self.freq != "monthly" or self.index not in MONTH_INDEXES:
+                raise ValueError(f"Índice mensal inválido: {self.index}")
+            if not self.days_of_week or len(self.days_of_week) != 1:
+                raise ValueError("O mensal relativo precisa de exatamente um dia da semana")
+        elif self.days_of_week and self.freq != "weekly":
+            raise ValueError("Dias da semana só valem no semanal ou no mensal relativo (ex: 1MO)")
+        if self.day_of_month is not None:
+            if self.freq != "monthly" or self.index is not None:
+                raise ValueError("Dia do mês só vale no mensal absoluto")
+            if not 1 <= self.day_of_month <= 31:
+                raise ValueError(f"Dia do mês inválido: {self.day_of_month}")
+        if self.until:
+            date.fromisoformat(self.until)
+        self.exceptions = sorted({date.fromisoformat(day).isoformat() for day in self.exceptions or []})
+
+    # ═══════════════════════════════════════════════════════════════
+    # CONVERSÕES
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def from_rrule(rule: str, exceptions: list = None) -> "Recurrence":
+        """
+        Lê uma regra no formato RRULE, ex: "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10".
+
+        Suporta FREQ (DAILY/WEEKLY/MONTHLY), INTERVAL, BYDAY, BYMONTHDAY, COUNT,
+        UNTIL (YYYYMMDD ou YYYY-MM-DD) e WKST. EXDATE=YYYYMMDD,... entra como exceção.
+
+        Combinações são levadas ao padrão equivalente do Graph: DAILY com BYDAY
+        (ex: dias úteis) vira semanal e MONTHLY com BYDAY ordinal (1MO, -1FR) vira
+        mensal relativo. O que não tem equivalente levanta ValueError.
+        """
+        parts = {}
+        for part in rule.strip().removeprefix("RRULE:").split(";"):
+            if "=" in part:
+                name, value = part.split("=", 1)
+                parts[name.strip().upper()] = value.strip()
+        if "FREQ" not in parts:
+            raise ValueError("RRULE sem FREQ")
+        unsupported = sorted(set(parts) - RRULE_PARTS)
+        if unsupported:
+            raise ValueError(f"Parte da RRULE não suportada: {', '.join(unsupported)}")
+
+        def iso_date(value: str) -> str:
+            value = value[:8] if len(value) >= 8 and value[:8].isdigit() else value[:10]
+            return date.fromisoformat(value if "-" in value else f"{value[:4]}-{value[4:6]}-{value[6:8]}").isoformat()
+
+        def weekday(value: str) -> str:
+            if value.upper() not in RRULE_DAYS:
+                raise ValueError(f"Dia da semana inválido: {value}")
+            return RRULE_DAYS[value.upper()]
+
+        freq, interval = parts["FREQ"].lower(), int(parts.get("INTERVAL", 1))
+        days, index = None, None
+        if "BYDAY" in parts:
+            days, ordinals = [], set()
+            for value in parts["BYDAY"].split(","):
+                match = REGEX_BYDAY.match(value.strip().upper())
+                if match is None:
+                    raise ValueError(f"BYDAY inválido: {value}")
+                days.append(weekday(match.group(2)))
+                ordinals.add(int(match.group(1)) if match.group(1) else None)
+
+            if freq == "monthly":
+                # Graph: um dia da semana e um índice (primeira ... quarta, última)
+                ordinal = ordinals.pop() if len(ordinals) == 1 else None
+                if len(days) != 1 or ordinal is None:
+                    raise ValueError("BYDAY mensal precisa de um único dia com ordinal (ex: 1MO, -1FR)")
+                index = next((name for name, number in MONTH_INDEXES.items() if number == ordinal), None)
+                if index is None:
+                    raise ValueError(f"Ordinal do BYDAY sem equivalente no Graph: {ordinal}")
+            elif ordinals != {None}:
+                raise ValueError("BYDAY com ordinal só vale no MONTHLY")
+            elif freq == "daily":
+                # Ex: dias úteis (BYDAY=MO,TU,WE,TH,FR) é o semanal nesses dias
+                if interval != 1:
+                    raise ValueError("FREQ=DAILY com BYDAY e INTERVAL maior que 1 não tem equivalente no Graph")
+                freq = "weekly"
+
+        day_of_month = None
+        if "BYMONTHDAY" in parts:
+            try:
+                day_of_month = int(parts["BYMONTHDAY"])
+            except ValueError:
+                raise ValueError(f"BYMONTHDAY não suportado: {parts['BYMONTHDAY']}") from None
+
+        exdates = list(exceptions or [])
+        if "EXDATE" in parts:
+            exdates += [iso_date(day) for day in parts["EXDATE"].split(",")]
+
+        return Recurrence(freq=freq, interval=interval, days_of_week=days, index=index, day_of_month=day_of_month,
+                          first_day_of_week=weekday(parts["WKST"]) if "WKST" in parts else "sunday",
+                          count=int(parts["COUNT"]) if "COUNT" in parts else None,
+                          until=iso_date(parts["UNTIL"]) if "UNTIL" in parts else None,
+                          exceptions=exdates)
+
+    def to_graph(self, date_start: str, timezone: str) -> dict:
+        """Payload `recurrence` do Microsoft Graph para uma série que começa em date_start"""
+        start = datetime.fromisoformat(date_start)
+        pattern = {"type": GRAPH_PATTERNS[self.freq], "interval": self.interval}
+        if self.freq == "weekly":
+            pattern["daysOfWeek"] = self._weekdays(start.date())
+            pattern["firstDayOfWeek"] = self.first_day_of_week
+        elif self.index is not None:
+            pattern.update(type="relativeMonthly", daysOfWeek=list(self.days_of_week), index=self.index)
+        elif self.freq == "monthly":
+            pattern["dayOfMonth"] = self.day_of_month or start.day
+
+        series = {"startDate": start.date().isoformat(), "recurrenceTimeZone": timezone}
+        if self.count:
+            series.update(type="numbered", numberOfOccurrences=self.count)
+        elif self.until:
+            series.update(type="endDate", endDate=self.until)
+        else:
+            series["type"] = "noEnd"
+        return {"pattern": pattern, "range": series}
+
+    @staticmethod
+    def from_graph(recurrence: dict, exceptions: list = None) -> "Recurrence":
+        """Inverso de to_graph (padrões daily/weekly/absoluteMonthly/relativeMonthly)"""
+        pattern, series = recurrence.get("pattern") or {}, recurrence.get("range") or {}
+        kind = pattern.get("type")
+        # O Graph devolve todos os campos do padrão; só os do tipo em questão valem
+        fields = {}
+        if kind == "weekly":
+            fields.update(days_of_week=pattern.get("daysOfWeek"),
+                          first_day_of_week=pattern.get("firstDayOfWeek") or "sunday")
+        elif kind == "absoluteMonthly":
+            fields["day_of_month"] = pattern.get("dayOfMonth") or None
+        elif kind == "relativeMonthly":
+            fields.update(days_of_week=pattern.get("daysOfWeek"), index=pattern.get("index") or "first")
+        freq = {"relativeMonthly": "monthly", **{graph: ours for ours, graph in GRAPH_PATTERNS.items()}}.get(kind)
+        if freq is None:
+            raise ValueError(f"Padrão de recorrência não suportado: {pattern.get('type')}")
+        return Recurrence(freq=freq, interval=pattern.get("interval", 1), **fields,
+                          count=series.get("numberOfOccurrences") if series.get("type") == "numbered" else None,
+                          until=series.get("endDate") if series.get("type") == "endDate" else None,
+                          exceptions=exceptions)
+
+    # ═══════════════════════════════════════════════════════════════
+    # EXPANSÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def _weekdays(self, first: date) -> list[str]:
+        days = set(self.days_of_week or [WEEKDAYS[first.isoweekday() % 7]])
+        return [day for day in WEEKDAYS if day in days]
+
+    def _dates(self, first: date) -> Iterator[date]:
+        """Datas da série sem considerar count/until/exceções (infinito)"""
+        if self.freq == "daily":
+            day = first
+            while True:
+                yield day
+                day += timedelta(days=self.interval)
+
+        elif self.freq == "weekly":
+            week_start = WEEKDAYS.index(self.first_day_of_week)
+            offsets = sorted((WEEKDAYS.index(day) - week_start) % 7 for day in self._weekdays(first))
+            week = first - timedelta(days=(first.isoweekday() % 7 - week_start) % 7)  # 1º dia da semana do início
+            while True:
+                for offset in offsets:
+                    day = week + timedelta(days=offset)
+                    if day >= first:
+                        yield day
+                week += timedelta(weeks=self.interval)
+
+        elif self.index is not None:
+            weekday = WEEKDAYS.index(self.days_of_week[0])
+            month = first.year * 12 + first.month - 1
+            while True:
+                if self.index == "last":
+                    last = date((month + 1) // 12, (month + 1) % 12 + 1, 1) - timedelta(days=1)
+                    day = last - timedelta(days=(last.isoweekday() % 7 - weekday) % 7)
+                else:
+                    first_of_month = date(month // 12, month % 12 + 1, 1)
+                    day = first_of_month + timedelta(days=(weekday - first_of_month.isoweekday() % 7) % 7,
+                                                     weeks=MONTH_INDEXES[self.index] - 1)
+                if day >= first:
+                    yield day
+                month += self.interval
+
+        else:
+            # Meses sem o dia (ex: 31) são pulados
+            month = first.year * 12 + first.month - 1
+            while True:
+                try:
+                    day = date(month // 12, month % 12 + 1, self.day_of_month or first.day)
+                except ValueError:
+                    day = None
+                if day is not None and day >= first:
+                    yield day
+                month += self.interval
+
+    def occurrences(self, date_start: str, date_end: str, timezone: str = None) -> Iterator[tuple[str, str]]:
+        """
+        Gera (início, término) RFC3339 de cada ocorrência, sob demanda.
+
+        Séries sem count/until são infinitas: use itertools.islice ou pare no
+        horizonte desejado. Com `timezone` (IANA), o horário de parede é mantido
+        nas trocas de horário de verão; sem ele, o offset do início é reutilizado.
+        """
+        start, end = datetime.fromisoformat(date_start), datetime.fromisoformat(date_end)
+        duration = end - start
+        zone = timezone if timezone and TimezoneService.is_valid(timezone) else None
+        if zone is not None:
+            start = tool.to_zone(start, zone)
+
+        until = date.fromisoformat(self.until) if self.until else None
+        exceptions = set(self.exceptions)
+        for number, day in enumerate(self._dates(start.date()), start=1):
+            if (self.count and number > self.count) or (until and day > until):
+                return
+            if day.isoformat() in exceptions:
+                continue
+            if zone is not None:
+                # Horário de parede do dia: offset pelas transições do fuso (TimezoneService)
+                occurrence = datetime.combine(day, start.time())
+                yield tool.to_rfc3339(occurrence, zone), tool.to_rfc3339(occurrence + duration, zone)
+                continue
+            occurrence = datetime.combine(day, start.timetz())
+            yield tool.to_rfc3339(occurrence), tool.to_rfc3339(occurrence + duration)
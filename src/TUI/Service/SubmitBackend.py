@@ -0,0 +1,82 @@
+"""
+SubmitBackend - Caminhos de Envio ao Graph
+Interface comum para criar eventos, com a implementação pelo binário do core
+(worker persistente e create-batch) e a escolha do backend pelo BackendConfig
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abc import ABC, abstractmethod
+from typing import ClassVar
+
+from data import BackendConfig
+from Service.OutlookService import OutlookService, EventResult
+
+
+class SubmitBackend(ABC):
+    """
+    Como um evento chega ao Graph. Todas as implementações devolvem EventResult com
+    a mesma semântica (tentativas, 429, falha permanente, id do evento) e gravam no
+    cache local (OutlookService.use_store) os eventos criados.
+    """
+    name: ClassVar[str] = ""
+
+    @abstractmethod
+    def create(self, event: OutlookService, timeout: float = None) -> EventResult:
+        """Cria um evento"""
+
+    @abstractmethod
+    def create_many(self, events: list[OutlookService], concurrency: int = 4,
+                    graph_batch: bool = False, labels: list = None) -> list[EventResult]:
+        """Cria vários eventos; os resultados vêm na ordem de `events`"""
+
+    def start(self):
+        """Prepara o backend antes do primeiro envio (ex: sobe o worker do core)"""
+
+    def close(self):
+        """Libera processos e conexões do backend"""
+
+    def healthy(self) -> bool:
+        """True quando o backend consegue enviar (usado no /health do daemon)"""
+        return True
+
+    @staticmethod
+    def from_config(config: BackendConfig = None) -> "SubmitBackend":
+        """
+        Backend pelo nome em OUTLOOK_BACKEND ou BackendConfig.BACKEND.
+
+        Raises:
+            ValueError: Nome de backend desconhecido
+        """
+        config = config or BackendConfig()
+        name = os.environ.get("OUTLOOK_BACKEND") or config.BACKEND
+        if name == "auto":
+            name = "core" if os.path.exists(OutlookService.core_path()) else "http"
+        if name == "core":
+            return CoreBackend()
+        if name == "http":
+            from Service.HttpBackend import HttpBackend
+            return HttpBackend(config=config)
+        raise ValueError(f"Backend desconhecido: {name!r} (use core, http ou auto)")
+
+
+class CoreBackend(SubmitBackend):
+    """Binário do core: um evento pelo worker persistente, vários por `core create-batch`"""
+    name = "core"
+
+    def create(self, event: OutlookService, timeout: float = None) -> EventResult:
+        return event.create_via_worker(timeout=timeout)
+
+    def create_many(self, events: list[OutlookService], concurrency: int = 4,
+                    graph_batch: bool = False, labels: list = None) -> list[EventResult]:
+        return OutlookService.create_many_core(events, concurrency=concurrency, graph_batch=graph_batch, labels=labels)
+
+    def start(self):
+        OutlookService.get_worker()
+
+    def close(self):
+        OutlookService.shutdown_worker()
+
+    def healthy(self) -> bool:
+        return OutlookService._worker is not None and OutlookService._worker.health_check()
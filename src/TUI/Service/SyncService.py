@@ -0,0 +1,142 @@
+"""
+SyncService - Sincronização Incremental da Agenda
+Executa o `core sync` (calendarView/delta do Graph) e aplica as mudanças no EventStore
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass
+
+from Service.EventStore import EventStore, StoredEvent
+from Service.OutlookService import OutlookService
+
+
+@dataclass
+class SyncReport:
+    """Resumo de uma sincronização"""
+    upserted: int = 0
+    deleted: int = 0
+    # Itens sem data reconhecível (não gravados)
+    skipped: int = 0
+    # True quando foi carga completa (sem deltaLink salvo, ou deltaLink expirado)
+    full: bool = False
+    ok: bool = False
+    error: str = None
+
+
+@dataclass
+class SyncService:
+    """
+    Mantém o EventStore em dia com a agenda do Graph.
+
+    A primeira execução para uma janela faz a carga completa; as seguintes usam o
+    deltaLink salvo nos metadados do cache e só recebem o que mudou. O core devolve
+    as páginas como NDJSON e as mudanças incrementais são aplicadas em lotes de
+    `batch_size` enquanto chegam.
+
+    A carga completa (e a que recomeça após um deltaLink expirado) fica em memória e
+    só substitui a janela no cache, numa única transação, depois que o core termina
+    com sucesso: se falhar no meio, o cache anterior (incluindo os eventos `local:`)
+    continua intacto.
+
+    O deltaLink só é salvo quando o core termina com sucesso; se a sincronização
+    cair no meio, a próxima repete a partir do link anterior (upserts e deletes
+    são idempotentes).
+    """
+    store: EventStore
+    range_start: str
+    range_end: str
+    page_size: int = 100
+    batch_size: int = 500
+
+    @property
+    def delta_key(self) -> str:
+        """Chave do deltaLink nos metadados (um por janela)"""
+        return f"delta_link:{self.range_start}|{self.range_end}"
+
+    def build_command(self, delta_link: str = None) -> list[str]:
+        cmd = [OutlookService.core_path(), "sync", "--start", self.range_start, "--end", self.range_end,
+               "--page-size", str(self.page_size)]
+        if delta_link:
+            cmd.extend(["--delta-link", delta_link])
+        return cmd
+
+    def run(self, full: bool = False) -> SyncReport:
+        """
+        Sincroniza a janela.
+
+        Args:
+            full: Ignora o deltaLink salvo e refaz a carga completa
+
+        Returns:
+            SyncReport com os totais aplicados no cache
+        """
+        delta_link = None if full else self.store.get_meta(self.delta_key)
+        report = SyncReport(full=delta_link is None)
+
+        upserts, deletes = [], []
+        # Carga completa: id → (evento, id, changeKey), gravado só no fim com store.sync
+        staged = {}
+        new_link = None
+
+        with OutlookService.stream_core(self.build_command(delta_link), default="sync") as stream:
+            for change in stream:
+                op = change.get("op")
+                if op == "upsert":
+                    if not change.get("date_start") or not change.get("date_end"):
+                        report.skipped += 1
+                        continue
+                    item = (self._to_event(change), change["id"], change.get("change_key"))
+                    if report.full:
+                        staged[change["id"]] = item
+                    else:
+                        upserts.append(item)
+                elif op == "delete":
+                    if report.full:
+                        staged.pop(change["id"], None)
+                    else:
+                        deletes.append(change["id"])
+                elif op == "reset":
+                    # deltaLink expirado: o core recomeça a carga completa
+                    upserts.clear()
+                    deletes.clear()
+                    staged.clear()
+                    report.full = True
+                elif op == "delta":
+                    new_link = change.get("link")
+
+                if len(upserts) + len(deletes) >= self.batch_size:
+                    self._apply(upserts, deletes, report)
+
+        self._apply(upserts, deletes, report)
+        if stream.error or new_link is None:
+            report.error = stream.error or stream.stderr or "core terminou sem deltaLink"
+            return report
+
+        if report.full:
+            # O que não veio do Graph não existe mais na janela
+            self.store.sync(self.range_start, self.range_end, staged.values())
+            report.upserted += len(staged)
+        self.store.set_meta(self.delta_key, new_link)
+        self.store.touch(self.range_start, self.range_end)
+        report.ok = True
+        return report
+
+    def _apply(self, upserts: list, deletes: list, report: SyncReport):
+        """Grava um lote de mudanças no cache e esvazia os buffers"""
+        if upserts:
+            self.store.upsert_many(upserts)
+            report.upserted += len(upserts)
+            upserts.clear()
+        if deletes:
+            self.store.delete_many(deletes)
+            report.deleted += len(deletes)
+            deletes.clear()
+
+    @staticmethod
+    def _to_event(change: dict) -> StoredEvent:
+        return StoredEvent(id=change["id"], subject=change.get("subject", ""), date_start=change["date_start"],
+                           date_end=change["date_end"], timezone=change.get("timezone", ""),
+                           location=change.get("location", ""), descr=change.get("descr", ""),
+                           version=change.get("change_key"))
@@ -0,0 +1,187 @@
+"""
+TemplateService - Modelos de Evento
+Formatos de evento repetidos (conteúdo, local, timezone, duração, recorrência) salvos
+em disco e compilados uma vez num payload pronto: criar a partir do modelo só
+preenche assunto e horário
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Iterable
+import json
+
+from data import DefaultValues, TemplateConfig
+from tool import tool
+from Service.OutlookService import OutlookService
+from Service.Recurrence import Recurrence
+from Service.TimezoneService import TimezoneService
+
+
+@dataclass
+class EventTemplate:
+    """
+    Tudo de um evento menos assunto e horário de início.
+
+    Os campos são validados e compilados no esqueleto do payload ao criar o modelo;
+    um modelo inválido nem chega a existir (ValueError).
+    """
+    name: str
+    content: str = None
+    descr: str = ""
+    location: str = None
+    timezone: str = None
+    duration_minutes: int = None
+    # Recorrência no formato RRULE (ex: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10)
+    rrule: str = None
+
+    _skeleton: dict = field(default=None, init=False, repr=False)
+    _duration: timedelta = field(default=None, init=False, repr=False)
+    _recurrence: Recurrence = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        defaults = DefaultValues()
+        self.content = self.content or defaults.CONTENT
+        self.location = self.location or defaults.LOCATION
+        self.timezone = self.timezone or defaults.TIMEZONE
+        self.duration_minutes = self.duration_minutes or defaults.EVENT_DURATION_HOURS * 60
+        self.compile()
+
+    def compile(self):
+        """
+        Valida os campos fixos e monta o esqueleto do payload.
+
+        Raises:
+            ValueError: Nome vazio, timezone desconhecido, duração ou RRULE inválidas
+        """
+        if not self.name or not self.name.strip():
+            raise ValueError("Modelo sem nome")
+        TimezoneService.zone(self.timezone)
+        self.duration_minutes = int(self.duration_minutes)
+        if self.duration_minutes <= 0:
+            raise ValueError(f"Duração inválida: {self.duration_minutes} min")
+        self._recurrence = Recurrence.from_rrule(self.rrule) if self.rrule else None
+        self._duration = timedelta(minutes=self.duration_minutes)
+        self._skeleton = OutlookService(content=self.content, descr=self.descr, location=self.location,
+                                        timezone=self.timezone).to_payload()
+
+    def to_dict(self) -> dict:
+        """Campos gravados no arquivo de modelos"""
+        return {item.name: getattr(self, item.name) for item in fields(self)
+                if item.init and item.name != "name" and getattr(self, item.name) not in (None, "")}
+
+    # ═══════════════════════════════════════════════════════════════
+    # CRIAÇÃO A PARTIR DO MODELO
+    # ═══════════════════════════════════════════════════════════════
+
+    def payload(self, subject: str, date_start: str) -> dict:
+        """Esqueleto + assunto e datas (date_start em RFC3339; o término sai da duração)"""
+        start = datetime.fromisoformat(date_start)
+        payload = {**self._skeleton, "subject": subject, "date_start": date_start,
+                   "date_end": tool.to_rfc3339(start + self._duration, self.timezone)}
+        if self._recurrence is not None:
+            payload["recurrence"] = self._recurrence.to_graph(date_start, self.timezone)
+            if self._recurrence.exceptions:
+                payload["exceptions"] = list(self._recurrence.exceptions)
+        return payload
+
+    def event(self, subject: str, start: str) -> OutlookService:
+        """
+        Evento do modelo; `start` aceita os formatos da TUI (14:00, 05/02 14:00, ISO8601)
+        no timezone do modelo.
+
+        Raises:
+            ValueError: Assunto vazio ou horário não reconhecido
+        """
+        return self.events([(subject, start)])[0]
+
+    def events(self, items: Iterable[tuple[str, str]]) -> list[OutlookService]:
+        """
+        Vários eventos do modelo de uma vez: (assunto, início) por evento, com os
+        horários convertidos em lote (tool.parse_many).
+
+        Raises:
+            ValueError: Assunto vazio ou horário não reconhecido (o primeiro encontrado)
+        """
+        items = list(items)
+        starts = tool.parse_many((start for _, start in items), timezone=self.timezone)
+        events = []
+        for (subject, raw), date_start in zip(items, starts):
+            if not subject:
+                raise ValueError("Assunto vazio")
+            if not tool.is_valid_iso(date_start):
+                raise ValueError(f"Horário de início inválido: {raw!r}")
+            events.append(OutlookService(**self.payload(subject, date_start)))
+        return events
+
+
+@dataclass
+class TemplateService:
+    """
+    Modelos salvos num arquivo JSON ({nome: campos}), lidos e compilados uma vez.
+
+    Entradas inválidas no arquivo (editado à mão, por exemplo) são ignoradas com
+    uma mensagem de erro, sem impedir o uso das demais.
+    """
+    path: str = None
+
+    _templates: dict = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.path is None:
+            self.path = TemplateConfig().PATH
+
+    @property
+    def templates(self) -> dict[str, EventTemplate]:
+        if self._templates is None:
+            self._templates = self._load()
+        return self._templates
+
+    def _load(self) -> dict[str, EventTemplate]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                raw = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Erro ao ler os modelos ({self.path}): {e}")
+            return {}
+
+        templates = {}
+        for name, values in raw.items():
+            try:
+                templates[name] = EventTemplate(name=name, **values)
+            except (TypeError, ValueError) as e:
+                print(f"[ERROR] Modelo {name!r} ignorado: {e}")
+        return templates
+
+    def _save(self):
+        """Grava todos os modelos de forma atômica"""
+        templates = {name: template.to_dict() for name, template in sorted(self.templates.items())}
+        tool.atomic_write(self.path, json.dumps(templates, ensure_ascii=False, indent=2))
+
+    def names(self) -> list[str]:
+        return sorted(self.templates)
+
+    def get(self, name: str) -> EventTemplate:
+        """
+        Raises:
+            ValueError: Modelo inexistente
+        """
+        template = self.templates.get(name)
+        if template is None:
+            raise ValueError(f"Modelo não encontrado: {name!r}")
+        return template
+
+    def save(self, template: EventTemplate):
+        """Cria ou substitui o modelo"""
+        self.templates[template.name] = template
+        self._save()
+
+    def remove(self, name: str) -> bool:
+        if self.templates.pop(name, None) is None:
+            return False
+        self._save()
+        return True
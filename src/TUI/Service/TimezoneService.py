@@ -0,0 +1,156 @@
+"""
+TimezoneService - Resolução de Fuso Horário e Offset
+ZoneInfo em cache LRU e transições de offset pré-calculadas por fuso/ano, para
+converter datas em lote sem astimezone()/strftime("%z") por valor
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone, tzinfo
+from functools import lru_cache
+import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+EPOCH = datetime(1970, 1, 1)
+DAY = 86400
+
+
+class TimezoneService:
+    """
+    Offsets de um fuso (nome IANA, ex: "America/Sao_Paulo"; None = fuso local da máquina).
+
+    Para cada (fuso, ano) as transições de horário de verão são calculadas uma vez e
+    guardadas em duas tabelas ordenadas:
+      - instantes UTC em que o offset muda (converter um datetime com tz para o fuso)
+      - horários de parede em que o offset muda (dar offset a um datetime sem tz)
+
+    No horário de parede segue-se o fold=0 do PEP 495, o mesmo de `replace(tzinfo=ZoneInfo)`
+    e de `astimezone()`: horário que não existe (início do horário de verão) usa o offset
+    de antes da transição e horário repetido (fim) usa a primeira ocorrência.
+    """
+
+    # ═══════════════════════════════════════════════════════════════
+    # FUSOS
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def zone(name: str) -> ZoneInfo:
+        """
+        ZoneInfo do fuso, criado uma vez por nome.
+
+        Raises:
+            ValueError: Nome que não é um fuso IANA conhecido
+        """
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise ValueError(f"Timezone desconhecido: {name!r}") from e
+
+    @staticmethod
+    def is_valid(name: str) -> bool:
+        try:
+            TimezoneService.zone(name)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def clear():
+        """Descarta os caches (ex: depois de mudar o TZ do processo com time.tzset)"""
+        TimezoneService.zone.cache_clear()
+        TimezoneService.transitions.cache_clear()
+
+    @staticmethod
+    def _offset_at(name: str, ts: int) -> int:
+        """Offset (segundos) do fuso no instante UTC `ts`"""
+        if not name:
+            return time.localtime(ts).tm_gmtoff
+        return int(datetime.fromtimestamp(ts, TimezoneService.zone(name)).utcoffset().total_seconds())
+
+    # ═══════════════════════════════════════════════════════════════
+    # TRANSIÇÕES POR ANO
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def transitions(name: str, year: int) -> tuple[list, list, list]:
+        """
+        Tabelas de offset do ano (com dois dias de folga em cada ponta).
+
+        Returns:
+            (utc_starts, wall_starts, offsets): offsets[i] vale a partir de utc_starts[i]
+            (segundos UTC) e de wall_starts[i] (horário de parede em segundos desde a época)
+        """
+        if name:
+            TimezoneService.zone(name)
+        first = int((datetime(year, 1, 1) - EPOCH).total_seconds()) - 2 * DAY
+        last = int((datetime(year + 1, 1, 1) - EPOCH).total_seconds()) + 2 * DAY
+
+        previous = TimezoneService._offset_at(name, first)
+        utc_starts, wall_starts, offsets = [first], [first + previous], [previous]
+        # Amostra diária; entre duas amostras diferentes, busca binária até o segundo
+        for day in range(first + DAY, last + 1, DAY):
+            offset = TimezoneService._offset_at(name, day)
+            if offset == previous:
+                continue
+            low, high = day - DAY, day
+            while high - low > 1:
+                middle = (low + high) // 2
+                if TimezoneService._offset_at(name, middle) == previous:
+                    low = middle
+                else:
+                    high = middle
+            utc_starts.append(high)
+            wall_starts.append(high + max(previous, offset))
+            offsets.append(offset)
+            previous = offset
+        return utc_starts, wall_starts, offsets
+
+    # ═══════════════════════════════════════════════════════════════
+    # OFFSETS
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def wall_offset(name: str, dt: datetime) -> int:
+        """Offset (segundos) de um horário de parede sem tz no fuso"""
+        wall = (dt.toordinal() - 719163) * DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+        _, wall_starts, offsets = TimezoneService.transitions(name, dt.year)
+        return offsets[max(0, bisect_right(wall_starts, wall) - 1)]
+
+    @staticmethod
+    def utc_offset(name: str, ts: float) -> int:
+        """Offset (segundos) do fuso no instante UTC `ts`"""
+        year = (EPOCH + timedelta(seconds=ts)).year
+        utc_starts, _, offsets = TimezoneService.transitions(name, year)
+        return offsets[max(0, bisect_right(utc_starts, ts) - 1)]
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def offset_text(seconds: int) -> str:
+        """Offset RFC3339: -10800 → -03:00"""
+        sign = "-" if seconds < 0 else "+"
+        hours, rest = divmod(abs(seconds), 3600)
+        minutes, secs = divmod(rest, 60)
+        return f"{sign}{hours:02d}:{minutes:02d}" + (f":{secs:02d}" if secs else "")
+
+    @staticmethod
+    def localize(dt: datetime, name: str = None) -> datetime:
+        """
+        Datetime com tz no fuso: sem tz é tomado como horário de parede do fuso,
+        com tz é convertido para ele.
+        """
+        if dt.tzinfo is None:
+            offset = TimezoneService.wall_offset(name, dt)
+        else:
+            offset = TimezoneService.utc_offset(name, dt.timestamp())
+            dt = (dt - dt.utcoffset()).replace(tzinfo=None) + timedelta(seconds=offset)
+        return dt.replace(tzinfo=TimezoneService._fixed(offset))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _fixed(seconds: int) -> tzinfo:
+        return dt_timezone(timedelta(seconds=seconds))
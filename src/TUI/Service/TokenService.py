@@ -0,0 +1,221 @@
+"""
+TokenService - Token de Acesso do Microsoft Graph
+Cache com expiração, renovação antecipada (refresh token / client credentials)
+e login por device code
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+import json
+import threading
+import time
+
+from data import TokenConfig
+from tool import tool
+
+
+class TokenError(Exception):
+    """Falha ao obter ou renovar o token"""
+
+
+@dataclass
+class TokenService:
+    """
+    Fornece o token de acesso para o core.
+
+    O token fica em memória (e em `cache_path`) com a data de expiração, e é
+    renovado quando faltar menos de `margin_seconds` para expirar. A renovação
+    é single-flight: com várias threads pedindo o token ao mesmo tempo, só uma
+    chama o endpoint e as outras esperam pelo resultado dela.
+
+    Credenciais (variáveis de ambiente, sobrescrevem os campos vazios):
+    - OUTLOOK_CLIENT_ID, OUTLOOK_TENANT_ID, OUTLOOK_TOKEN_URL (ex: endpoint fake local)
+    - OUTLOOK_REFRESH_TOKEN ou login por `device_login` → grant refresh_token
+    - OUTLOOK_CLIENT_SECRET → grant client_credentials
+    Sem nenhuma delas, usa o OUTLOOK_TOKEN fixo (ambiente ou `env_file`), lido uma vez.
+    """
+    client_id: str = None
+    client_secret: str = None
+    tenant: str = None
+    token_url: str = None
+    scope: str = None
+    cache_path: str = None
+    margin_seconds: float = None
+    env_file: str = None
+
+    refreshes: int = field(default=0, init=False)
+    _access_token: str = field(default=None, init=False, repr=False)
+    _expires_at: float = field(default=0.0, init=False, repr=False)
+    _refresh_token: str = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        config = TokenConfig()
+        self.client_id = self.client_id or os.environ.get("OUTLOOK_CLIENT_ID")
+        self.client_secret = self.client_secret or os.environ.get("OUTLOOK_CLIENT_SECRET")
+        self.tenant = self.tenant or os.environ.get("OUTLOOK_TENANT_ID") or config.TENANT
+        self.token_url = (self.token_url or os.environ.get("OUTLOOK_TOKEN_URL")
+                          or f"{config.AUTHORITY}/{self.tenant}/oauth2/v2.0/token")
+        self.scope = self.scope or (config.SCOPE if not self.client_secret else "https://graph.microsoft.com/.default")
+        self.cache_path = self.cache_path or config.CACHE_PATH
+        if self.margin_seconds is None:
+            self.margin_seconds = config.REFRESH_MARGIN_SECONDS
+        self._refresh_token = os.environ.get("OUTLOOK_REFRESH_TOKEN")
+        self._load_cache()
+
+    @property
+    def can_refresh(self) -> bool:
+        """True se há como obter um token novo (e não só o OUTLOOK_TOKEN fixo)"""
+        return bool(self.client_id and (self._refresh_token or self.client_secret))
+
+    @property
+    def device_code_url(self) -> str:
+        return self.token_url.rsplit("/", 1)[0] + "/devicecode"
+
+    # ═══════════════════════════════════════════════════════════════
+    # TOKEN
+    # ═══════════════════════════════════════════════════════════════
+
+    def get_token(self, force_refresh: bool = False) -> str:
+        """
+        Token válido para o Graph.
+
+        Args:
+            force_refresh: Renova mesmo que o token pareça válido (ex: após um 401)
+
+        Raises:
+            TokenError: sem credenciais ou falha no endpoint de token
+        """
+        expires_at = self._expires_at
+        if not force_refresh and self._fresh():
+            return self._access_token
+
+        with self._lock:
+            # Outra thread pode ter renovado enquanto esta esperava o lock
+            if self._fresh() and (not force_refresh or self._expires_at != expires_at):
+                return self._access_token
+            if not self.can_refresh:
+                static = self._static_token()
+                if static is None:
+                    raise TokenError("Nenhuma credencial configurada (OUTLOOK_TOKEN ou OUTLOOK_CLIENT_ID)")
+                self._access_token, self._expires_at = static, float("inf")
+                return static
+            if self._refresh_token:
+                self._request_token({"grant_type": "refresh_token", "refresh_token": self._refresh_token})
+            else:
+                self._request_token({"grant_type": "client_credentials", "client_secret": self.client_secret})
+            return self._access_token
+
+    def _fresh(self) -> bool:
+        return self._access_token is not None and time.time() < self._expires_at - self.margin_seconds
+
+    def _static_token(self) -> str:
+        """OUTLOOK_TOKEN do ambiente ou do .env do core"""
+        token = os.environ.get("OUTLOOK_TOKEN")
+        if token or not self.env_file or not os.path.exists(self.env_file):
+            return token
+        with open(self.env_file, encoding="utf-8") as file:
+            for line in file:
+                name, _, value = line.strip().partition("=")
+                if name.strip() == "OUTLOOK_TOKEN":
+                    return value.strip().strip("'\"")
+        return None
+
+    def _post(self, url: str, form: dict) -> dict:
+        request = Request(url, data=urlencode(form).encode(), method="POST",
+                          headers={"Content-Type": "application/x-www-form-urlencoded"})
+        try:
+            with urlopen(request, timeout=15) as response:
+                return json.load(response)
+        except HTTPError as e:
+            try:
+                body = json.load(e)
+            except ValueError:
+                body = {}
+            body.setdefault("error", f"http_{e.code}")
+            return body
+        except (URLError, OSError, ValueError) as e:
+            raise TokenError(f"Endpoint de token indisponível: {e}") from None
+
+    def _request_token(self, grant: dict):
+        """Chama o endpoint de token e guarda o resultado (chamar com o lock)"""
+        response = self._post(self.token_url, {"client_id": self.client_id, "scope": self.scope, **grant})
+        if "access_token" not in response:
+            raise TokenError(f"{response.get('error')}: {response.get('error_description', '')}".rstrip(": "))
+        self._store(response)
+
+    def _store(self, response: dict):
+        self.refreshes += 1
+        self._access_token = response["access_token"]
+        self._expires_at = time.time() + float(response.get("expires_in", 3600))
+        # Refresh tokens podem ser rotacionados a cada uso
+        self._refresh_token = response.get("refresh_token", self._refresh_token)
+        self._save_cache()
+
+    # ═══════════════════════════════════════════════════════════════
+    # LOGIN (DEVICE CODE)
+    # ═══════════════════════════════════════════════════════════════
+
+    def device_login(self, on_prompt=print, timeout: float = 900):
+        """
+        Login interativo pelo fluxo device code; guarda o refresh token obtido.
+
+        Args:
+            on_prompt: Recebe a mensagem com o código e a URL que o usuário deve abrir
+        """
+        if not self.client_id:
+            raise TokenError("OUTLOOK_CLIENT_ID não configurado")
+        code = self._post(self.device_code_url, {"client_id": self.client_id, "scope": self.scope})
+        if "device_code" not in code:
+            raise TokenError(f"{code.get('error')}: {code.get('error_description', '')}".rstrip(": "))
+        on_prompt(code.get("message") or f"Abra {code.get('verification_uri')} e informe o código {code.get('user_code')}")
+
+        interval = float(code.get("interval", 5))
+        deadline = time.time() + min(timeout, float(code.get("expires_in", timeout)))
+        while time.time() < deadline:
+            response = self._post(self.token_url, {
+                "client_id": self.client_id,
+                "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
+                "device_code": code["device_code"],
+            })
+            if "access_token" in response:
+                with self._lock:
+                    self._store(response)
+                return
+            if response.get("error") == "slow_down":
+                interval += 5
+            elif response.get("error") != "authorization_pending":
+                raise TokenError(f"{response.get('error')}: {response.get('error_description', '')}".rstrip(": "))
+            time.sleep(interval)
+        raise TokenError("Tempo do login esgotado")
+
+    # ═══════════════════════════════════════════════════════════════
+    # CACHE EM DISCO
+    # ═══════════════════════════════════════════════════════════════
+
+    def _load_cache(self):
+        if not self.client_id or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return
+        if cached.get("client_id") != self.client_id or cached.get("token_url") != self.token_url:
+            return
+        self._access_token = cached.get("access_token")
+        self._expires_at = float(cached.get("expires_at", 0))
+        # O do cache é o mais recente (o do ambiente pode já ter sido rotacionado)
+        self._refresh_token = cached.get("refresh_token") or self._refresh_token
+
+    def _save_cache(self):
+        """Grava o cache de forma atômica, legível só pelo usuário"""
+        cached = {"client_id": self.client_id, "token_url": self.token_url,
+                  "access_token": self._access_token, "expires_at": self._expires_at,
+                  "refresh_token": self._refresh_token}
+        tool.atomic_write(self.cache_path, json.dumps(cached), mode=0o600)
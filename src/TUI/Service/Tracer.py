@@ -0,0 +1,174 @@
+"""
+Tracer - Medição de Tempo por Fase
+Junta os spans da TUI (spawn/espera do core) com os que o core emite no stderr
+(OUTLOOK_TRACE=1) e exporta no formato Chrome trace (chrome://tracing, Perfetto)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json
+import threading
+import time
+
+
+@dataclass
+class Span:
+    """Um intervalo medido (tempos em µs desde a época, comparáveis entre processos)"""
+    name: str
+    start_us: int
+    dur_us: int
+    # "tui" ou "core"
+    source: str = "tui"
+    pid: int = 0
+    tid: int = 0
+    # Eventos a que o span pertence (um processo de batch vale para todos os seus eventos)
+    events: tuple = ()
+    fields: dict = None
+
+    def __post_init__(self):
+        if self.fields is None:
+            self.fields = {}
+
+
+@dataclass
+class Tracer:
+    """
+    Coleta spans de uma execução.
+
+    Os spans do core chegam como linhas JSON no stderr ({"span", "ts_us", "dur_us",
+    "pid", "event", ...}); `add_core_output` separa essas linhas das mensagens de
+    erro, que continuam valendo para o EventResult. O `event` do core é local ao
+    processo (índice no create-batch, id da requisição no worker) e é traduzido
+    para o rótulo usado pela TUI.
+    """
+    spans: list = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # ═══════════════════════════════════════════════════════════════
+    # COLETA
+    # ═══════════════════════════════════════════════════════════════
+
+    @contextmanager
+    def span(self, name: str, events=(), **fields):
+        """Mede o bloco `with` como um span da TUI"""
+        started = time.time_ns()
+        try:
+            yield fields
+        finally:
+            self.record(name, started, time.time_ns(), events, **fields)
+
+    def record(self, name: str, start_ns: int, end_ns: int, events=(), **fields):
+        span = Span(name=name, start_us=start_ns // 1000, dur_us=max(0, end_ns - start_ns) // 1000,
+                    pid=os.getpid(), tid=threading.get_ident(), events=self._labels(events), fields=fields)
+        with self._lock:
+            self.spans.append(span)
+
+    def add_core_line(self, line: str, labels=None, default=()) -> bool:
+        """
+        Registra uma linha de span do core.
+
+        Args:
+            labels: Traduz o `event` do core para o rótulo da TUI (dict, lista por índice ou função)
+            default: Rótulo dos spans sem `event` (ex: o processo de um `core create`)
+
+        Returns:
+            False se a linha não for um span (mensagem comum do stderr)
+        """
+        if not line.startswith('{"') or '"span"' not in line:
+            return False
+        try:
+            item = json.loads(line)
+            name, start_us, dur_us = item.pop("span"), int(item.pop("ts_us")), int(item.pop("dur_us"))
+        except (ValueError, KeyError, TypeError):
+            return False
+
+        pid = item.pop("pid", 0)
+        if "event" in item:
+            events = [self._translate(item.pop("event"), labels)]
+        elif "events" in item:
+            events = [self._translate(event, labels) for event in item.pop("events")]
+        else:
+            events = default
+        span = Span(name=name, start_us=start_us, dur_us=dur_us, source="core", pid=pid, tid=pid,
+                    events=self._labels(events), fields=item)
+        with self._lock:
+            self.spans.append(span)
+        return True
+
+    def add_core_output(self, stderr: str, labels=None, default=()) -> str:
+        """Registra os spans de um stderr inteiro e devolve o resto (mensagens de erro)"""
+        rest = [line for line in stderr.splitlines() if not self.add_core_line(line, labels, default)]
+        return "\n".join(rest).strip()
+
+    @staticmethod
+    def _translate(event, labels):
+        if labels is None:
+            return event
+        if callable(labels):
+            return labels(event)
+        try:
+            return labels[int(event)] if isinstance(labels, (list, tuple)) else labels.get(event, event)
+        except (ValueError, IndexError, TypeError):
+            return event
+
+    @staticmethod
+    def _labels(events) -> tuple:
+        if isinstance(events, (str, int)):
+            events = (events,)
+        return tuple(str(event) for event in events)
+
+    # ═══════════════════════════════════════════════════════════════
+    # AGREGAÇÃO E EXPORTAÇÃO
+    # ═══════════════════════════════════════════════════════════════
+
+    def breakdown(self) -> dict[str, dict[str, float]]:
+        """Milissegundos por fase de cada evento (spans de processo contam para todos os eventos dele)"""
+        result: dict[str, dict[str, float]] = {}
+        for span in self.spans:
+            for event in span.events:
+                phases = result.setdefault(event, {})
+                phases[span.name] = phases.get(span.name, 0.0) + span.dur_us / 1000
+        return result
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Estatísticas por fase: count, total_ms, mean_ms, p50_ms, p95_ms, max_ms"""
+        by_name: dict[str, list[float]] = {}
+        for span in self.spans:
+            by_name.setdefault(span.name, []).append(span.dur_us / 1000)
+        stats = {}
+        for name, values in by_name.items():
+            values.sort()
+            stats[name] = {
+                "count": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": values[len(values) // 2],
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max_ms": values[-1],
+            }
+        return stats
+
+    def to_chrome(self) -> dict:
+        """Spans no formato Chrome trace ("X" = evento completo, tempos em µs)"""
+        trace_events = []
+        # Uma trilha por (processo, eventos): spans concorrentes de eventos diferentes não se sobrepõem
+        tracks: dict[tuple, int] = {}
+        for span in sorted(self.spans, key=lambda span: span.start_us):
+            args = dict(span.fields)
+            if span.events:
+                args["events"] = list(span.events)
+            tid = tracks.setdefault((span.pid, span.events), len(tracks) + 1) if span.events else span.tid
+            trace_events.append({"name": span.name, "cat": span.source, "ph": "X", "ts": span.start_us,
+                                 "dur": span.dur_us, "pid": span.pid, "tid": tid, "args": args})
+        processes = {(span.pid, span.source) for span in self.spans}
+        for pid, source in processes:
+            trace_events.append({"name": "process_name", "ph": "M", "pid": pid,
+                                 "args": {"name": "TUI" if source == "tui" else f"core {pid}"}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_chrome(), file)
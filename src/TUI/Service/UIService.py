@@ -8,15 +8,18 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from rich.console import Console
-from rich.panel import Panel
 from rich.text import Text
-from rich import box
 from rich.align import Align
-from rich.table import Table
 from data import data, ThemeConfig, AppConfig, DefaultValues
 from tool import tool
 
+# Panel, Table e box só são importados no primeiro uso (fora do caminho de startup)
+if TYPE_CHECKING:
+    from rich.table import Table
+    from Service.Event import EventBatch
+
 
 @dataclass
 class UIService:
@@ -71,9 +74,9 @@ class UIService:
         return tool.format_with_friendly(iso_str)
     
     @staticmethod
-    def transform_to_iso(user_input: str, base_date: str = None) -> str:
+    def transform_to_iso(user_input: str, base_date: str = None, timezone: str = None) -> str:
         """Transforma input do usuário em RFC3339"""
-        return tool.parse_user_datetime(user_input, base_date)
+        return tool.parse_user_datetime(user_input, base_date, timezone)
     
     # ═══════════════════════════════════════════════════════════════
     # COMPONENTES VISUAIS - BANNER, INPUTS, PAINÉIS
@@ -117,7 +120,8 @@ class UIService:
         self.console.print()
     
     def input_field(self, label: str, icon: str = "▸", default: str = None, 
-                    optional: bool = False, transform: bool = False, base_date: str = None) -> str:
+                    optional: bool = False, transform: bool = False, base_date: str = None,
+                    timezone: str = None) -> str:
         """Campo de input estilizado e centralizado
         
         Args:
@@ -127,6 +131,7 @@ class UIService:
             optional: Se é opcional
             transform: Se deve transformar para RFC3339
             base_date: Data base para transformação (quando só hora é informada)
+            timezone: Fuso IANA em que o horário digitado é interpretado
         """
         
         label_text = Text()
@@ -150,12 +155,15 @@ class UIService:
         self.console.print()
         
         if transform and value:
-            value = self.transform_to_iso(value, base_date)
+            value = self.transform_to_iso(value, base_date, timezone)
         
         return value if value else default if default else ""
     
     def show_success_panel(self, message: str, icon: str = ""):
         """Painel de sucesso"""
+        from rich.panel import Panel
+        from rich import box
+        
         panel = Panel(
             Align.center(Text.assemble(
                 (f"{icon} ", f"bold {self.theme.SUCCESS}"),
@@ -170,6 +178,9 @@ class UIService:
     
     def show_warning_panel(self, message: str, icon: str = ""):
         """Painel de aviso/cancelamento"""
+        from rich.panel import Panel
+        from rich import box
+        
         panel = Panel(
             Align.center(Text.assemble(
                 (f"{icon} ", f"bold {self.theme.WARNING}"),
@@ -183,6 +194,9 @@ class UIService:
     
     def show_error_panel(self, message: str, icon: str = ""):
         """Painel de erro"""
+        from rich.panel import Panel
+        from rich import box
+        
         panel = Panel(
             Align.center(Text.assemble(
                 (f"{icon} ", f"bold {self.theme.ERROR}"),
@@ -223,8 +237,11 @@ class UIService:
         self.console.print(Align.center(f"[{self.theme.TEXT_DIM}]Pressione Enter para sair...[/]"))
         input()
     
-    def create_summary_table(self, title: str, fields: dict) -> Table:
+    def create_summary_table(self, title: str, fields: dict) -> "Table":
         """Cria tabela de resumo estilizada"""
+        from rich.table import Table
+        from rich import box
+        
         table = Table(
             show_header=True,
             header_style=f"bold {self.theme.PRIMARY}",
@@ -244,7 +261,13 @@ class UIService:
         
         return table
     
-    def show_table(self, table: Table):
+    def show_table(self, table: "Table"):
         """Exibe tabela centralizada"""
         self.console.print(Align.center(table))
         self.console.print("\n")
+    
+    def show_event_list(self, events: "EventBatch", title: str = "Agenda"):
+        """Lista rolável e filtrável em tela cheia; só a janela visível é renderizada a cada quadro"""
+        from Service.EventListView import EventListView
+        
+        EventListView(events=events, theme=self.theme, title=title).run(self.console)
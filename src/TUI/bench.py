@@ -0,0 +1,1376 @@
+"""
+Bench - Benchmarks de Performance
+Mede o throughput dos caminhos de criação de eventos e compara com o baseline salvo (regress)
+
+Uso:
+    python bench.py submit --events 50
+    python bench.py worker --events 50
+    python bench.py async --events 50 --concurrency 8
+    python bench.py parse --rows 50000
+    python bench.py parse-many --rows 50000
+    python bench.py timezone --rows 100000
+    python bench.py e2e --events 200 --latency-ms 40 --throttle-rate 0.02
+    python bench.py startup --runs 20 --budget-ms 150
+    python bench.py store --events 20000
+    python bench.py sync --events 5000 --latency-ms 20
+    python bench.py conflicts --events 20000 --rows 20000
+    python bench.py recurrence --events 50 --latency-ms 20
+    python bench.py token --concurrency 32 --latency-ms 20
+    python bench.py template --rows 20000 --events 300 --latency-ms 40
+    python bench.py slots --attendees 50 --latency-ms 40
+    python bench.py backend --events 50 --latency-ms 20
+    python bench.py events --rows 1000000
+    python bench.py listview --rows 10000 --budget-ms 16
+    python bench.py properties --cases 2000
+    python bench.py regress                     # falha se alguma métrica piorar mais que --threshold
+    python bench.py regress --save-baseline     # grava o baseline (bench_baseline.json)
+    python bench.py e2e --events 200 --trace /tmp/e2e.trace.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tool import tool
+from Service.OutlookService import OutlookService
+from Service.EventStore import EventStore
+from Service.SyncService import SyncService
+from Service.ConflictIndex import ConflictIndex
+from Service.Event import Event, EventBatch
+from Service.Recurrence import Recurrence
+from Service.TokenService import TokenService
+from Service.Tracer import Tracer
+from mock_graph import MockGraphServer, MockGraphConfig
+
+
+# ═══════════════════════════════════════════════════════════════
+# DADOS SINTÉTICOS
+# ═══════════════════════════════════════════════════════════════
+
+def make_events(count: int) -> list[OutlookService]:
+    """Gera N eventos sintéticos de 1h, um por hora a partir de amanhã"""
+    base = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    events = []
+    for i in range(count):
+        start = base + timedelta(hours=i)
+        events.append(OutlookService(
+            subject=f"Bench {i}",
+            content="Evento de benchmark",
+            date_start=tool.to_rfc3339(start),
+            date_end=tool.to_rfc3339(start + timedelta(hours=1)),
+        ))
+    return events
+
+
+def report(label: str, count: int, elapsed: float, unit: str = "eventos"):
+    """Imprime uma linha de resultado"""
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{label:<28} {count:>6} {unit:<7}  {elapsed:>8.3f}s  {rate:>9.1f} {unit}/s")
+
+
+def report_latency(label: str, samples: list[float]):
+    """Imprime média e mediana de latência (em ms) por requisição"""
+    mean = statistics.fmean(samples) * 1000
+    median = statistics.median(samples) * 1000
+    print(f"{label:<28} {len(samples):>6} reqs     média {mean:>8.2f}ms  p50 {median:>8.2f}ms")
+
+
+def report_percentiles(label: str, samples: list[float], elapsed: float):
+    """Imprime p50/p95/p99 (em ms) e eventos/s"""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    rate = len(samples) / elapsed if elapsed > 0 else float("inf")
+    print(f"{label:<28} p50 {cuts[49] * 1000:>8.2f}ms  p95 {cuts[94] * 1000:>8.2f}ms  "
+          f"p99 {cuts[98] * 1000:>8.2f}ms  {rate:>9.1f} eventos/s")
+
+
+def timed(fn) -> float:
+    """Executa fn e retorna o tempo gasto em segundos"""
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def make_datetime_inputs(count: int, seed: int = 42) -> list[str]:
+    """Gera inputs de data/hora em todos os formatos aceitos, mais alguns inválidos"""
+    rng = random.Random(seed)
+    makers = [
+        lambda: f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00-03:00",
+        lambda: f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        lambda: f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:30Z",
+        lambda: f"{rng.randint(0, 30)}",
+        lambda: f"{rng.randint(0, 25)}:{rng.randint(0, 70):02d}",
+        lambda: f"{rng.randint(1, 32):02d}/{rng.randint(1, 13):02d} {rng.randint(0, 23)}:{rng.randint(0, 59):02d}",
+        lambda: f"{rng.randint(1, 31)}/{rng.randint(1, 12)} {rng.randint(0, 23)}",
+        lambda: f"{rng.randint(1, 31):02d}/{rng.randint(1, 12):02d}/{rng.randint(2024, 2030)} {rng.randint(0, 23)}:{rng.randint(0, 59):02d}",
+        lambda: f"2026-{rng.randint(1, 13):02d}-{rng.randint(1, 31):02d} {rng.randint(0, 24)}:{rng.randint(0, 59):02d}",
+        lambda: f"  2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23)}  ",
+        lambda: rng.choice(["amanhã", "", "14h", "2026/02/05", "5/2/26 14:00", "T14:00", "99:99"]),
+    ]
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+def legacy_parse_user_datetime(user_input: str, base_date: str = None) -> str:
+    """Cascata sequencial de regex original, usada como referência no teste diferencial"""
+    if not user_input:
+        return ""
+    user_input = user_input.strip()
+    if base_date:
+        try:
+            base_dt = datetime.fromisoformat(base_date)
+        except:
+            base_dt = datetime.now().astimezone()
+    else:
+        base_dt = datetime.now().astimezone()
+    if tool.REGEX_RFC3339.match(user_input):
+        return user_input
+    match = tool.REGEX_ISO_NO_OFFSET.match(user_input)
+    if match:
+        try:
+            return tool.to_rfc3339(datetime.fromisoformat(user_input.replace('Z', '+00:00')).astimezone())
+        except:
+            pass
+    match = tool.REGEX_HOUR_ONLY.match(user_input)
+    if match:
+        hour = int(match.group(1))
+        if 0 <= hour <= 23:
+            return tool.to_rfc3339(base_dt.replace(hour=hour, minute=0, second=0, microsecond=0))
+    match = tool.REGEX_HOUR_MINUTE.match(user_input)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return tool.to_rfc3339(base_dt.replace(hour=hour, minute=minute, second=0, microsecond=0))
+    for regex, fields in ((tool.REGEX_DATE_BR_TIME, (None, 2, 1, 3, 4)),
+                          (tool.REGEX_DATE_BR_FULL_TIME, (3, 2, 1, 4, 5)),
+                          (tool.REGEX_DATE_ISO_SPACE, (1, 2, 3, 4, 5))):
+        match = regex.match(user_input)
+        if match:
+            year_g, month_g, day_g, hour_g, minute_g = fields
+            year = int(match.group(year_g)) if year_g else base_dt.year
+            minute = int(match.group(minute_g)) if match.group(minute_g) else 0
+            try:
+                dt = datetime(year, int(match.group(month_g)), int(match.group(day_g)), int(match.group(hour_g)), minute, 0)
+                return tool.to_rfc3339(dt.astimezone())
+            except:
+                pass
+    return user_input
+
+
+# ═══════════════════════════════════════════════════════════════
+# BENCHMARKS
+# ═══════════════════════════════════════════════════════════════
+
+def bench_submit(args):
+    """Processo por evento (`core create`) vs batch (`core create-batch`)"""
+    events = make_events(args.events)
+
+    started = time.perf_counter()
+    for event in events:
+        event.run_outlookfusion()
+    report("core create (por evento)", len(events), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    results = OutlookService.create_many(events, concurrency=args.concurrency)
+    report("core create-batch", len(events), time.perf_counter() - started)
+
+    failed = [r for r in results if not r.ok]
+    if failed:
+        print(f"[WARN] {len(failed)} eventos falharam no batch (ex: {failed[0].error})")
+
+
+def bench_worker(args):
+    """Latência por requisição: processo por chamada vs worker persistente"""
+    events = make_events(args.events)
+
+    report_latency("core create (por chamada)", [timed(event.run_outlookfusion) for event in events])
+
+    worker = OutlookService.get_worker()
+    report_latency("worker ping", [timed(lambda: worker.request("ping")) for _ in events])
+    report_latency("worker validate", [timed(event.validate_via_worker) for event in events])
+    report_latency("worker create", [timed(event.create_via_worker) for event in events])
+
+    # Todas as requisições em andamento ao mesmo tempo
+    started = time.perf_counter()
+    futures = [worker.submit("create", event.to_payload()) for event in events]
+    for future in futures:
+        future.exception()
+    report("worker create (paralelo)", len(events), time.perf_counter() - started)
+    OutlookService.shutdown_worker()
+
+
+def bench_async(args):
+    """Processos sequenciais vs asyncio com limite de concorrência"""
+    events = make_events(args.events)
+
+    started = time.perf_counter()
+    for event in events:
+        event.run_outlookfusion()
+    report("core create (sequencial)", len(events), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    asyncio.run(OutlookService.create_many_async(events, concurrency=args.concurrency))
+    report(f"asyncio (concorrência {args.concurrency})", len(events), time.perf_counter() - started)
+
+
+def bench_parse(args):
+    """Parser de data/hora: teste diferencial contra a cascata original + micro-benchmark"""
+    inputs = make_datetime_inputs(args.rows)
+    base_dates = [None, "2026-03-10T08:00:00-03:00", "data inválida"]
+
+    mismatches = []
+    for base_date in base_dates:
+        for value in inputs:
+            expected = legacy_parse_user_datetime(value, base_date)
+            actual = tool.parse_user_datetime(value, base_date)
+            if expected != actual:
+                mismatches.append((value, base_date, expected, actual))
+    if mismatches:
+        for value, base_date, expected, actual in mismatches[:10]:
+            print(f"[DIFF] {value!r} (base={base_date!r}): esperado {expected!r}, obtido {actual!r}")
+        raise SystemExit(f"[ERROR] {len(mismatches)} divergências no parser")
+    print(f"diferencial: {len(inputs) * len(base_dates)} casos idênticos")
+
+    for label, fn in (("cascata sequencial", legacy_parse_user_datetime),
+                      ("regex única", tool.parse_user_datetime)):
+        started = time.perf_counter()
+        for value in inputs:
+            fn(value)
+        report(label, len(inputs), time.perf_counter() - started, unit="inputs")
+
+
+def bench_parse_many(args):
+    """Coluna inteira: parse_user_datetime por string vs tool.parse_many"""
+    inputs = make_datetime_inputs(args.rows)
+
+    for base_date in (None, "2026-03-10T08:00:00-03:00", "2026-03-10T08:00:00"):
+        expected = [tool.parse_user_datetime(value, base_date) for value in inputs]
+        actual = tool.parse_many(inputs, base_date)
+        if expected != actual:
+            diffs = [(v, e, a) for v, e, a in zip(inputs, expected, actual) if e != a]
+            for value, e, a in diffs[:10]:
+                print(f"[DIFF] {value!r} (base={base_date!r}): esperado {e!r}, obtido {a!r}")
+            raise SystemExit(f"[ERROR] {len(diffs)} divergências em parse_many")
+    print(f"diferencial: {len(inputs) * 3} casos idênticos")
+
+    started = time.perf_counter()
+    for value in inputs:
+        tool.parse_user_datetime(value)
+    report("parse_user_datetime (loop)", len(inputs), time.perf_counter() - started, unit="inputs")
+
+    started = time.perf_counter()
+    tool.parse_many(inputs)
+    report("parse_many", len(inputs), time.perf_counter() - started, unit="inputs")
+
+    # Coluna sem repetições: mede o agrupamento sem a ajuda da deduplicação
+    unique = list(dict.fromkeys(inputs))
+    started = time.perf_counter()
+    tool.parse_many(unique)
+    report("parse_many (sem repetidos)", len(unique), time.perf_counter() - started, unit="inputs")
+
+
+# Com horário de verão (inclusive o de 30 min de Lord Howe e o antigo de São Paulo), sem e meia hora
+TIMEZONES = ("America/Sao_Paulo", "America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata")
+
+
+def reference_rfc3339(dt: datetime) -> str:
+    """Formatação original (strftime + %z), usada como referência no teste diferencial"""
+    offset = dt.strftime("%z")
+    return dt.strftime(f"%Y-%m-%dT%H:%M:%S{offset[:3]}:{offset[3:]}")
+
+
+def bench_timezone(args):
+    """Offsets pelo TimezoneService: diferencial contra zoneinfo/astimezone + conversão em lote"""
+    from zoneinfo import ZoneInfo
+    from Service.TimezoneService import TimezoneService
+
+    # A cada 15 min por dois anos inteiros: passa por todas as transições (e pelo gap/fold delas)
+    walls = [datetime(year, 1, 1) + timedelta(minutes=15 * step)
+             for year in (2018, 2026) for step in range(365 * 96)]
+    mismatches, cases = [], 0
+    for name in TIMEZONES:
+        zone = ZoneInfo(name)
+        for wall in walls:
+            aware = wall.replace(tzinfo=dt_timezone.utc)
+            for expected, actual in ((reference_rfc3339(wall.replace(tzinfo=zone)), tool.to_rfc3339(wall, name)),
+                                     (reference_rfc3339(aware.astimezone(zone)), tool.to_rfc3339(aware, name))):
+                cases += 1
+                if expected != actual:
+                    mismatches.append((name, wall, expected, actual))
+
+    # Fuso local (None) contra astimezone(), trocando o TZ do processo. Horários que não
+    # existem (gap do horário de verão) ficam de fora: lá o astimezone() nem sempre segue o
+    # fold=0 (02:00 vira 01:00, 02:15 não), e o TimezoneService segue o mesmo que o ZoneInfo
+    saved = os.environ.get("TZ")
+    try:
+        for name in TIMEZONES:
+            os.environ["TZ"] = name
+            time.tzset()
+            TimezoneService.clear()
+            for wall in walls[::4]:
+                if datetime.fromtimestamp(wall.timestamp()) != wall:
+                    continue
+                cases += 1
+                expected, actual = reference_rfc3339(wall.astimezone()), tool.to_rfc3339(wall)
+                if expected != actual:
+                    mismatches.append((f"local={name}", wall, expected, actual))
+    finally:
+        if saved is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = saved
+        time.tzset()
+        TimezoneService.clear()
+
+    if mismatches:
+        for name, wall, expected, actual in mismatches[:10]:
+            print(f"[DIFF] {wall} ({name}): esperado {expected!r}, obtido {actual!r}")
+        raise SystemExit(f"[ERROR] {len(mismatches)} divergências de offset")
+    print(f"diferencial: {cases} casos idênticos")
+
+    rng = random.Random(42)
+    sample = [rng.choice(walls) for _ in range(args.rows)]
+    name = "America/Sao_Paulo"
+    zone, short = ZoneInfo(name), name.split("/")[-1]
+    for label, fn in (("astimezone() + strftime", lambda dt: reference_rfc3339(dt.astimezone())),
+                      ("to_rfc3339 (fuso local)", tool.to_rfc3339),
+                      ("ZoneInfo + strftime", lambda dt: reference_rfc3339(dt.replace(tzinfo=zone))),
+                      (f"to_rfc3339 ({short})", lambda dt: tool.to_rfc3339(dt, name))):
+        started = time.perf_counter()
+        for dt in sample:
+            fn(dt)
+        report(label, len(sample), time.perf_counter() - started, unit="datas")
+
+    inputs = make_datetime_inputs(args.rows)
+    started = time.perf_counter()
+    tool.parse_many(inputs, timezone=name)
+    report(f"parse_many ({short})", len(inputs), time.perf_counter() - started, unit="inputs")
+
+
+def bench_e2e(args):
+    """Todos os caminhos do OutlookService contra o servidor mock do Graph"""
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=42)
+    with MockGraphServer(config=config) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+        events = make_events(args.events)
+
+        started = time.perf_counter()
+        samples = [timed(event.run_outlookfusion) for event in events]
+        report_percentiles("core create (por evento)", samples, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        samples = [timed(event.create_via_worker) for event in events]
+        report_percentiles("worker (sequencial)", samples, time.perf_counter() - started)
+        OutlookService.shutdown_worker()
+
+        async def timed_async():
+            limit = asyncio.Semaphore(args.concurrency)
+
+            async def one(event):
+                async with limit:
+                    began = time.perf_counter()
+                    await event.run_outlookfusion_async()
+                    return time.perf_counter() - began
+
+            return await asyncio.gather(*(one(event) for event in events))
+
+        started = time.perf_counter()
+        samples = asyncio.run(timed_async())
+        report_percentiles(f"asyncio (concorrência {args.concurrency})", samples, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        results = OutlookService.create_many(events, concurrency=args.concurrency)
+        report("core create-batch", len(events), time.perf_counter() - started)
+
+        failed = sum(1 for r in results if not r.ok)
+
+        started = time.perf_counter()
+        results = OutlookService.create_many(events, concurrency=args.concurrency, graph_batch=True)
+        report("core create-batch ($batch)", len(events), time.perf_counter() - started)
+
+        failed += sum(1 for r in results if not r.ok)
+        print(f"mock: {server.stats} | falhas nos batches: {failed}")
+
+
+def bench_startup(args):
+    """Tempo até o primeiro prompt da TUI (index.py --startup-only), com orçamento opcional"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.py")
+    cmd = [sys.executable, script, "--startup-only"]
+
+    subprocess.run(cmd, capture_output=True, check=True)  # aquece o cache de bytecode
+    samples = [timed(lambda: subprocess.run(cmd, capture_output=True, check=True)) for _ in range(args.runs)]
+    report_latency("startup da TUI", samples)
+
+    profile = tool.profile_startup(script, top=5)
+    print("imports mais caros: " + ", ".join(f"{name} {cumulative / 1000:.1f}ms" for name, _, cumulative in profile["modules"]))
+
+    median_ms = statistics.median(samples) * 1000
+    if args.budget_ms and median_ms > args.budget_ms:
+        raise SystemExit(f"[ERROR] Startup de {median_ms:.1f}ms excede o orçamento de {args.budget_ms:.0f}ms")
+
+
+def bench_store(args):
+    """Cache local: carga de N eventos e consultas por semana / busca por texto"""
+    events = make_events(args.events)
+    store = EventStore(path=":memory:")
+    elapsed = timed(lambda: store.upsert_many((event, f"id-{i}", "v1") for i, event in enumerate(events)))
+    report("upsert_many", len(events), elapsed)
+
+    first = datetime.fromisoformat(events[0].date_start)
+    weeks = [(tool.to_rfc3339(first + timedelta(days=7 * w)), tool.to_rfc3339(first + timedelta(days=7 * (w + 1))))
+             for w in range(max(1, len(events) // 168))]
+    samples = [timed(lambda: store.list_events(*week)) for week in weeks for _ in range(5)]
+    report_latency("list_events (1 semana)", samples)
+
+    terms = [f"Bench {i}" for i in range(0, len(events), max(1, len(events) // 50))]
+    samples = [timed(lambda: store.search(term, limit=20)) for term in terms]
+    report_latency("search (prefixo)", samples)
+    samples = [timed(lambda: store.search(term.split()[1], limit=20)) for term in terms]
+    report_latency("search (substring)", samples)
+    store.close()
+
+    # Um ano de agenda com assuntos e locais que se repetem (termos comuns, raros e ausentes)
+    store = EventStore(path=":memory:")
+    store.upsert_many((event, f"year-{i}", "v1") for i, event in enumerate(make_year_events()))
+    print(f"\nbusca em 1 ano de agenda ({store.count()} eventos, limit=20):")
+    for label, term in (("prefixo comum", "Reunião"), ("prefixo raro", "1:1 Ana"), ("substring comum", "produto"),
+                        ("substring rara", "Bruno 4"), ("local", "Sala Azul"), ("sem resultado", "inexistente"),
+                        ("curto (2 letras)", "ão")):
+        samples = [timed(lambda: store.search(term, limit=20)) for _ in range(50)]
+        report_latency(f"search ({label})", samples)
+    store.close()
+
+
+def make_year_events(per_day: int = 20) -> list[OutlookService]:
+    """Agenda de um ano: `per_day` eventos de 30 min por dia útil, assuntos e locais sorteados"""
+    rng = random.Random(11)
+    kinds = ("Reunião", "Daily", "1:1", "Planejamento", "Revisão", "Almoço", "Entrevista", "Treinamento")
+    topics = ("time", "produto", "vendas", "infra", "Ana", "Bruno", "cliente", "sprint")
+    locations = ("Online", "Teams", "Sala 1", "Sala 2", "Sala Azul", "Auditório")
+    day = datetime(2026, 1, 1, 8, tzinfo=dt_timezone(timedelta(hours=-3)))
+    events = []
+    while day.year == 2026:
+        if day.weekday() < 5:
+            for slot in range(per_day):
+                start = day + timedelta(minutes=30 * slot)
+                events.append(OutlookService(
+                    subject=f"{rng.choice(kinds)} {rng.choice(topics)} {rng.randrange(100)}",
+                    content="", location=rng.choice(locations), date_start=tool.to_rfc3339(start),
+                    date_end=tool.to_rfc3339(start + timedelta(minutes=30))))
+        day += timedelta(days=1)
+    return events
+
+
+def bench_sync(args):
+    """Carga completa vs delta (1% de mudanças) do calendarView/delta contra o mock"""
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=42)
+    with MockGraphServer(config=config) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+        events = make_events(args.events)
+        ids = [server.create_event({
+            "subject": event.subject,
+            "body": {"contentType": "HTML", "content": event.descr},
+            "start": {"dateTime": event.date_start, "timeZone": event.timezone},
+            "end": {"dateTime": event.date_end, "timeZone": event.timezone},
+            "location": {"displayName": event.location},
+        })["id"] for event in events]
+
+        store = EventStore(path=":memory:")
+        service = SyncService(store=store, range_start=events[0].date_start, range_end=events[-1].date_end)
+
+        started = time.perf_counter()
+        result = service.run()
+        report("sync completa", result.upserted, time.perf_counter() - started)
+
+        changed = ids[::100]
+        for event_id in changed[::2]:
+            server.update_event(event_id, {"subject": "Alterado"})
+        for event_id in changed[1::2]:
+            server.delete_event(event_id)
+
+        started = time.perf_counter()
+        result = service.run()
+        report("sync delta", result.upserted + result.deleted, time.perf_counter() - started, unit="mudanças")
+
+        expected = len(events) - len(changed[1::2])
+        if not result.ok or store.count() != expected:
+            raise SystemExit(f"[ERROR] Cache com {store.count()} eventos, esperado {expected} ({result.error})")
+        print(f"mock: {server.stats}")
+
+
+def bench_conflicts(args):
+    """ConflictIndex (bisect) vs varredura linear, com conferência dos resultados"""
+    rng = random.Random(42)
+    known = make_events(args.events)
+    # Metade repete eventos conhecidos, metade cai em horários aleatórios (alguns sobrepostos)
+    base = datetime.fromisoformat(known[0].date_start)
+    candidates = []
+    for i in range(args.rows):
+        if i % 2 == 0:
+            candidates.append(rng.choice(known))
+        else:
+            start = base + timedelta(minutes=rng.randrange(-600, args.events * 60 + 600, 15))
+            candidates.append(OutlookService(subject=f"Novo {i}", date_start=tool.to_rfc3339(start),
+                                             date_end=tool.to_rfc3339(start + timedelta(minutes=rng.choice((15, 30, 60))))))
+
+    index = ConflictIndex()
+    elapsed = timed(lambda: index.add_many(known))
+    report("ConflictIndex (construção)", len(known), elapsed)
+
+    started = time.perf_counter()
+    found = [index.check(event) for event in candidates]
+    report("ConflictIndex.check", len(candidates), time.perf_counter() - started)
+
+    spans = [(ConflictIndex._epoch(e.date_start), ConflictIndex._epoch(e.date_end), e.subject.casefold()) for e in known]
+    sample = candidates[:max(1, min(len(candidates), 2000))]
+    started = time.perf_counter()
+    for event, conflict in zip(sample, found):
+        start, end = ConflictIndex._epoch(event.date_start), ConflictIndex._epoch(event.date_end)
+        duplicate = any(s == start and e == end and subject == event.subject.casefold() for s, e, subject in spans)
+        overlap = any(s < end and e > start for s, e, _ in spans)
+        expected = "duplicate" if duplicate else "overlap" if overlap else None
+        if (conflict.kind if conflict else None) != expected:
+            raise SystemExit(f"[ERROR] {event.subject} {event.date_start}: esperado {expected}, obtido {conflict}")
+    report("varredura linear", len(sample), time.perf_counter() - started)
+
+    kinds = [conflict.kind if conflict else "livre" for conflict in found]
+    print(", ".join(f"{kind}: {kinds.count(kind)}" for kind in ("duplicate", "overlap", "livre")))
+
+
+def bench_recurrence(args):
+    """N ocorrências avulsas vs uma série (um único POST) contra o mock, e expansão preguiçosa"""
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    first = make_events(1)[0]
+    recurrence = Recurrence(freq="daily", count=args.events)
+    occurrences = [OutlookService(subject=first.subject, content=first.content, date_start=start, date_end=end)
+                   for start, end in recurrence.occurrences(first.date_start, first.date_end, first.timezone)]
+
+    with MockGraphServer(config=config) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+
+        started = time.perf_counter()
+        OutlookService.create_many(occurrences, concurrency=args.concurrency)
+        report("ocorrências avulsas", len(occurrences), time.perf_counter() - started)
+        singles = server.stats["requests"]
+
+        series = OutlookService.recurring(recurrence, subject=first.subject, content=first.content,
+                                          date_start=first.date_start, date_end=first.date_end)
+        started = time.perf_counter()
+        OutlookService.create_many([series], concurrency=args.concurrency)
+        report("série recorrente", len(occurrences), time.perf_counter() - started)
+        print(f"requisições ao Graph: {singles} avulsas vs {server.stats['requests'] - singles} da série")
+
+    endless = Recurrence(freq="weekly", days_of_week=["monday", "wednesday", "friday"])
+    started = time.perf_counter()
+    upcoming = list(islice(endless.occurrences(first.date_start, first.date_end, first.timezone), args.rows))
+    report("expansão (série sem fim)", len(upcoming), time.perf_counter() - started, unit="ocorr.")
+
+
+def bench_template(args):
+    """Eventos por modelo compilado vs o caminho do Start por evento, e envio em lote contra o mock"""
+    from Service.TemplateService import EventTemplate
+    from Service.TimezoneService import TimezoneService
+
+    template = EventTemplate("bench", content="Evento de benchmark", location="Teams", duration_minutes=30)
+    rng = random.Random(42)
+    items = [(f"Modelo {i}", f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d} {rng.randint(8, 18)}:{rng.choice(('00', '30'))}")
+             for i in range(args.rows)]
+
+    def full_flow(subject: str, start: str) -> OutlookService:
+        # O que o Start refaz a cada evento: timezone, datas e campos fixos
+        if not TimezoneService.is_valid(template.timezone):
+            raise ValueError(template.timezone)
+        date_start = tool.parse_user_datetime(start, timezone=template.timezone)
+        date_end = tool.to_rfc3339(datetime.fromisoformat(date_start) + timedelta(minutes=template.duration_minutes),
+                                   template.timezone)
+        date_end = tool.ensure_end_after_start(date_start, date_end, template.timezone)
+        return OutlookService(subject=subject, content=template.content, date_start=date_start, date_end=date_end,
+                              timezone=template.timezone, location=template.location)
+
+    started = time.perf_counter()
+    expected = [full_flow(subject, start) for subject, start in items]
+    report("fluxo completo por evento", len(items), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    actual = template.events(items)
+    report("modelo compilado (lote)", len(items), time.perf_counter() - started)
+    if [event.to_payload() for event in expected] != [event.to_payload() for event in actual]:
+        raise SystemExit("[ERROR] eventos do modelo diferem do fluxo completo")
+
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    with MockGraphServer(config=config) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+        events = actual[:args.events]
+        started = time.perf_counter()
+        results = OutlookService.create_many(events, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+        report("create-batch do modelo", len(events), elapsed)
+        print(f"≈ {len(events) / elapsed * 60:.0f} eventos/min | falhas: {sum(1 for r in results if not r.ok)}")
+
+
+def reference_slots(busy: list, start: float, end: float, timezone: str, duration: int, step: int,
+                    count: int, config) -> list[float]:
+    """
+    Varredura minuto a minuto (relógio local de cada minuto via zoneinfo), usada como
+    referência no teste diferencial do AvailabilityService. Retorna os inícios em epoch.
+    """
+    from zoneinfo import ZoneInfo
+
+    zone = ZoneInfo(timezone)
+    origin, size = -int(-start // 60), int(end // 60) - -int(-start // 60)
+    work_start = [int(part) for part in config.WORK_START.split(":")]
+    work_end = [int(part) for part in config.WORK_END.split(":")]
+    free, aligned = bytearray(size), bytearray(size)
+    for minute in range(size):
+        local = datetime.fromtimestamp((origin + minute) * 60, zone)
+        clock = [local.hour, local.minute]
+        free[minute] = local.weekday() in config.WORKDAYS and work_start <= clock < work_end
+        wall = local.replace(tzinfo=None)
+        aligned[minute] = int((wall - datetime(1970, 1, 1)).total_seconds() // 60) % step == 0
+    for begin, finish in busy:
+        for minute in range(max(0, int(begin // 60) - origin), min(size, -int(-finish // 60) - origin)):
+            free[minute] = 0
+
+    starts, minute = [], 0
+    while minute + duration <= size and len(starts) < count:
+        if aligned[minute] and all(free[minute:minute + duration]):
+            starts.append((origin + minute) * 60)
+            minute += duration
+        else:
+            minute += 1
+    return starts
+
+
+def bench_slots(args):
+    """Horários livres em comum: diferencial contra varredura minuto a minuto + busca via getSchedule no mock"""
+    from Service.AvailabilityService import AvailabilityService
+    from data import AvailabilityConfig
+
+    config = AvailabilityConfig()
+    attendees = [f"pessoa{i}@contoso.com" for i in range(args.attendees)]
+    rng = random.Random(42)
+    cases = 0
+    # Janelas de um mês começando perto das transições de horário de verão de cada fuso
+    for name in TIMEZONES:
+        for month in (3, 4, 9, 10):
+            begin = datetime(2026, month, rng.randint(1, 20), rng.randint(0, 23), rng.randint(0, 59),
+                             tzinfo=dt_timezone.utc)
+            finish = begin + timedelta(days=31)
+            people = rng.sample(attendees, min(len(attendees), rng.randint(1, 8)))
+            service = AvailabilityService(tool.to_rfc3339(begin, name), tool.to_rfc3339(finish, name), name)
+            busy = []
+            for person in people:
+                blocks = MockGraphServer.busy_blocks(person, begin, finish)
+                service.add_busy(person, ((tool.to_rfc3339(a), tool.to_rfc3339(b)) for a, b in blocks))
+                busy.extend((a.timestamp(), b.timestamp()) for a, b in blocks)
+            duration, step = rng.choice((30, 60, 120, 240)), rng.choice((15, 30, 60))
+            expected = reference_slots(busy, begin.timestamp(), finish.timestamp(), name, duration, step, 10, config)
+            actual = [datetime.fromisoformat(slot.date_start).timestamp()
+                      for slot in service.find(duration, 10, step)]
+            cases += 1
+            if expected != actual:
+                raise SystemExit(f"[ERROR] {name} {begin:%Y-%m-%d %H:%M} {duration}/{step} min: "
+                                 f"esperado {expected[:3]}, obtido {actual[:3]}")
+    print(f"diferencial: {cases} buscas idênticas à varredura minuto a minuto")
+
+    begin = datetime.now(dt_timezone.utc)
+    finish = begin + timedelta(days=31)
+    range_start, range_end = tool.to_rfc3339(begin), tool.to_rfc3339(finish)
+    blocks = {person: [(tool.to_rfc3339(a), tool.to_rfc3339(b)) for a, b in MockGraphServer.busy_blocks(person, begin, finish)]
+              for person in attendees}
+    service = AvailabilityService(range_start, range_end)
+    started = time.perf_counter()
+    for person, intervals in blocks.items():
+        service.add_busy(person, intervals)
+    rasterized = time.perf_counter() - started
+    started = time.perf_counter()
+    slots = service.find(count=5)
+    found = time.perf_counter() - started
+    print(f"{len(attendees)} agendas, 1 mês ({sum(map(len, blocks.values()))} compromissos): "
+          f"rasterização {rasterized * 1000:.1f} ms, busca {found * 1000:.2f} ms")
+
+    mock = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    with MockGraphServer(config=mock) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+        remote = AvailabilityService(range_start, range_end)
+        started = time.perf_counter()
+        error = remote.from_graph(attendees)
+        fetched = time.perf_counter() - started
+        if error:
+            raise SystemExit(f"[ERROR] core schedule: {error}")
+        remote_slots = remote.find(count=5)
+        elapsed = time.perf_counter() - started
+        print(f"getSchedule ({server.stats['schedules']} chamadas) {fetched * 1000:.0f} ms, "
+              f"total com a busca {elapsed * 1000:.0f} ms")
+        if remote_slots != slots:
+            raise SystemExit("[ERROR] horários via getSchedule diferem dos calculados localmente")
+    for slot in slots:
+        print(f"  {tool.format_friendly(slot.date_start)} → {tool.format_friendly(slot.date_end)}")
+
+
+def bench_backend(args):
+    """Backends de envio: latência por evento (core por processo, worker do core, HTTP no Python) e lote"""
+    from Service.SubmitBackend import CoreBackend
+    from Service.HttpBackend import HttpBackend
+
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    with MockGraphServer(config=config) as server:
+        os.environ["OUTLOOK_GRAPH_URL"] = server.url
+        os.environ.setdefault("OUTLOOK_TOKEN", "mock-token")
+        backends = (CoreBackend(), HttpBackend())
+        bodies = {}
+        try:
+            events = make_events(args.events)
+            report_latency("core create (processo por evento)", [timed(event.run_outlookfusion) for event in events])
+            for backend in backends:
+                OutlookService.use_backend(backend)
+                backend.start()
+                # Primeiro envio fora da medição: sobe o worker / abre a conexão
+                make_events(1)[0].create()
+                samples = []
+                for event in events:
+                    # Espaçados pelo rate limit (15/s), para medir o envio e não a fila do limiter
+                    time.sleep(1 / 15)
+                    samples.append(timed(event.create))
+                report_latency(f"{backend.name}.create (por evento)", samples)
+
+            for backend in backends:
+                OutlookService.use_backend(backend)
+                with server._lock:
+                    server.events.clear()
+                events = make_events(args.events)
+                for index, event in enumerate(events):
+                    event.transaction_id = f"bench-{index}"
+                started = time.perf_counter()
+                results = OutlookService.create_many(events, concurrency=args.concurrency)
+                report(f"{backend.name}.create_many", len(events), time.perf_counter() - started)
+                failed = [result for result in results if not result.ok]
+                if failed:
+                    print(f"[WARN] {len(failed)} eventos falharam (ex: {failed[0].error})")
+                bodies[backend.name] = sorted(json.dumps({key: value for key, value in event.items()
+                                                          if key not in ("id", "changeKey")}, sort_keys=True)
+                                              for event in server.events.values())
+        finally:
+            OutlookService.use_backend(None)
+            for backend in backends:
+                backend.close()
+    if bodies["core"] != bodies["http"]:
+        raise SystemExit("[ERROR] o backend http enviou corpos diferentes dos do core")
+    print(f"corpos idênticos nos dois backends: {len(bodies['http'])} eventos")
+
+
+def make_event_records(count: int):
+    """Mesmos eventos de make_events, como Event (datas já convertidas), gerados sob demanda"""
+    base = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    for i in range(count):
+        start = base + timedelta(hours=i)
+        yield Event(subject=f"Bench {i}", content="Evento de benchmark", start=start, end=start + timedelta(hours=1))
+
+
+def traced(build) -> tuple[object, int]:
+    """Executa build() e retorna (resultado, bytes alocados que continuam vivos)"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def bench_events(args):
+    """Memória e consultas por intervalo: OutlookService vs Event (__slots__) vs EventBatch (colunas)"""
+    rows = args.rows
+    # tracemalloc deixa a construção bem mais lenta; aqui só a memória importa
+    services, services_bytes = traced(lambda: make_events(rows))
+    records, records_bytes = traced(lambda: list(make_event_records(rows)))
+    del records
+    batch, batch_bytes = traced(lambda: EventBatch(make_event_records(rows)))
+    for label, used in (("list[OutlookService]", services_bytes), ("list[Event]", records_bytes),
+                        ("EventBatch", batch_bytes)):
+        print(f"{label:<28} {rows:>8} eventos  {used / 2**20:>8.1f} MiB  {used / rows:>6.0f} B/evento")
+    print(f"EventBatch usa {batch_bytes / services_bytes:.0%} da memória de list[OutlookService]")
+
+    # As linhas do lote voltam idênticas aos eventos originais
+    for row in range(0, rows, max(1, rows // 1000)):
+        if batch[row].to_payload() != services[row].to_payload():
+            raise SystemExit(f"[ERROR] Linha {row} difere: {batch[row].to_payload()} != {services[row].to_payload()}")
+
+    # Uma semana no meio do período: varredura das strings (reparse) vs varredura dos arrays
+    middle = datetime.fromisoformat(services[rows // 2].date_start)
+    week = (tool.to_rfc3339(middle), tool.to_rfc3339(middle + timedelta(days=7)))
+    started = time.perf_counter()
+    low, high = datetime.fromisoformat(week[0]), datetime.fromisoformat(week[1])
+    expected = [row for row, event in enumerate(services)
+                if datetime.fromisoformat(event.date_start) < high and datetime.fromisoformat(event.date_end) > low]
+    report("intervalo (strings)", rows, time.perf_counter() - started)
+    started = time.perf_counter()
+    found = batch.overlapping(*week)
+    report("EventBatch.overlapping", rows, time.perf_counter() - started)
+    if found != expected:
+        raise SystemExit(f"[ERROR] overlapping: {len(found)} linhas, esperado {len(expected)}")
+
+    started = time.perf_counter()
+    invalid = [row for row, event in enumerate(services) if not tool.validate_date_range(event.date_start, event.date_end)[0]]
+    report("validate_date_range (str)", rows, time.perf_counter() - started)
+    records = list(make_event_records(rows))
+    started = time.perf_counter()
+    invalid_records = [row for row, event in enumerate(records) if not tool.validate_date_range(event.start, event.end)[0]]
+    report("validate_date_range (Event)", rows, time.perf_counter() - started)
+    started = time.perf_counter()
+    invalid_batch = batch.invalid_ranges()
+    report("EventBatch.invalid_ranges", rows, time.perf_counter() - started)
+    if not invalid == invalid_records == invalid_batch:
+        raise SystemExit(f"[ERROR] invalid_ranges: {len(invalid_batch)} linhas, esperado {len(invalid)}")
+
+
+def bench_listview(args):
+    """Quadros da lista virtualizada (rolagem, páginas, filtro) sobre um EventBatch grande"""
+    import io
+    from rich.console import Console
+    from rich.live import Live
+    from Service.EventListView import EventListView, KEY_DOWN, KEY_UP, KEY_PAGE_DOWN, KEY_PAGE_UP, \
+        KEY_END, KEY_HOME, KEY_BACKSPACE, KEY_ESCAPE
+
+    batch = EventBatch(make_event_records(args.rows))
+    console = Console(file=io.StringIO(), width=120, height=40, force_terminal=True, color_system="truecolor")
+    view = EventListView(events=batch)
+    budget_ms = args.budget_ms or 16.0
+
+    query = "bench 12"
+    scenarios = {
+        "rolagem (↓ 300x, ↑ 300x)": [KEY_DOWN] * 300 + [KEY_UP] * 300,
+        "páginas (PgDn/PgUp 100x)": [KEY_PAGE_DOWN] * 100 + [KEY_PAGE_UP] * 100,
+        "fim/início": [KEY_END, KEY_HOME] * 20,
+        f"filtro (digitar '{query}')": ["/"] + list(query) + [KEY_DOWN] * 20 + [KEY_BACKSPACE] * len(query) + [KEY_ESCAPE],
+    }
+    worst = 0.0
+    with Live(view.render(console), console=console, screen=True, auto_refresh=False,
+              redirect_stdout=False, redirect_stderr=False) as live:
+        for label, keys in scenarios.items():
+            samples = []
+            for key in keys:
+                started = time.perf_counter()
+                view.handle_key(key, view._page_size(console))
+                live.update(view.render(console), refresh=True)
+                samples.append(time.perf_counter() - started)
+                # Descarta a saída para o StringIO não crescer durante o benchmark
+                console.file.seek(0)
+                console.file.truncate()
+            cuts = statistics.quantiles(samples, n=100, method="inclusive")
+            print(f"{label:<28} {len(samples):>4} quadros  p50 {cuts[49] * 1000:>6.2f}ms  "
+                  f"p95 {cuts[94] * 1000:>6.2f}ms  máx {max(samples) * 1000:>6.2f}ms")
+            worst = max(worst, cuts[94] * 1000)
+
+    # Referência: uma Table do rich com todas as linhas, como o resumo faz para um evento
+    from rich.table import Table
+    sample = min(len(batch), 2000)
+    table = Table("Início", "Término", "Assunto", "Local")
+    for row in range(sample):
+        table.add_row(tool.format_friendly(batch.start(row)), tool.format_friendly(batch.end(row)),
+                      batch.subjects[row], batch.strings[batch.locations[row]])
+    elapsed = timed(lambda: console.print(table))
+    print(f"{'Table completa':<28} {sample:>6} linhas   {elapsed * 1000:>8.1f}ms por quadro")
+    print(f"p95 do pior cenário: {worst:.2f}ms (orçamento {budget_ms:.0f}ms)")
+    if worst > budget_ms:
+        raise SystemExit(f"[ERROR] Quadro p95 {worst:.2f}ms acima de {budget_ms:.0f}ms")
+
+
+def bench_token(args):
+    """Renovação single-flight sob rajada, e criação em lote com token revogado no meio"""
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, strict_auth=True, seed=42)
+    with MockGraphServer(config=config) as server, tempfile.TemporaryDirectory() as cache_dir:
+        os.environ.update(OUTLOOK_GRAPH_URL=server.url, OUTLOOK_TOKEN_URL=server.token_url,
+                          OUTLOOK_CLIENT_ID="mock-client", OUTLOOK_REFRESH_TOKEN=server.issue_refresh_token())
+        tokens = TokenService(cache_path=os.path.join(cache_dir, "token.json"))
+        OutlookService.use_tokens(tokens)
+
+        barrier = threading.Barrier(args.concurrency)
+        seen = []
+
+        def burst():
+            barrier.wait()
+            seen.append(tokens.get_token())
+
+        threads = [threading.Thread(target=burst) for _ in range(args.concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report(f"get_token ({args.concurrency} threads)", len(seen), time.perf_counter() - started, unit="tokens")
+        if len(set(seen)) != 1 or server.stats["token_requests"] != 1:
+            raise SystemExit(f"[ERROR] {server.stats['token_requests']} renovações para uma rajada (esperado 1)")
+
+        samples = [timed(tokens.get_token) for _ in range(args.rows)]
+        report_latency("get_token (em cache)", samples)
+
+        events = make_events(args.events)
+        server.expire_access_tokens()
+        started = time.perf_counter()
+        results = OutlookService.create_many(events, concurrency=args.concurrency)
+        report("create-batch (token revogado)", len(events), time.perf_counter() - started)
+        failed = sum(1 for result in results if not result.ok)
+        print(f"renovações: {tokens.refreshes} | 401: {server.stats['unauthorized']} | falhas: {failed}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGRESSÃO (BASELINES + PROPRIEDADES)
+# ═══════════════════════════════════════════════════════════════
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# Fuso e data base usados no corpus (a data base cai num dia com troca de horário em NY)
+CORPUS_TIMEZONE = "America/Sao_Paulo"
+CORPUS_BASE_DATE = "2026-03-08T08:00:00-03:00"
+
+
+def datetime_corpus(count: int, seed: int = 7) -> dict[str, list[str]]:
+    """
+    Inputs realistas de cada formato aceito por parse_user_datetime (como digitados
+    na TUI ou vindos de uma coluna de CSV), mais valores fora de faixa e inválidos
+    """
+    rng = random.Random(seed)
+
+    def wall() -> datetime:
+        return datetime(2026, 1, 1) + timedelta(minutes=15 * rng.randrange(365 * 96))
+
+    makers = {
+        "rfc3339": lambda: tool.to_rfc3339(wall(), rng.choice(TIMEZONES)),
+        "iso_no_offset": lambda: wall().strftime(rng.choice(("%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"))),
+        "iso_z": lambda: wall().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "hour_only": lambda: str(rng.randint(0, 23)),
+        "hour_minute": lambda: f"{rng.randint(0, 23)}:{rng.choice((0, 15, 30, 45)):02d}",
+        "date_br_time": lambda: (lambda dt: f"{dt.day:02d}/{dt.month:02d} {dt.hour}:{dt.minute:02d}")(wall()),
+        "date_br_full_time": lambda: (lambda dt: f"{dt.day}/{dt.month}/{dt.year} {dt.hour:02d}:{dt.minute:02d}")(wall()),
+        "date_iso_space": lambda: (lambda dt: f"{dt:%Y-%m-%d} {dt.hour}" + rng.choice(("", f":{dt.minute:02d}")))(wall()),
+        "out_of_range": lambda: rng.choice((f"{rng.randint(24, 99)}", f"{rng.randint(0, 23)}:{rng.randint(60, 99)}",
+                                            f"31/02/2026 {rng.randint(0, 23)}:00", f"2026-13-{rng.randint(1, 28):02d} 10")),
+        "invalid": lambda: rng.choice(("amanhã", "14h", "2026/02/05", "5/2/26 14:00", "T14:00", "99:99", "meio-dia")),
+        "padded": lambda: f"  {wall():%Y-%m-%d} {rng.randint(0, 23)}:00  ",
+    }
+    return {name: [make() for _ in range(count)] for name, make in makers.items()}
+
+
+def check_properties(cases: int, seed: int = 11) -> tuple[int, list[str]]:
+    """
+    Propriedades que fixam a semântica atual do parsing e dos helpers de data.
+
+    Cada caso sorteia um horário de parede, um fuso (ou o local) e uma data base e
+    confere todas as propriedades com eles. Returns: (verificações feitas, falhas)
+    """
+    from Service.TimezoneService import TimezoneService
+
+    rng = random.Random(seed)
+    failures: list[str] = []
+    checked = 0
+
+    def expect(condition: bool, message: str):
+        nonlocal checked
+        checked += 1
+        if not condition and len(failures) < 20:
+            failures.append(message)
+
+    def rfc3339(dt: datetime, zone: str) -> str:
+        return f"{dt:%Y-%m-%dT%H:%M:%S}{TimezoneService.offset_text(TimezoneService.wall_offset(zone, dt))}"
+
+    for _ in range(cases):
+        zone = rng.choice(TIMEZONES + (None,))
+        wall = datetime(rng.randint(2000, 2035), 1, 1) + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        hour, minute = wall.hour, wall.minute
+        expected = rfc3339(wall, zone)
+        parse = lambda value, base=None: tool.parse_user_datetime(value, base, zone)
+
+        # Todos os formatos com data completa levam ao mesmo RFC3339 (horário de parede no fuso)
+        spellings = (f"{wall:%Y-%m-%d} {hour}:{minute:02d}", f"{wall.day}/{wall.month}/{wall.year} {hour}:{minute:02d}",
+                     f"{wall:%Y-%m-%dT%H:%M}", f"{wall:%Y-%m-%dT%H:%M:%S}", f"  {wall:%Y-%m-%d} {hour}:{minute:02d} ")
+        for value in spellings:
+            expect(parse(value) == expected, f"parse({value!r}, tz={zone}) = {parse(value)!r}, esperado {expected!r}")
+        if minute == 0:
+            value = f"{wall:%Y-%m-%d} {hour}"
+            expect(parse(value) == expected, f"parse({value!r}, tz={zone}) = {parse(value)!r}, esperado {expected!r}")
+
+        # "Z" é UTC convertido para o fuso
+        utc = wall.replace(tzinfo=dt_timezone.utc)
+        value = f"{wall:%Y-%m-%dT%H:%M:%S}Z"
+        expect(parse(value) == tool.to_rfc3339(tool.to_zone(utc, zone)), f"parse({value!r}, tz={zone}) = {parse(value)!r}")
+
+        # RFC3339 completo passa intacto, e parse é idempotente
+        expect(parse(expected) == expected, f"parse({expected!r}) alterou o RFC3339")
+        for value in spellings + ("amanhã", "25:00", "", "   "):
+            once = parse(value)
+            expect(parse(once) == once, f"parse não é idempotente em {value!r}: {once!r} → {parse(once)!r}")
+
+        # Só hora: dia da data base (como escrito nela), horário de parede no fuso
+        base = rfc3339(wall - timedelta(days=rng.randint(0, 400), minutes=rng.randrange(1440)), zone)
+        on_base = rfc3339(datetime.fromisoformat(base[:10]).replace(hour=hour, minute=minute), zone) if zone else None
+        for value in (f"{hour}:{minute:02d}",) + ((str(hour), f"{hour:02d}:00") if minute == 0 else ()):
+            result = parse(value, base)
+            expect(result[:10] == base[:10] and result[11:16] == f"{hour:02d}:{minute:02d}",
+                   f"parse({value!r}, base={base!r}) = {result!r}")
+            if on_base:
+                expect(result == on_base, f"parse({value!r}, base={base!r}, tz={zone}) = {result!r}, esperado {on_base!r}")
+        # "DD/MM HH:MM" usa o ano da data base
+        value = f"{wall.day:02d}/{wall.month:02d} {hour}:{minute:02d}"
+        expect(parse(value, base) == rfc3339(wall.replace(year=int(base[:4])), zone) if not (wall.month == 2 and wall.day == 29)
+               else True, f"parse({value!r}, base={base!r}) = {parse(value, base)!r}")
+
+        # Fora de faixa e desconhecidos voltam como digitados (sem os espaços)
+        for value in (f"{rng.randint(24, 99)}", f"{hour}:{rng.randint(60, 99)}", f"31/{rng.choice((2, 4, 6, 9, 11))}/2026 10:00",
+                      f"2026-13-01 {hour}", "  amanhã ", "14h"):
+            expect(parse(value, base) == value.strip(), f"parse({value!r}) = {parse(value, base)!r}, esperado o input")
+
+        # Lote = um por um
+        column = list(spellings) + [f"{hour}:{minute:02d}", "x", "", f"{wall.day:02d}/{wall.month:02d} {hour}"]
+        expect(tool.parse_many(column, base, zone) == [parse(value, base) for value in column],
+               f"parse_many diverge de parse_user_datetime em {column!r} (base={base!r}, tz={zone})")
+
+        # to_rfc3339 ⇄ fromisoformat e format_friendly com string ou datetime
+        parsed = datetime.fromisoformat(expected)
+        expect(tool.to_rfc3339(parsed) == expected, f"to_rfc3339(fromisoformat({expected!r})) = {tool.to_rfc3339(parsed)!r}")
+        friendly = f"{hour:02d}:{minute:02d} • {wall.day:02d}/{wall.month:02d}"
+        expect(tool.format_friendly(expected) == friendly == tool.format_friendly(parsed),
+               f"format_friendly({expected!r}) = {tool.format_friendly(expected)!r}, esperado {friendly!r}")
+
+        # Término: mantido se depois do início; senão, mesmo horário de parede no dia seguinte
+        end_wall = wall + timedelta(minutes=rng.randrange(-2 * 1440, 2 * 1440, 15))
+        end = rfc3339(end_wall, zone)
+        adjusted = tool.ensure_end_after_start(expected, end, zone)
+        if datetime.fromisoformat(end) > parsed:
+            expect(adjusted == end, f"ensure_end_after_start({expected!r}, {end!r}) alterou um término válido")
+        elif zone:
+            expect(adjusted == rfc3339(end_wall + timedelta(days=1), zone),
+                   f"ensure_end_after_start({expected!r}, {end!r}, {zone}) = {adjusted!r}")
+        as_datetime = tool.ensure_end_after_start(parsed, datetime.fromisoformat(end), zone)
+        expect(tool.to_rfc3339(as_datetime) == adjusted,
+               f"ensure_end_after_start com datetimes = {as_datetime!r}, com strings = {adjusted!r}")
+        valid = datetime.fromisoformat(end) > parsed
+        expect(tool.validate_date_range(expected, end)[0] == valid == tool.validate_date_range(parsed, datetime.fromisoformat(end))[0],
+               f"validate_date_range({expected!r}, {end!r}) ≠ {valid}")
+    return checked, failures
+
+
+def bench_properties(args):
+    """Propriedades do parsing e dos helpers de data (falha com os contraexemplos)"""
+    started = time.perf_counter()
+    checked, failures = check_properties(args.cases)
+    for failure in failures:
+        print(f"[DIFF] {failure}")
+    if failures:
+        raise SystemExit(f"[ERROR] Propriedades violadas (primeiros {len(failures)} contraexemplos acima)")
+    print(f"propriedades: {checked} verificações em {args.cases} casos ({time.perf_counter() - started:.1f}s)")
+
+
+STUB_CORE = '''#!{python} -S
+"""Core falso do benchmark: responde como o core sem chamar o Graph"""
+import json, sys
+
+command = sys.argv[1] if len(sys.argv) > 1 else ""
+if command == "create-batch":
+    for index, line in enumerate(sys.stdin):
+        print(json.dumps({{"index": index, "ok": True, "status": 201, "id": "stub-%d" % index}}))
+elif command == "serve":
+    for line in sys.stdin:
+        request = json.loads(line)
+        result = "pong" if request["method"] == "ping" else {{"status": 201, "id": "stub-%d" % request["id"]}}
+        print(json.dumps({{"id": request["id"], "ok": True, "result": result}}), flush=True)
+'''
+
+
+def calibration_workload():
+    """Carga fixa em Python puro (datetime, strings e formatação), na escala das métricas de data"""
+    base = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+    for i in range(300):
+        dt = base + timedelta(minutes=i)
+        f"{dt:%Y-%m-%dT%H:%M}:{i % 60:02d}".split("T")[1].strip()
+        datetime.fromisoformat(dt.isoformat())
+
+
+def measure(fn, repeat: int = 7) -> tuple[float, float]:
+    """
+    Melhor tempo (segundos) de fn e da carga de calibração, alternadas a cada rodada.
+
+    A razão entre os dois desconta a velocidade da máquina naquele instante
+    (frequência da CPU, outros processos), que varia bem mais que 25% entre execuções.
+    """
+    best = reference = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+        started = time.perf_counter()
+        calibration_workload()
+        reference = min(reference, time.perf_counter() - started)
+    return best, reference
+
+
+class MetricRecorder(dict):
+    """Métricas comparadas com o baseline: nome → (valor, unidade, tolerância, calibração)"""
+    SCALES = {"µs": 1e6, "ms": 1e3}
+
+    def __init__(self):
+        super().__init__()
+        # nome → argumentos do record, para medir de novo uma métrica suspeita
+        self._sources = {}
+
+    def record(self, name: str, fn, count: int = 1, unit: str = "µs", tolerance: float = 1.0, repeat: int = 7):
+        """
+        Mede fn (que processa `count` itens) e guarda o tempo por item.
+
+        Args:
+            tolerance: Multiplica o --threshold; caminhos com processos e threads
+                variam mais entre execuções que as funções puras
+        """
+        elapsed, reference = measure(fn, repeat)
+        self[name] = (elapsed / count * self.SCALES[unit], unit, tolerance, reference)
+        self._sources[name] = (fn, count, unit, tolerance, repeat)
+
+    def can_remeasure(self, name: str) -> bool:
+        return name in self._sources
+
+    def remeasure(self, name: str) -> tuple[float, str, float, float]:
+        """Mede a métrica de novo com a mesma função e o mesmo corpus"""
+        self.record(name, *self._sources[name])
+        return self[name]
+
+    def forget(self, *names: str):
+        """Impede a nova medição (ex: o core falso da métrica já foi removido)"""
+        for name in names:
+            self._sources.pop(name, None)
+
+
+def regression_metrics(args) -> MetricRecorder:
+    """Funções de data sobre o corpus, conversão em lote, startup da TUI e envio pelo core falso"""
+    metrics = MetricRecorder()
+    corpus = datetime_corpus(args.rows // 50 or 1)
+    zone, base = CORPUS_TIMEZONE, CORPUS_BASE_DATE
+
+    for name, values in corpus.items():
+        metrics.record(f"parse_user_datetime[{name}]",
+                       lambda: [tool.parse_user_datetime(value, base, zone) for value in values], len(values))
+
+    walls = [datetime.fromisoformat(value) for value in corpus["iso_no_offset"]]
+    aware = [datetime.fromisoformat(value) for value in corpus["rfc3339"]]
+    metrics.record("to_rfc3339[local]", lambda: [tool.to_rfc3339(dt) for dt in walls], len(walls))
+    metrics.record("to_rfc3339[timezone]", lambda: [tool.to_rfc3339(dt, zone) for dt in walls], len(walls))
+    metrics.record("to_rfc3339[aware]", lambda: [tool.to_rfc3339(dt) for dt in aware], len(aware))
+    metrics.record("format_friendly[str]", lambda: [tool.format_friendly(value) for value in corpus["rfc3339"]], len(aware))
+    metrics.record("format_friendly[datetime]", lambda: [tool.format_friendly(dt) for dt in aware], len(aware))
+
+    # Metade dos términos antes do início (ajuste para o dia seguinte)
+    starts = corpus["rfc3339"]
+    ends = [tool.to_rfc3339(dt + timedelta(hours=-3 if i % 2 else 1)) for i, dt in enumerate(aware)]
+    ends_dt = [datetime.fromisoformat(value) for value in ends]
+    metrics.record("ensure_end_after_start[str]",
+                   lambda: [tool.ensure_end_after_start(s, e, zone) for s, e in zip(starts, ends)], len(starts))
+    metrics.record("ensure_end_after_start[datetime]",
+                   lambda: [tool.ensure_end_after_start(s, e, zone) for s, e in zip(aware, ends_dt)], len(starts))
+    metrics.record("validate_date_range[str]", lambda: [tool.validate_date_range(s, e) for s, e in zip(starts, ends)],
+                   len(starts))
+
+    # Conversão em lote: coluna de CSV com todos os formatos misturados
+    column = [value for values in corpus.values() for value in values] * 5
+    random.Random(3).shuffle(column)
+    metrics.record("parse_many[coluna]", lambda: tool.parse_many(column, base, zone), len(column), repeat=3)
+
+    # O index.py precisa do rich
+    if importlib.util.find_spec("rich") is not None:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.py")
+        cmd = [sys.executable, script, "--startup-only"]
+        subprocess.run(cmd, capture_output=True, check=True)
+        metrics.record("startup", lambda: subprocess.run(cmd, capture_output=True, check=True), unit="ms",
+                       tolerance=2.0, repeat=args.runs)
+    else:
+        print("[WARN] rich não instalado: startup fora da comparação")
+
+    submission_metrics(args, metrics)
+    return metrics
+
+
+def submission_metrics(args, metrics: MetricRecorder):
+    """Caminhos de envio do OutlookService contra um core falso (sem rede nem build do Rust)"""
+    from Service.SubmitBackend import CoreBackend
+
+    saved = {name: os.environ.get(name) for name in ("OUTLOOK_CORE_PATH", "OUTLOOK_TOKEN")}
+    with tempfile.TemporaryDirectory() as directory:
+        stub = os.path.join(directory, "core")
+        with open(stub, "w", encoding="utf-8") as file:
+            file.write(STUB_CORE.format(python=sys.executable))
+        os.chmod(stub, 0o755)
+        os.environ["OUTLOOK_CORE_PATH"] = stub
+        os.environ.setdefault("OUTLOOK_TOKEN", "stub-token")
+        OutlookService._core_path = None
+        OutlookService.use_backend(CoreBackend())
+        try:
+            events = make_events(200)
+            metrics.record("submit[core create]", lambda: [event.run_outlookfusion() for event in events[:10]], 10,
+                           unit="ms", tolerance=3.0, repeat=3)
+            metrics.record("submit[create-batch x200]",
+                           lambda: OutlookService.create_many(events, concurrency=args.concurrency),
+                           unit="ms", tolerance=3.0, repeat=7)
+            OutlookService.get_worker()
+            metrics.record("submit[worker]", lambda: [event.create() for event in events], len(events),
+                           unit="ms", tolerance=3.0, repeat=7)
+
+            results = OutlookService.create_many(events, concurrency=args.concurrency) + [events[0].create()]
+            failed = [result for result in results if not result.ok]
+            if failed:
+                raise SystemExit(f"[ERROR] Core falso recusou {len(failed)} envios (ex: {failed[0].error})")
+        finally:
+            metrics.forget("submit[core create]", "submit[create-batch x200]", "submit[worker]")
+            # Fecha o worker do core falso: o próximo get_worker sobe o core de verdade
+            OutlookService.use_backend(None)
+            OutlookService._worker = None
+            OutlookService._core_path = None
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def relative_change(value: float, reference: float, saved: dict) -> float:
+    """Variação da métrica em relação ao baseline, descontada a calibração de cada lado"""
+    # Baseline sem calibração (formato antigo): compara o tempo direto
+    speed = reference / saved.get("calibration", reference)
+    return value / (saved["value"] * speed) - 1
+
+
+def bench_regress(args):
+    """
+    Propriedades + métricas comparadas com o baseline salvo (bench_baseline.json).
+
+    Cada métrica é comparada pela razão com a calibração medida junto dela, então
+    o Δ mostrado já desconta a máquina estar mais rápida ou lenta que na gravação.
+    Falha se alguma piorar mais que --threshold (x tolerância da métrica).
+    """
+    bench_properties(args)
+
+    path = args.baseline or BASELINE_PATH
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            baseline = json.load(file)
+    machine = {"python": sys.version.split()[0], "platform": sys.platform, "cpus": os.cpu_count()}
+    if baseline and baseline.get("machine") != machine:
+        print(f"[WARN] Baseline gravado em outra máquina ({baseline.get('machine')}); compare com cuidado")
+
+    metrics = regression_metrics(args)
+    regressions, speeds = [], []
+    print(f"\n{'métrica':<40} {'baseline':>12} {'atual':>12} {'Δ':>8}")
+    for name, (value, unit, tolerance, reference) in metrics.items():
+        saved = baseline.get("metrics", {}).get(name)
+        if saved is None:
+            print(f"{name:<40} {'—':>12} {value:>9.3f} {unit:<2} {'novo':>8}")
+            continue
+        limit = args.threshold * tolerance
+        change = relative_change(value, reference, saved)
+        # Uma regressão de verdade se repete: a métrica fora do limite é medida mais duas vezes
+        for _ in range(2):
+            if change <= limit or not metrics.can_remeasure(name):
+                break
+            retry_value, _, _, retry_reference = metrics.remeasure(name)
+            if relative_change(retry_value, retry_reference, saved) < change:
+                value, reference = retry_value, retry_reference
+                change = relative_change(value, reference, saved)
+        speeds.append(reference / saved.get("calibration", reference))
+        flag = "  ✗" if change > limit else ""
+        print(f"{name:<40} {saved['value']:>9.3f} {unit:<2} {value:>9.3f} {unit:<2} {change:>+7.0%}{flag}")
+        if change > limit:
+            regressions.append(f"{name}: {saved['value']:.3f} → {value:.3f} {unit} ({change:+.0%}, limite {limit:+.0%})")
+    if speeds:
+        print(f"calibração: x{statistics.median(speeds):.2f} do tempo na gravação do baseline (já descontado no Δ)")
+
+    if args.save_baseline or not baseline:
+        saved = {name: {"value": round(value, 4), "unit": unit, "calibration": round(reference, 7)}
+                 for name, (value, unit, _, reference) in metrics.items()}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"machine": machine, "metrics": saved}, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+        print(f"\nbaseline gravado em {path}")
+        return
+    if regressions:
+        for regression in regressions:
+            print(f"[ERROR] {regression}")
+        raise SystemExit(f"[ERROR] {len(regressions)} métricas pioraram além do limite")
+    print(f"\nsem regressões (limite {args.threshold:+.0%})")
+
+
+BENCHMARKS = {
+    "submit": bench_submit,
+    "worker": bench_worker,
+    "async": bench_async,
+    "parse": bench_parse,
+    "parse-many": bench_parse_many,
+    "timezone": bench_timezone,
+    "e2e": bench_e2e,
+    "startup": bench_startup,
+    "store": bench_store,
+    "sync": bench_sync,
+    "conflicts": bench_conflicts,
+    "recurrence": bench_recurrence,
+    "token": bench_token,
+    "template": bench_template,
+    "slots": bench_slots,
+    "backend": bench_backend,
+    "events": bench_events,
+    "listview": bench_listview,
+    "properties": bench_properties,
+    "regress": bench_regress,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Outlook Fusion")
+    parser.add_argument("bench", choices=sorted(BENCHMARKS))
+    parser.add_argument("--events", type=int, default=50, help="Quantidade de eventos")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requisições simultâneas no batch")
+    parser.add_argument("--rows", type=int, default=50000, help="Quantidade de inputs nos benchmarks de data")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latência do mock do Graph")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Variação da latência do mock")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500 no mock")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas 429 no mock")
+    parser.add_argument("--attendees", type=int, default=50, help="Participantes no benchmark de horários livres")
+    parser.add_argument("--runs", type=int, default=20, help="Execuções no benchmark de startup")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Falha se o startup (p50) passar disso")
+    parser.add_argument("--trace", metavar="ARQUIVO", help="Coleta os spans (TUI + core) e grava no formato Chrome")
+    parser.add_argument("--cases", type=int, default=2000, help="Casos sorteados nas propriedades")
+    parser.add_argument("--baseline", metavar="ARQUIVO", help="Baseline do regress (padrão bench_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava as métricas atuais como baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Piora máxima aceita pelo regress (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    tracer = Tracer() if args.trace else None
+    OutlookService.use_tracer(tracer)
+    BENCHMARKS[args.bench](args)
+    if tracer is not None:
+        report_trace(tracer, args.trace)
+
+
+def report_trace(tracer: Tracer, path: str):
+    """Percentis por fase dos spans coletados durante o benchmark"""
+    tracer.export_chrome(path)
+    print(f"\ntrace: {len(tracer.spans)} spans → {path}")
+    for phase, stats in sorted(tracer.summary().items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"  {phase:<15} n={stats['count']:<6} p50={stats['p50_ms']:>8.2f}ms "
+              f"p95={stats['p95_ms']:>8.2f}ms total={stats['total_ms']:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Contém constantes, configurações e dados da aplicação
 Modify with IA
 """
 from dataclasses import dataclass
+import os
 
 
 @dataclass
@@ -35,23 +36,132 @@ class DefaultValues:
     EVENT_DURATION_HOURS: int = 2
 
 
+@dataclass
+class CacheConfig:
+    """Cache local de eventos (SQLite)"""
+    DB_PATH: str = os.path.join(os.path.expanduser("~"), ".outlookfusion", "events.db")
+    TTL_SECONDS: int = 7 * 24 * 3600
+    # Janela sincronizada pelo delta: meses antes/depois do mês atual
+    SYNC_MONTHS_BEFORE: int = 1
+    SYNC_MONTHS_AFTER: int = 12
+
+
+@dataclass
+class TokenConfig:
+    """Obtenção e cache do token do Microsoft Graph (OAuth)"""
+    AUTHORITY: str = "https://login.microsoftonline.com"
+    TENANT: str = "common"
+    SCOPE: str = "offline_access Calendars.ReadWrite"
+    CACHE_PATH: str = os.path.join(os.path.expanduser("~"), ".outlookfusion", "token.json")
+    # Renova o token quando faltar menos que isso para expirar
+    REFRESH_MARGIN_SECONDS: int = 300
+
+
+@dataclass
+class QueueConfig:
+    """Fila persistente de envios (SQLite)"""
+    DB_PATH: str = os.path.join(os.path.expanduser("~"), ".outlookfusion", "queue.db")
+    WORKERS: int = 4
+    # Tempo que um job fica reservado para quem o pegou; depois disso volta para a fila
+    LEASE_SECONDS: float = 120.0
+    MAX_ATTEMPTS: int = 8
+    # Quanto a TUI espera o envio antes de deixar o evento só na fila
+    WAIT_SECONDS: float = 30.0
+    # Ao sair da espera, quanto aguardar os envios em andamento (o resto fica na fila)
+    STOP_SECONDS: float = 2.0
+
+
+@dataclass
+class TemplateConfig:
+    """Modelos de evento (--template)"""
+    PATH: str = os.path.join(os.path.expanduser("~"), ".outlookfusion", "templates.json")
+
+
+@dataclass
+class AvailabilityConfig:
+    """Busca de horários livres (--free-slots)"""
+    # Expediente, no horário de parede do timezone da busca
+    WORK_START: str = "09:00"
+    WORK_END: str = "18:00"
+    # Dias úteis (0 = segunda ... 6 = domingo)
+    WORKDAYS: tuple = (0, 1, 2, 3, 4)
+    # Os horários propostos começam em múltiplos deste passo (no relógio local)
+    STEP_MINUTES: int = 30
+    SEARCH_DAYS: int = 14
+    SLOTS: int = 3
+
+
+@dataclass
+class BackendConfig:
+    """Como os eventos chegam ao Graph (OUTLOOK_BACKEND / OUTLOOK_CORE_PATH sobrepõem)"""
+    # "core": binário Rust (worker persistente e create-batch); "http": requisições feitas
+    # pelo próprio Python; "auto": core quando o binário existe, senão http
+    BACKEND: str = "auto"
+    # Binário do core; sem valor usa target/release/core e, se não existir, target/debug/core
+    CORE_PATH: str = None
+    # Backend http: conexões keep-alive guardadas, limites de taxa e retentativas (os mesmos do core)
+    POOL_SIZE: int = 16
+    RATE: float = 15.0
+    BURST: int = 15
+    MAX_RETRIES: int = 5
+    TIMEOUT_SECONDS: float = 30.0
+
+
+@dataclass
+class DaemonConfig:
+    """Modo serviço (--daemon): fila de eventos + endpoint /metrics"""
+    HOST: str = "127.0.0.1"
+    PORT: int = 9464
+    # Eventos enviados ao mesmo tempo pelo worker do core
+    CONCURRENCY: int = 4
+    # Eventos aguardando envio; acima disso o POST /events responde 503
+    QUEUE_SIZE: int = 1000
+    TIMEOUT_SECONDS: float = 60.0
+
+
+class _LazyConfig:
+    """
+    Campo de `data` criado só no primeiro acesso: o startup não monta as
+    configurações que o fluxo escolhido não usa (passar um valor no construtor
+    continua funcionando)
+    """
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.attribute = "_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            # Default do campo para o @dataclass
+            return None
+        value = obj.__dict__.get(self.attribute)
+        if value is None:
+            value = obj.__dict__[self.attribute] = self.factory()
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attribute] = value
+
+
 @dataclass
 class data:
     """Configuração principal da aplicação"""
     modules_local: list = None
     Debug: bool = False
     
-    # Instâncias de configuração
-    app: AppConfig = None
-    theme: ThemeConfig = None
-    defaults: DefaultValues = None
+    # Instâncias de configuração (criadas no primeiro acesso)
+    app: AppConfig = _LazyConfig(AppConfig)
+    theme: ThemeConfig = _LazyConfig(ThemeConfig)
+    defaults: DefaultValues = _LazyConfig(DefaultValues)
+    cache: CacheConfig = _LazyConfig(CacheConfig)
+    tokens: TokenConfig = _LazyConfig(TokenConfig)
+    queue: QueueConfig = _LazyConfig(QueueConfig)
+    templates: TemplateConfig = _LazyConfig(TemplateConfig)
+    availability: AvailabilityConfig = _LazyConfig(AvailabilityConfig)
+    backend: BackendConfig = _LazyConfig(BackendConfig)
+    daemon: DaemonConfig = _LazyConfig(DaemonConfig)
     
     def __post_init__(self):
         if self.modules_local is None:
             self.modules_local = ["Service"]
-        if self.app is None:
-            self.app = AppConfig()
-        if self.theme is None:
-            self.theme = ThemeConfig()
-        if self.defaults is None:
-            self.defaults = DefaultValues()
@@ -2,12 +2,11 @@
 Index - Ponto de Entrada da Aplicação TUI
 Orquestra os serviços e fluxo principal
 """
-import asyncio
+import sys
 from datetime import datetime, timedelta
 
 from data import data
 from tool import tool
-from Service.OutlookService import OutlookService
 from Service.UIService import UIService
 
 
@@ -15,6 +14,7 @@ from Service.UIService import UIService
 # INICIALIZAÇÃO
 # ═══════════════════════════════════════════════════════════════
 
+# Cada configuração de data_local é criada no primeiro acesso (a UI só usa tema, app e padrões)
 data_local = data()
 ui = UIService(config=data_local)
 
@@ -35,21 +35,33 @@ def Start():
     descr = ui.input_field("Descrição", "", optional=True)
     content = ui.input_field("Conteúdo", "", default=data_local.defaults.CONTENT)
     
+    # Timezone antes das datas: os horários digitados são interpretados nele
+    from Service.TimezoneService import TimezoneService
+    tz = ui.input_field("Timezone", "", default=data_local.defaults.TIMEZONE)
+    while not TimezoneService.is_valid(tz):
+        ui.show_warning_panel(f"Timezone desconhecido: {tz} (use um nome IANA, ex: America/Sao_Paulo)", "")
+        tz = ui.input_field("Timezone", "", default=data_local.defaults.TIMEZONE)
+    
     # Input de horário com dica
     ui.show_hint("Formatos aceitos: 14:00, 14, 05/02 14:00, ISO8601", "⏱️")
     
+    # Próximos horários livres na agenda em cache (sem consultar o Graph) viram a sugestão de início
+    slots = cached_free_slots(tz)
+    if slots:
+        ui.show_hint("Próximos horários livres: " + ", ".join(tool.format_friendly(slot.date_start) for slot in slots), "📅")
+    
     # Data de início
-    default_start = tool.now_rfc3339()
+    default_start = slots[0].date_start if slots else tool.now_rfc3339(tz)
     default_start_display = tool.format_with_friendly(default_start)
-    date_start = ui.input_field("Data de Início", "", default=default_start_display, transform=True)
+    date_start = ui.input_field("Data de Início", "", default=default_start_display, transform=True, timezone=tz)
     date_start = tool.clean_friendly_format(date_start)
     
     # Calcula automaticamente 2h depois da data de início
-    default_end = tool.now_plus_hours_rfc3339(data_local.defaults.EVENT_DURATION_HOURS)
+    default_end = tool.now_plus_hours_rfc3339(data_local.defaults.EVENT_DURATION_HOURS, tz)
     if date_start:
         try:
             start_dt = datetime.fromisoformat(date_start)
-            default_end = tool.to_rfc3339(start_dt + timedelta(hours=data_local.defaults.EVENT_DURATION_HOURS))
+            default_end = tool.to_rfc3339(start_dt + timedelta(hours=data_local.defaults.EVENT_DURATION_HOURS), tz)
         except:
             pass
     
@@ -58,16 +70,32 @@ def Start():
     
     # Data de término (usa date_start como base para quando só hora é informada)
     default_end_display = tool.format_with_friendly(default_end)
-    date_end = ui.input_field("Data de Término", "", default=default_end_display, transform=True, base_date=date_start)
+    date_end = ui.input_field("Data de Término", "", default=default_end_display, transform=True,
+                              base_date=date_start, timezone=tz)
     date_end = tool.clean_friendly_format(date_end)
     
     # Garante que término seja após início (ajusta para dia seguinte se necessário)
-    date_end = tool.ensure_end_after_start(date_start, date_end)
+    date_end = tool.ensure_end_after_start(date_start, date_end, tz)
     
-    # Timezone e localização
-    tz = ui.input_field("Timezone", "", default=data_local.defaults.TIMEZONE)
+    # Localização
     location = ui.input_field("Localização", "", default=data_local.defaults.LOCATION)
     
+    # Repetição opcional (RRULE): uma série no lugar de vários eventos avulsos
+    ui.show_hint("Ex: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10 · FREQ=DAILY;UNTIL=20261231", "🔁")
+    rule = ui.input_field("Repetição", "", optional=True)
+    recurrence = None
+    preview = None
+    if rule:
+        from itertools import islice
+        from Service.Recurrence import Recurrence
+        try:
+            recurrence = Recurrence.from_rrule(rule)
+            upcoming = islice(recurrence.occurrences(date_start, date_end, tz), 3)
+            preview = ", ".join(tool.format_friendly(start) for start, _ in upcoming)
+        except ValueError as e:
+            ui.show_warning_panel(f"Repetição ignorada: {e}", "")
+            recurrence = None
+    
     # Resumo em tabela estilizada
     summary_fields = {
         "Assunto": subject,
@@ -76,7 +104,9 @@ def Start():
         "Início": tool.format_friendly(date_start),
         "Término": tool.format_friendly(date_end),
         "Timezone": tz,
-        "Local": location
+        "Local": location,
+        "Repetição": rule if recurrence else None,
+        "Próximas": preview
     }
     
     summary_table = ui.create_summary_table(" Resumo do Evento", summary_fields)
@@ -84,25 +114,34 @@ def Start():
     
     # Confirmação
     if ui.confirm_prompt("Confirmar criação do evento?", ""):
-        # Criando evento
-        with ui.console.status(f"[{ui.theme.ACCENT}] Criando evento...[/]", spinner="dots"):
-            service = OutlookService(
-                subject=subject,
-                descr=descr,
-                content=content,
-                date_start=date_start,
-                date_end=date_end,
-                timezone=tz,
-                location=location
-            )
-            service.run_outlookfusion()
+        from Service.OutlookService import OutlookService
+        fields = dict(
+            subject=subject,
+            descr=descr,
+            content=content,
+            date_start=date_start,
+            date_end=date_end,
+            timezone=tz,
+            location=location
+        )
+        service = OutlookService.recurring(recurrence, **fields) if recurrence else OutlookService(**fields)
+        
+        job = submit_and_wait([service], "Criando evento...")[0]
         
-        # Sucesso
-        ui.show_success_panel("Evento criado com sucesso!", "")
-        ui.show_info([
-            "O evento foi adicionado ao seu calendário",
-            "Você receberá notificações conforme configurado"
-        ])
+        if job.state == "done":
+            ui.show_success_panel("Evento criado com sucesso!", "")
+            ui.show_info([
+                "O evento foi adicionado ao seu calendário",
+                "Você receberá notificações conforme configurado"
+            ])
+        elif job.state == "failed":
+            ui.show_error_panel(f"Falha ao criar o evento: {job.error}", "")
+        else:
+            ui.show_warning_panel("Evento ainda não confirmado pelo Graph", "")
+            ui.show_info([
+                f"Última tentativa: {job.error}" if job.error else "O envio ainda está em andamento",
+                "O evento continua na fila e será enviado na próxima execução (ou com --drain)"
+            ])
     else:
         # Cancelado
         ui.show_warning_panel("Operação cancelada", "")
@@ -111,18 +150,484 @@ def Start():
     ui.wait_for_exit()
 
 
+def use_event_store():
+    """
+    Abre o cache local e faz o OutlookService gravar nele cada evento criado por esta
+    execução: a agenda, os horários livres e a detecção de duplicatas do --import os
+    enxergam antes da próxima sincronização.
+    """
+    from Service.EventStore import EventStore
+    from Service.OutlookService import OutlookService
+    
+    store = EventStore(path=data_local.cache.DB_PATH, ttl_seconds=data_local.cache.TTL_SECONDS)
+    OutlookService.use_store(store)
+    return store
+
+
+def submit_and_wait(events: list, message: str) -> list:
+    """
+    Grava os eventos na fila persistente (crash ou Ctrl+C não os perdem) e espera o
+    envio por até QueueConfig.WAIT_SECONDS; o que não terminar continua na fila.
+    
+    Returns:
+        Os jobs no estado em que ficaram (done, failed ou ainda pendentes)
+    """
+    import time
+    from Service.OutlookService import OutlookService
+    from Service.JobQueue import JobRunner
+    
+    use_event_store()
+    jobs = OutlookService.jobs().enqueue_many(events)
+    runner = JobRunner(OutlookService.jobs(), workers=data_local.queue.WORKERS)
+    runner.start()
+    deadline = time.monotonic() + data_local.queue.WAIT_SECONDS
+    waited = []
+    try:
+        with ui.console.status(f"[{ui.theme.ACCENT}] {message}[/]", spinner="dots"):
+            for job in jobs:
+                waited.append(runner.wait_for(job.key, timeout=max(0.0, deadline - time.monotonic())))
+    finally:
+        # Um create em andamento pode levar até 90% do lease: não bloqueia a saída esperando por ele
+        stopped = runner.stop(timeout=data_local.queue.STOP_SECONDS)
+        if len(waited) < len(jobs) or not stopped:
+            ui.show_hint("Envios não concluídos continuam na fila (próxima execução ou --drain)", "📥")
+    return waited
+
+
+# ═══════════════════════════════════════════════════════════════
+# MODELOS DE EVENTO
+# ═══════════════════════════════════════════════════════════════
+
+def FromTemplate(name: str, subject: str = None, starts: list[str] = None):
+    """
+    Cria eventos a partir de um modelo salvo: só assunto e horário(s) de início.
+    O que faltar nos argumentos é perguntado (sem o fluxo completo do Start).
+    """
+    from Service.TemplateService import TemplateService
+    
+    try:
+        template = TemplateService(path=data_local.templates.PATH).get(name)
+    except ValueError as e:
+        ui.show_error_panel(str(e), "")
+        return
+    
+    subject = subject or ui.input_field("Assunto do Evento", "")
+    if not starts:
+        ui.show_hint(f"Modelo {name}: {template.duration_minutes} min em {template.location} ({template.timezone})", "⏱️")
+        starts = [ui.input_field("Data de Início", "", default=tool.now_rfc3339(template.timezone))]
+    try:
+        events = template.events((subject, start) for start in starts)
+    except ValueError as e:
+        ui.show_error_panel(str(e), "")
+        return
+    
+    jobs = submit_and_wait(events, f"Criando {len(events)} evento(s) do modelo {name}...")
+    done = sum(1 for job in jobs if job.state == "done")
+    failed = [job for job in jobs if job.state == "failed"]
+    if done == len(jobs):
+        ui.show_success_panel(f"{done} evento(s) criado(s) a partir de {name}", "")
+    else:
+        ui.show_warning_panel(f"{done} criados, {len(failed)} com falha, {len(jobs) - done - len(failed)} ainda na fila", "")
+    ui.show_info([f"{tool.format_friendly(job.payload['date_start'])} · {job.payload['subject']}: {job.error}"
+                  for job in failed[:20]])
+
+
+def SaveTemplate(name: str):
+    """Cria (ou substitui) um modelo respondendo só os campos fixos do evento"""
+    from Service.TemplateService import TemplateService, EventTemplate
+    
+    defaults = data_local.defaults
+    fields = dict(
+        content=ui.input_field("Conteúdo", "", default=defaults.CONTENT),
+        descr=ui.input_field("Descrição", "", optional=True),
+        location=ui.input_field("Localização", "", default=defaults.LOCATION),
+        timezone=ui.input_field("Timezone", "", default=defaults.TIMEZONE),
+        duration_minutes=ui.input_field("Duração (minutos)", "", default=str(defaults.EVENT_DURATION_HOURS * 60)),
+        rrule=ui.input_field("Repetição", "", optional=True) or None,
+    )
+    try:
+        template = EventTemplate(name=name, **fields)
+    except ValueError as e:
+        ui.show_error_panel(f"Modelo inválido: {e}", "")
+        return
+    TemplateService(path=data_local.templates.PATH).save(template)
+    ui.show_success_panel(f"Modelo {name} salvo", "")
+    ui.show_info([f"python index.py --template {name} --subject \"...\" --start 14:00"])
+
+
+def ListTemplates():
+    from Service.TemplateService import TemplateService
+    
+    service = TemplateService(path=data_local.templates.PATH)
+    if not service.names():
+        ui.show_info(["Nenhum modelo salvo (crie com --save-template NOME)"])
+        return
+    ui.show_info([f"{name}: {template.duration_minutes} min · {template.location} · {template.timezone}"
+                  + (f" · {template.rrule}" if template.rrule else "")
+                  for name, template in sorted(service.templates.items())])
+
+
+# ═══════════════════════════════════════════════════════════════
+# HORÁRIOS LIVRES
+# ═══════════════════════════════════════════════════════════════
+
+def cached_free_slots(tz: str, count: int = None) -> list:
+    """Horários livres só pela agenda em cache; vazio se o cache ainda não foi sincronizado"""
+    import os
+    if not os.path.exists(data_local.cache.DB_PATH):
+        return []
+    from Service.AvailabilityService import AvailabilityService
+    from Service.EventStore import EventStore
+    
+    store = EventStore(path=data_local.cache.DB_PATH, ttl_seconds=data_local.cache.TTL_SECONDS)
+    try:
+        if not store.count():
+            return []
+        service = AvailabilityService(tool.now_rfc3339(tz), tool.now_plus_hours_rfc3339(data_local.availability.SEARCH_DAYS * 24, tz),
+                                      tz, config=data_local.availability)
+        service.from_store(store)
+        return service.find(count=count)
+    finally:
+        store.close()
+
+def Agenda():
+    """Agenda em cache (--sync) numa lista rolável com filtro"""
+    import os
+    if not sys.stdin.isatty():
+        ui.show_error_panel("--agenda precisa de um terminal interativo", "")
+        return
+    if not os.path.exists(data_local.cache.DB_PATH):
+        ui.show_warning_panel("Agenda ainda não sincronizada (rode --sync antes)", "")
+        return
+    from Service.Event import EventBatch
+    from Service.EventStore import EventStore
+    
+    store = EventStore(path=data_local.cache.DB_PATH, ttl_seconds=data_local.cache.TTL_SECONDS)
+    try:
+        events = EventBatch(store.list_events(*sync_window()))
+    finally:
+        store.close()
+    if not len(events):
+        ui.show_warning_panel("Nenhum evento em cache na janela sincronizada", "")
+        return
+    ui.show_event_list(events, f"Agenda · {len(events)} eventos")
+
+def FreeSlots(attendees: list[str] = None, days: int = None, count: int = None, duration_minutes: int = None):
+    """
+    Primeiros horários em que todos estão livres: a própria agenda vem do cache local
+    e a dos participantes (--attendee) do getSchedule do Graph.
+    """
+    from Service.AvailabilityService import AvailabilityService
+    from Service.EventStore import EventStore
+    
+    tz = data_local.defaults.TIMEZONE
+    config = data_local.availability
+    days = days or config.SEARCH_DAYS
+    service = AvailabilityService(tool.now_rfc3339(tz), tool.now_plus_hours_rfc3339(days * 24, tz), tz, config=config)
+    
+    store = EventStore(path=data_local.cache.DB_PATH, ttl_seconds=data_local.cache.TTL_SECONDS)
+    try:
+        own = service.from_store(store)
+    finally:
+        store.close()
+    if attendees:
+        with ui.console.status(f"[{ui.theme.ACCENT}] Consultando a agenda de {len(attendees)} participante(s)...[/]",
+                               spinner="dots"):
+            error = service.from_graph(attendees)
+        if error:
+            ui.show_error_panel(f"Falha ao consultar as agendas: {error}", "")
+            return
+    
+    try:
+        slots = service.find(duration_minutes=duration_minutes, count=count)
+    except ValueError as e:
+        ui.show_error_panel(str(e), "")
+        return
+    for schedule, error in service.errors.items():
+        ui.show_warning_panel(f"Agenda de {schedule} ignorada: {error}", "")
+    if not slots:
+        ui.show_warning_panel(f"Nenhum horário livre em comum nos próximos {days} dias", "")
+        return
+    ui.show_success_panel(f"{len(slots)} horário(s) livre(s) para {len(service.busy)} agenda(s)", "")
+    ui.show_info([f"{tool.format_friendly(slot.date_start)} → {tool.format_friendly(slot.date_end)}" for slot in slots]
+                 + [f"Agenda própria: {own} evento(s) do cache (atualize com --sync)"])
+
+
+# ═══════════════════════════════════════════════════════════════
+# IMPORTAÇÃO EM LOTE (NÃO INTERATIVA)
+# ═══════════════════════════════════════════════════════════════
+
+def Import(path: str, resume: bool = True, batch_size: int = 200):
+    """Importa eventos de um arquivo CSV/ICS sem passar pelos prompts"""
+    from Service.ImportService import ImportService
+    
+    # Eventos já no cache entram na detecção de duplicatas/sobreposições, e os importados são gravados nele
+    store = use_event_store()
+    service = ImportService(path=path, resume=resume, batch_size=batch_size, defaults=data_local.defaults,
+                            store=store)
+
+    def on_progress(report):
+        ui.console.print(f"[{ui.theme.TEXT_DIM}]  linha {report.last_row}: "
+                         f"{report.succeeded} criados, {report.failed} falhas, {report.invalid} inválidos[/]")
+
+    report = service.run(on_progress=on_progress)
+
+    if report.aborted:
+        ui.show_error_panel(f"Importação interrompida na linha {report.last_row + 1}", "")
+    elif report.failed or report.invalid:
+        ui.show_warning_panel(f"{report.succeeded} criados, {report.failed + report.invalid} com erro", "")
+    else:
+        ui.show_success_panel(f"{report.succeeded} eventos importados!", "")
+    ui.show_info([f"Linha {row}: {error}" for row, error in report.errors[:20]])
+    if report.skipped:
+        ui.show_info([f"{report.skipped} linhas já importadas foram puladas (checkpoint)"])
+    if report.duplicates or report.overlaps:
+        ui.show_info([f"{report.duplicates} duplicatas não enviadas, "
+                      f"{report.overlaps} eventos sobrepostos a outros da agenda"])
+
+
+# ═══════════════════════════════════════════════════════════════
+# SINCRONIZAÇÃO COM O GRAPH
+# ═══════════════════════════════════════════════════════════════
+
+def sync_window() -> tuple[str, str]:
+    """Janela sincronizada, alinhada ao início do mês (o deltaLink vale enquanto a janela não muda)"""
+    today = datetime.now().astimezone()
+    months = today.year * 12 + today.month - 1
+    first = months - data_local.cache.SYNC_MONTHS_BEFORE
+    last = months + data_local.cache.SYNC_MONTHS_AFTER + 1
+    start = today.replace(year=first // 12, month=first % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = today.replace(year=last // 12, month=last % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    return tool.to_rfc3339(start), tool.to_rfc3339(end)
+
+def Sync(full: bool = False):
+    """Atualiza o cache local com as mudanças da agenda desde a última sincronização"""
+    from Service.EventStore import EventStore
+    from Service.SyncService import SyncService
+    
+    range_start, range_end = sync_window()
+    service = SyncService(store=EventStore(path=data_local.cache.DB_PATH, ttl_seconds=data_local.cache.TTL_SECONDS),
+                          range_start=range_start, range_end=range_end)
+    with ui.console.status(f"[{ui.theme.ACCENT}] Sincronizando agenda...[/]", spinner="dots"):
+        report = service.run(full=full)
+    
+    if not report.ok:
+        ui.show_error_panel(f"Falha na sincronização: {report.error}", "")
+        return
+    kind = "completa" if report.full else "incremental"
+    ui.show_success_panel(f"Sincronização {kind}: {report.upserted} atualizados, {report.deleted} removidos", "")
+    if report.skipped:
+        ui.show_info([f"{report.skipped} eventos sem data reconhecível foram ignorados"])
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOGIN (OAUTH)
+# ═══════════════════════════════════════════════════════════════
+
+def Login():
+    """Login por device code; o refresh token fica no cache e o token passa a ser renovado sozinho"""
+    from Service.TokenService import TokenService, TokenError
+    
+    try:
+        TokenService().device_login(on_prompt=lambda message: ui.show_info([message]))
+    except TokenError as e:
+        ui.show_error_panel(f"Falha no login: {e}", "")
+        return
+    ui.show_success_panel("Login concluído!", "")
+
+
+# ═══════════════════════════════════════════════════════════════
+# FILA DE ENVIOS
+# ═══════════════════════════════════════════════════════════════
+
+def Drain():
+    """Envia os eventos que ficaram na fila persistente (ex: após um crash ou Ctrl+C)"""
+    from Service.OutlookService import OutlookService
+    from Service.JobQueue import JobRunner
+    
+    use_event_store()
+    jobs = OutlookService.jobs()
+    before = jobs.counts()
+    with ui.console.status(f"[{ui.theme.ACCENT}] Enviando {before['pending'] + before['running']} eventos da fila...[/]",
+                           spinner="dots"):
+        JobRunner(jobs, workers=data_local.queue.WORKERS).drain()
+    after = jobs.counts()
+    
+    sent = after["done"] - before["done"]
+    failed = after["failed"] - before["failed"]
+    waiting = after["pending"] + after["running"]
+    if failed:
+        ui.show_warning_panel(f"{sent} enviados, {failed} com falha", "")
+        ui.show_info([f"{job.payload.get('subject', '')}: {job.error}" for job in jobs.failed(limit=failed)])
+    else:
+        ui.show_success_panel(f"{sent} eventos enviados", "")
+    if waiting:
+        ui.show_info([f"{waiting} eventos aguardando nova tentativa (backoff ou envio em outro processo)"])
+
+
 # ═══════════════════════════════════════════════════════════════
-# INICIALIZAÇÃO ASSÍNCRONA
+# MODO SERVIÇO
 # ═══════════════════════════════════════════════════════════════
 
-async def main():
+def Daemon(host: str = None, port: int = None):
+    """Recebe eventos em POST /events e expõe as métricas em /metrics até Ctrl+C"""
+    from Service.DaemonService import DaemonService
+    
+    config = data_local.daemon
+    use_event_store()
+    service = DaemonService(host=host or config.HOST, port=config.PORT if port is None else port,
+                            concurrency=config.CONCURRENCY, queue_size=config.QUEUE_SIZE,
+                            timeout=config.TIMEOUT_SECONDS)
     try:
-        await tool.add_path_modules(data_local)
-        if data_local.Debug:
-            tool.verify_modules()
-    except StopAsyncIteration as E:
-        print(f"[ERROR] Erro StopAsycnInteration, Erro: {E}")
+        service.serve_forever(on_ready=lambda: ui.show_success_panel(
+            f"Serviço em {service.url} (POST /events, GET /metrics) · Ctrl+C para encerrar", ""))
+    except OSError as e:
+        ui.show_error_panel(f"Não foi possível iniciar o serviço: {e}", "")
+
+
+# ═══════════════════════════════════════════════════════════════
+# PERFIL DE STARTUP
+# ═══════════════════════════════════════════════════════════════
+
+def ProfileStartup(top: int = 15):
+    """Mostra quanto cada import custa até o primeiro prompt (equivalente a -X importtime)"""
+    profile = tool.profile_startup(__file__, top=top)
+    ui.console.print(f"[bold {ui.theme.PRIMARY}]Startup: {profile['wall_ms']:.1f}ms "
+                     f"(imports: {profile['imports_ms']:.1f}ms)[/]")
+    ui.console.print(f"[{ui.theme.TEXT_DIM}]{'cumulativo':>12} {'próprio':>10}  módulo[/]")
+    for name, self_us, cumulative_us in profile["modules"]:
+        ui.console.print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRACE (TEMPO POR FASE)
+# ═══════════════════════════════════════════════════════════════
+
+TRACE_PHASES = ("spawn", "wait", "core", "parse", "build_json", "rate_limit", "request", "response", "backoff")
+
+def StartTrace():
+    """Liga a coleta de spans na TUI e no core (OUTLOOK_TRACE=1)"""
+    from Service.Tracer import Tracer
+    from Service.OutlookService import OutlookService
+    
+    tracer = Tracer()
+    OutlookService.use_tracer(tracer)
+    return tracer
+
+def ShowTrace(tracer, path: str, top: int = 20):
+    """Tempo por fase de cada evento (os mais lentos primeiro) e exportação no formato Chrome trace"""
+    if not tracer.spans:
+        ui.show_warning_panel("Nenhum span coletado", "")
+        return
+    tracer.export_chrome(path)
+    
+    breakdown = tracer.breakdown()
+    phases = [phase for phase in TRACE_PHASES if any(phase in times for times in breakdown.values())]
+    phases += sorted({phase for times in breakdown.values() for phase in times} - set(phases))
+    
+    ui.console.print(f"[bold {ui.theme.PRIMARY}]Trace: {len(tracer.spans)} spans, {len(breakdown)} eventos → {path}[/]")
+    ui.console.print(f"[{ui.theme.TEXT_DIM}]{'evento':>10} " + " ".join(f"{phase:>11}" for phase in phases) + "[/]")
+    slowest = sorted(breakdown.items(), key=lambda item: item[1].get("wait", sum(item[1].values())), reverse=True)
+    for event, times in slowest[:top]:
+        ui.console.print(f"{event:>10} " + " ".join(
+            f"{times[phase]:>9.1f}ms" if phase in times else f"{'-':>11}" for phase in phases))
+    if len(slowest) > top:
+        ui.console.print(f"[{ui.theme.TEXT_DIM}]... mais {len(slowest) - top} eventos no arquivo de trace[/]")
+    
+    ui.console.print(f"[{ui.theme.TEXT_DIM}]{'fase':>12} {'n':>6} {'p50':>10} {'p95':>10} {'total':>11}[/]")
+    for phase, stats in tracer.summary().items():
+        ui.console.print(f"{phase:>12} {stats['count']:>6} {stats['p50_ms']:>8.1f}ms "
+                         f"{stats['p95_ms']:>8.1f}ms {stats['total_ms']:>9.1f}ms")
+
+
+# ═══════════════════════════════════════════════════════════════
+# INICIALIZAÇÃO
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    tool.add_path_modules(data_local)
+    if data_local.Debug:
+        tool.verify_modules()
+
+def parse_args(argv: list[str]):
+    """Argumentos de linha de comando (argparse só é importado quando há argumentos)"""
+    if not argv:
+        return None
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Outlook Fusion TUI")
+    parser.add_argument("--import", dest="import_path", metavar="ARQUIVO",
+                        help="Importa eventos de um arquivo .csv ou .ics (modo não interativo)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Ignora o checkpoint e importa o arquivo desde o início")
+    parser.add_argument("--batch-size", type=int, default=200, help="Eventos por lote enviado ao core")
+    parser.add_argument("--sync", action="store_true",
+                        help="Sincroniza o cache local com a agenda (delta do Graph)")
+    parser.add_argument("--full-sync", action="store_true",
+                        help="Com --sync, ignora o deltaLink salvo e refaz a carga completa")
+    parser.add_argument("--login", action="store_true",
+                        help="Login no Microsoft Graph por device code (requer OUTLOOK_CLIENT_ID)")
+    parser.add_argument("--trace", metavar="ARQUIVO",
+                        help="Mede cada fase (TUI, core, Graph) e grava um trace no formato Chrome")
+    parser.add_argument("--drain", action="store_true",
+                        help="Envia os eventos que ficaram na fila persistente")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Modo serviço: fila de eventos em POST /events e métricas Prometheus em /metrics")
+    parser.add_argument("--port", type=int, default=None, help="Porta do --daemon (padrão 9464)")
+    parser.add_argument("--template", metavar="NOME",
+                        help="Cria eventos a partir de um modelo salvo (com --subject e --start)")
+    parser.add_argument("--subject", help="Assunto do evento criado com --template")
+    parser.add_argument("--start", action="append", metavar="INÍCIO",
+                        help="Início do evento criado com --template (14:00, 05/02 14:00, ISO8601); pode repetir")
+    parser.add_argument("--save-template", metavar="NOME", help="Cria ou substitui um modelo de evento")
+    parser.add_argument("--templates", action="store_true", help="Lista os modelos salvos")
+    parser.add_argument("--free-slots", action="store_true",
+                        help="Mostra os próximos horários livres em comum (agenda em cache + --attendee)")
+    parser.add_argument("--attendee", action="append", metavar="EMAIL",
+                        help="Participante consultado no Graph com --free-slots; pode repetir")
+    parser.add_argument("--days", type=int, default=None, help="Dias à frente buscados com --free-slots (padrão 14)")
+    parser.add_argument("--count", type=int, default=None, help="Horários mostrados com --free-slots (padrão 3)")
+    parser.add_argument("--duration", type=int, default=None, metavar="MINUTOS",
+                        help="Duração procurada com --free-slots (padrão EVENT_DURATION_HOURS)")
+    parser.add_argument("--agenda", action="store_true",
+                        help="Lista rolável da agenda em cache (↑↓, PgUp/PgDn, / filtra, q sai)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mostra o tempo de import de cada módulo no startup")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="Inicializa e sai antes do primeiro prompt (usado pelo benchmark de startup)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    asyncio.run(main())
-    Start()
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    main()
+    tracer = StartTrace() if args is not None and args.trace else None
+    if args is None:
+        Start()
+    elif args.startup_only:
+        pass
+    elif args.profile_startup:
+        ProfileStartup()
+    elif args.login:
+        Login()
+    elif args.drain:
+        Drain()
+    elif args.daemon:
+        Daemon(port=args.port)
+    elif args.template:
+        FromTemplate(args.template, args.subject, args.start)
+    elif args.save_template:
+        SaveTemplate(args.save_template)
+    elif args.templates:
+        ListTemplates()
+    elif args.agenda:
+        Agenda()
+    elif args.free_slots:
+        FreeSlots(args.attendee, days=args.days, count=args.count, duration_minutes=args.duration)
+    elif args.sync:
+        Sync(full=args.full_sync)
+    elif args.import_path:
+        Import(args.import_path, resume=not args.no_resume, batch_size=args.batch_size)
+    else:
+        Start()
+    if tracer is not None:
+        ShowTrace(tracer, args.trace)
\ No newline at end of file
@@ -0,0 +1,583 @@
+"""
+Mock Graph - Servidor Local que Imita o Microsoft Graph
+Usado nos benchmarks e para testar o core sem acessar a API real
+
+Uso:
+    python mock_graph.py --port 8765 --latency-ms 40 --error-rate 0.01 --throttle-rate 0.05
+    OUTLOOK_GRAPH_URL=http://127.0.0.1:8765 OUTLOOK_TOKEN=fake python index.py
+
+Endpoint de token fake (OAuth): <url>/common/oauth2/v2.0/token e /devicecode
+    OUTLOOK_TOKEN_URL=http://127.0.0.1:8765/common/oauth2/v2.0/token OUTLOOK_CLIENT_ID=mock ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+@dataclass
+class MockGraphConfig:
+    """Comportamento do servidor mock"""
+    latency_ms: float = 0.0          # Latência base de cada resposta
+    jitter_ms: float = 0.0           # Variação aleatória somada à latência
+    error_rate: float = 0.0          # Fração de requisições que retornam 500
+    throttle_rate: float = 0.0       # Fração de requisições que retornam 429
+    retry_after: int = 1             # Valor do header Retry-After nas respostas 429
+    seed: int = None
+    token_ttl: int = 3600            # expires_in dos tokens emitidos pelo endpoint fake
+    strict_auth: bool = False        # Só aceita tokens emitidos (e não expirados) pelo endpoint fake
+
+
+@dataclass
+class MockGraphServer:
+    """Servidor HTTP em thread própria com os endpoints de eventos do Graph"""
+    host: str = "127.0.0.1"
+    port: int = 0
+    config: MockGraphConfig = None
+
+    events: dict = field(default_factory=dict, init=False, repr=False)
+    stats: dict = field(default_factory=lambda: {"requests": 0, "created": 0, "errors": 0, "throttled": 0,
+                                                 "batches": 0, "subrequests": 0, "delta_pages": 0,
+                                                 "token_requests": 0, "unauthorized": 0, "deduplicated": 0,
+                                                 "schedules": 0},
+                        init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # Log de alterações (seq, id) e estados de paginação/delta do calendarView/delta
+    _changes: list = field(default_factory=list, init=False, repr=False)
+    _seq: int = field(default=0, init=False, repr=False)
+    _skip_tokens: dict = field(default_factory=dict, init=False, repr=False)
+    # Ocorrências canceladas de séries recorrentes ("<id da série>_<YYYYMMDD>")
+    cancelled: set = field(default_factory=set, init=False, repr=False)
+    # transactionId → id do evento criado (reenvio com o mesmo transactionId não duplica)
+    _transactions: dict = field(default_factory=dict, init=False, repr=False)
+    # Endpoint de token fake: access token → expiração, refresh tokens válidos, device codes pendentes
+    _access_tokens: dict = field(default_factory=dict, init=False, repr=False)
+    _refresh_tokens: set = field(default_factory=set, init=False, repr=False)
+    _device_codes: dict = field(default_factory=dict, init=False, repr=False)
+    _delta_tokens: dict = field(default_factory=dict, init=False, repr=False)
+    _server: ThreadingHTTPServer = field(default=None, init=False, repr=False)
+    _rng: random.Random = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.config is None:
+            self.config = MockGraphConfig()
+        self._rng = random.Random(self.config.seed)
+
+    @property
+    def url(self) -> str:
+        """URL base para usar em OUTLOOK_GRAPH_URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockGraphServer":
+        """Sobe o servidor em background e retorna a própria instância"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Derruba o servidor"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ═══════════════════════════════════════════════════════════════
+    # COMPORTAMENTO
+    # ═══════════════════════════════════════════════════════════════
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+    def _delay(self):
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            with self._lock:
+                delay += self._rng.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _faults(self):
+        """Retorna (status, headers, body) de uma falha injetada, ou None"""
+        if self._roll(self.config.throttle_rate):
+            self._count("throttled")
+            return 429, {"Retry-After": str(self.config.retry_after)}, {
+                "error": {"code": "TooManyRequests", "message": "Mock throttling"}}
+        if self._roll(self.config.error_rate):
+            self._count("errors")
+            return 500, {}, {"error": {"code": "InternalServerError", "message": "Mock error"}}
+        return None
+
+    def _log_change(self, event_id: str):
+        """Registra a alteração para o delta (chamar com o lock)"""
+        self._seq += 1
+        self._changes.append((self._seq, event_id))
+
+    def create_event(self, body: dict) -> dict:
+        """Guarda o evento e devolve a representação criada"""
+        event = dict(body)
+        event["id"] = uuid.uuid4().hex
+        event["changeKey"] = uuid.uuid4().hex[:16]
+        transaction = body.get("transactionId")
+        with self._lock:
+            existing = self.events.get(self._transactions.get(transaction)) if transaction else None
+            if existing is not None:
+                self.stats["deduplicated"] += 1
+                return dict(existing)
+            if transaction:
+                self._transactions[transaction] = event["id"]
+            self.events[event["id"]] = event
+            self.stats["created"] += 1
+            self._log_change(event["id"])
+        return event
+
+    def update_event(self, event_id: str, changes: dict) -> dict:
+        """Aplica um PATCH ao evento; retorna None se ele não existir"""
+        with self._lock:
+            event = self.events.get(event_id)
+            if event is None:
+                return None
+            event.update(changes)
+            event["changeKey"] = uuid.uuid4().hex[:16]
+            self._log_change(event_id)
+            return dict(event)
+
+    def delete_event(self, event_id: str) -> bool:
+        with self._lock:
+            master_id, _, day = event_id.partition("_")
+            if day and master_id in self.events:
+                # Ocorrência de uma série: só marca como cancelada
+                self.cancelled.add(event_id)
+                self._log_change(master_id)
+                return True
+            if self.events.pop(event_id, None) is None:
+                return False
+            self._log_change(event_id)
+            return True
+
+    def instances(self, event_id: str, start: datetime, end: datetime) -> list:
+        """Ocorrências de uma série dentro da janela (GET /me/events/{id}/instances)"""
+        from Service.Recurrence import Recurrence
+
+        with self._lock:
+            event = self.events.get(event_id)
+            event = dict(event) if event else None
+        if event is None:
+            return None
+        if not event.get("recurrence"):
+            return [event] if self._in_window(event, start, end) else []
+
+        result = []
+        recurrence = Recurrence.from_graph(event["recurrence"])
+        for date_start, date_end in recurrence.occurrences(event["start"]["dateTime"], event["end"]["dateTime"],
+                                                           event["start"].get("timeZone")):
+            if self._utc(date_start) >= end:
+                break
+            instance_id = f"{event_id}_{date_start[:10].replace('-', '')}"
+            if self._utc(date_end) > start and instance_id not in self.cancelled:
+                result.append({**event, "id": instance_id, "type": "occurrence", "seriesMasterId": event_id,
+                               "start": {"dateTime": date_start, "timeZone": event["start"].get("timeZone")},
+                               "end": {"dateTime": date_end, "timeZone": event["end"].get("timeZone")}})
+        return result
+
+    def expire_delta_tokens(self):
+        """Invalida todos os deltaLinks emitidos (o próximo uso recebe 410 Gone)"""
+        with self._lock:
+            self._delta_tokens.clear()
+            self._skip_tokens.clear()
+
+    # ═══════════════════════════════════════════════════════════════
+    # TOKEN (OAuth fake)
+    # ═══════════════════════════════════════════════════════════════
+
+    @property
+    def token_url(self) -> str:
+        """URL para usar em OUTLOOK_TOKEN_URL"""
+        return f"{self.url}/common/oauth2/v2.0/token"
+
+    def issue_refresh_token(self) -> str:
+        """Cria um refresh token válido (para semear OUTLOOK_REFRESH_TOKEN nos testes)"""
+        token = f"refresh-{uuid.uuid4().hex}"
+        with self._lock:
+            self._refresh_tokens.add(token)
+        return token
+
+    def expire_access_tokens(self):
+        """Revoga todos os access tokens emitidos (as próximas chamadas recebem 401)"""
+        with self._lock:
+            self._access_tokens.clear()
+
+    def token_valid(self, token: str) -> bool:
+        with self._lock:
+            return self._access_tokens.get(token, 0) > time.time()
+
+    def _issue(self) -> dict:
+        """Emite access + refresh token (o refresh é rotacionado; chamar com o lock)"""
+        access, refresh = f"access-{uuid.uuid4().hex}", f"refresh-{uuid.uuid4().hex}"
+        self._access_tokens[access] = time.time() + self.config.token_ttl
+        self._refresh_tokens.add(refresh)
+        return {"token_type": "Bearer", "access_token": access, "refresh_token": refresh,
+                "expires_in": self.config.token_ttl}
+
+    def handle_token(self, endpoint: str, form: dict) -> tuple[int, dict]:
+        """POST /<tenant>/oauth2/v2.0/token e /devicecode"""
+        self._count("token_requests")
+        invalid = {"error": "invalid_grant", "error_description": "Mock: grant inválido"}
+        with self._lock:
+            if endpoint == "devicecode":
+                code = uuid.uuid4().hex
+                self._device_codes[code] = 0
+                return 200, {"device_code": code, "user_code": code[:8].upper(), "interval": 0, "expires_in": 60,
+                             "verification_uri": f"{self.url}/devicelogin",
+                             "message": f"Mock: use o código {code[:8].upper()} em {self.url}/devicelogin"}
+
+            grant = form.get("grant_type")
+            if grant == "refresh_token":
+                if form.get("refresh_token") not in self._refresh_tokens:
+                    return 400, invalid
+                self._refresh_tokens.discard(form["refresh_token"])
+                return 200, self._issue()
+            if grant == "client_credentials":
+                if not form.get("client_secret"):
+                    return 401, {"error": "invalid_client", "error_description": "Mock: client_secret ausente"}
+                issued = self._issue()
+                issued.pop("refresh_token")
+                return 200, issued
+            if grant == "urn:ietf:params:oauth:grant-type:device_code":
+                polls = self._device_codes.get(form.get("device_code"))
+                if polls is None:
+                    return 400, {"error": "expired_token"}
+                if polls == 0:
+                    # Primeira consulta: usuário ainda não confirmou
+                    self._device_codes[form["device_code"]] = 1
+                    return 400, {"error": "authorization_pending"}
+                del self._device_codes[form["device_code"]]
+                return 200, self._issue()
+            return 400, {"error": "unsupported_grant_type"}
+
+    # ═══════════════════════════════════════════════════════════════
+    # DELTA (calendarView/delta)
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _utc(value: str) -> datetime:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+    def _in_window(self, event: dict, start: datetime, end: datetime) -> bool:
+        try:
+            return (self._utc(event["start"]["dateTime"]) < end
+                    and self._utc(event["end"]["dateTime"]) > start)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def _graph_view(self, event: dict) -> dict:
+        """Evento como o Graph devolve com Prefer: outlook.timezone="UTC" """
+        view = dict(event)
+        for key in ("start", "end"):
+            utc = self._utc(event[key]["dateTime"])
+            view[key] = {"dateTime": utc.strftime("%Y-%m-%dT%H:%M:%S.0000000"), "timeZone": "UTC"}
+        view["originalStartTimeZone"] = event["start"].get("timeZone", "UTC")
+        return view
+
+    def handle_delta(self, query: dict, page_size: int) -> tuple[int, dict]:
+        """
+        GET /v1.0/me/calendarView/delta: carga completa (startDateTime/endDateTime),
+        próximas páginas ($skiptoken) ou alterações desde a última sincronização ($deltatoken).
+        """
+        self._count("delta_pages")
+        with self._lock:
+            if "$skiptoken" in query:
+                state = self._skip_tokens.pop(query["$skiptoken"][0], None)
+                if state is None:
+                    return 410, {"error": {"code": "SyncStateNotFound", "message": "Invalid skip token"}}
+                items, seq, start, end = state
+            elif "$deltatoken" in query:
+                state = self._delta_tokens.get(query["$deltatoken"][0])
+                if state is None:
+                    return 410, {"error": {"code": "SyncStateNotFound", "message": "Invalid delta token"}}
+                since, start, end = state
+                changed = dict.fromkeys(event_id for seq, event_id in self._changes if seq > since)
+                items = []
+                for event_id in changed:
+                    event = self.events.get(event_id)
+                    if event is not None and self._in_window(event, start, end):
+                        items.append(self._graph_view(event))
+                    else:
+                        items.append({"id": event_id, "@removed": {"reason": "deleted"}})
+                seq = self._seq
+            else:
+                try:
+                    start = self._utc(query["startDateTime"][0])
+                    end = self._utc(query["endDateTime"][0])
+                except (KeyError, ValueError):
+                    return 400, {"error": {"code": "BadRequest", "message": "startDateTime/endDateTime required"}}
+                window = [event for event in self.events.values() if self._in_window(event, start, end)]
+                window.sort(key=lambda event: self._utc(event["start"]["dateTime"]))
+                items = [self._graph_view(event) for event in window]
+                seq = self._seq
+
+            page, rest = items[:page_size], items[page_size:]
+            if rest:
+                token = uuid.uuid4().hex
+                self._skip_tokens[token] = (rest, seq, start, end)
+                return 200, {"value": page, "@odata.nextLink": f"{self.url}/v1.0/me/calendarView/delta?$skiptoken={token}"}
+            token = uuid.uuid4().hex
+            self._delta_tokens[token] = (seq, start, end)
+            return 200, {"value": page, "@odata.deltaLink": f"{self.url}/v1.0/me/calendarView/delta?$deltatoken={token}"}
+
+    # ═══════════════════════════════════════════════════════════════
+    # AGENDA (calendar/getSchedule)
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def busy_blocks(email: str, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """
+        Horários ocupados sintéticos de um participante (UTC): de 0 a 4 reuniões por dia útil
+        entre 8h e 18h, sorteadas com semente fixa por e-mail e dia (a mesma agenda em toda consulta)
+        """
+        blocks = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            if day.weekday() < 5:
+                rng = random.Random(f"{email}|{day.date().isoformat()}")
+                for _ in range(rng.randint(0, 4)):
+                    begin = day + timedelta(minutes=rng.randrange(8 * 60, 18 * 60, 15))
+                    finish = begin + timedelta(minutes=rng.choice((30, 45, 60, 90, 120)))
+                    if begin < end and finish > start:
+                        blocks.append((begin, finish))
+            day += timedelta(days=1)
+        blocks.sort()
+        return blocks
+
+    def handle_schedule(self, body: dict) -> tuple[int, dict]:
+        """POST /v1.0/me/calendar/getSchedule (até 20 agendas e 62 dias por chamada)"""
+        self._count("schedules")
+        schedules = body.get("schedules") or []
+        if not schedules or len(schedules) > 20:
+            return 400, {"error": {"code": "BadRequest", "message": "schedules must have 1 to 20 entries"}}
+        try:
+            start = self._utc(body["startTime"]["dateTime"])
+            end = self._utc(body["endTime"]["dateTime"])
+        except (KeyError, TypeError, ValueError):
+            return 400, {"error": {"code": "BadRequest", "message": "startTime/endTime required"}}
+        if end <= start or end - start > timedelta(days=62):
+            return 400, {"error": {"code": "BadRequest", "message": "Time window must be 1 to 62 days"}}
+
+        value = []
+        for email in schedules:
+            if "@" not in str(email):
+                value.append({"scheduleId": email, "error": {"message": f"Invalid recipient: {email}",
+                                                             "responseCode": "ErrorInvalidRecipients"}})
+                continue
+            items = [{"status": "busy", "subject": "Mock",
+                      "start": {"dateTime": begin.strftime("%Y-%m-%dT%H:%M:%S.0000000"), "timeZone": "UTC"},
+                      "end": {"dateTime": finish.strftime("%Y-%m-%dT%H:%M:%S.0000000"), "timeZone": "UTC"}}
+                     for begin, finish in self.busy_blocks(email, start, end)]
+            value.append({"scheduleId": email, "availabilityView": "", "scheduleItems": items})
+        return 200, {"value": value}
+
+    def handle_batch(self, body: dict) -> tuple[int, dict]:
+        """JSON batching (/$batch): cada sub-requisição passa pela injeção de falhas"""
+        requests = body.get("requests") or []
+        if len(requests) > 20:
+            return 400, {"error": {"code": "BadRequest", "message": "Batch limit is 20 requests"}}
+        responses = []
+        for request in requests:
+            self._count("subrequests")
+            fault = self._faults()
+            if fault:
+                status, headers, error = fault
+                responses.append({"id": request.get("id"), "status": status, "headers": headers, "body": error})
+            elif request.get("method") == "POST" and request.get("url", "").rstrip("/") == "/me/events":
+                responses.append({"id": request.get("id"), "status": 201,
+                                  "headers": {"Content-Type": "application/json"},
+                                  "body": self.create_event(request.get("body") or {})})
+            else:
+                responses.append({"id": request.get("id"), "status": 404, "headers": {},
+                                  "body": {"error": {"code": "NotFound", "message": request.get("url")}}})
+        self._count("batches")
+        return 200, {"responses": responses}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalho e corpo saem em writes separados; sem isso o Nagle + ACK atrasado
+            # do cliente somam ~40ms por resposta em conexões keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict = None, headers: dict = None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                return json.loads(raw) if raw else {}
+
+            def _page_size(self) -> int:
+                for value in self.headers.get_all("Prefer") or []:
+                    for preference in value.split(","):
+                        name, _, size = preference.strip().partition("=")
+                        if name == "odata.maxpagesize" and size.isdigit():
+                            return int(size)
+                return 100
+
+            def _authorized(self) -> bool:
+                authorization = self.headers.get("Authorization") or ""
+                if not authorization.startswith("Bearer "):
+                    self._send(401, {"error": {"code": "InvalidAuthenticationToken", "message": "Missing token"}})
+                    return False
+                if server.config.strict_auth and not server.token_valid(authorization[len("Bearer "):]):
+                    server._count("unauthorized")
+                    self._send(401, {"error": {"code": "InvalidAuthenticationToken", "message": "Token expired"}})
+                    return False
+                return True
+
+            def do_POST(self):
+                server._count("requests")
+                if "/oauth2/v2.0/" in self.path:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+                    self._send(*server.handle_token(self.path.rstrip("/").rsplit("/", 1)[-1], form))
+                    return
+                try:
+                    body = self._read_json()
+                except ValueError:
+                    self._send(400, {"error": {"code": "BadRequest", "message": "Invalid JSON"}})
+                    return
+                server._delay()
+                if not self._authorized():
+                    return
+                if self.path.rstrip("/") == "/v1.0/$batch":
+                    self._send(*server.handle_batch(body))
+                    return
+                fault = server._faults()
+                if fault:
+                    status, headers, error = fault
+                    self._send(status, error, headers)
+                    return
+                if self.path.rstrip("/") == "/v1.0/me/events":
+                    self._send(201, server.create_event(body))
+                elif self.path.rstrip("/") == "/v1.0/me/calendar/getSchedule":
+                    self._send(*server.handle_schedule(body))
+                else:
+                    self._send(404, {"error": {"code": "NotFound", "message": self.path}})
+
+            def do_GET(self):
+                server._count("requests")
+                server._delay()
+                if not self._authorized():
+                    return
+                url = urlsplit(self.path)
+                if url.path.rstrip("/") == "/v1.0/me/events":
+                    with server._lock:
+                        events = list(server.events.values())
+                    self._send(200, {"value": events})
+                elif url.path.startswith("/v1.0/me/events/") and url.path.rstrip("/").endswith("/instances"):
+                    query = parse_qs(url.query)
+                    try:
+                        start = server._utc(query["startDateTime"][0])
+                        end = server._utc(query["endDateTime"][0])
+                    except (KeyError, ValueError):
+                        self._send(400, {"error": {"code": "BadRequest", "message": "startDateTime/endDateTime required"}})
+                        return
+                    found = server.instances(url.path.split("/")[4], start, end)
+                    if found is None:
+                        self._send(404, {"error": {"code": "ErrorItemNotFound", "message": self.path}})
+                    else:
+                        self._send(200, {"value": found})
+                elif url.path.rstrip("/") == "/v1.0/me/calendarView/delta":
+                    fault = server._faults()
+                    if fault:
+                        status, headers, error = fault
+                        self._send(status, error, headers)
+                        return
+                    self._send(*server.handle_delta(parse_qs(url.query), self._page_size()))
+                else:
+                    self._send(404, {"error": {"code": "NotFound", "message": self.path}})
+
+            def _event_id(self) -> str:
+                prefix = "/v1.0/me/events/"
+                return self.path[len(prefix):].rstrip("/") if self.path.startswith(prefix) else None
+
+            def do_PATCH(self):
+                server._count("requests")
+                try:
+                    body = self._read_json()
+                except ValueError:
+                    self._send(400, {"error": {"code": "BadRequest", "message": "Invalid JSON"}})
+                    return
+                server._delay()
+                if not self._authorized():
+                    return
+                event = server.update_event(self._event_id(), body) if self._event_id() else None
+                if event is None:
+                    self._send(404, {"error": {"code": "ErrorItemNotFound", "message": self.path}})
+                else:
+                    self._send(200, event)
+
+            def do_DELETE(self):
+                server._count("requests")
+                server._delay()
+                if not self._authorized():
+                    return
+                if self._event_id() and server.delete_event(self._event_id()):
+                    self._send(204)
+                else:
+                    self._send(404, {"error": {"code": "ErrorItemNotFound", "message": self.path}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor mock do Microsoft Graph")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    config = MockGraphConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                             throttle_rate=args.throttle_rate, retry_after=args.retry_after)
+    server = MockGraphServer(host=args.host, port=args.port, config=config).start()
+    print(f"Mock Graph em {server.url} (Ctrl-C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,12 @@ from dataclasses import dataclass
 from data import data
 import subprocess
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
 from typing import Optional
 
+from Service.TimezoneService import TimezoneService
+
 
 @dataclass
 class tool:
@@ -34,12 +37,37 @@ class tool:
         """Retorna o sistema operacional atual"""
         return platform.system()
     
+    @staticmethod
+    def atomic_write(path: str, text: str, mode: int = 0o666):
+        """
+        Grava `text` em `path` de forma atômica (arquivo temporário na mesma pasta + rename).
+        
+        Quem lê vê o arquivo antigo ou o novo inteiro; cada gravação usa um temporário
+        próprio (O_EXCL), então duas gravações simultâneas não escrevem no mesmo arquivo.
+        
+        Args:
+            mode: Permissões do arquivo novo (antes da umask), ex: 0o600 para segredos
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     # ═══════════════════════════════════════════════════════════════
     # MÓDULOS
     # ═══════════════════════════════════════════════════════════════
 
     @staticmethod
-    async def verify_modules():
+    def verify_modules():
         """Verifica e instala dependências do requirements.txt"""
         try:
             req_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "requirements", "requirements.txt"))
@@ -49,7 +77,7 @@ class tool:
             return
         
     @staticmethod
-    async def add_path_modules(data_local: data):
+    def add_path_modules(data_local: data):
         """Adiciona caminhos de módulos locais ao sys.path"""
         if data_local.modules_local is None:
             return
@@ -64,46 +92,132 @@ class tool:
             print(f"[ERROR] Erro ao adicionar caminhos: {E}")
             return
     
+    # ═══════════════════════════════════════════════════════════════
+    # PERFIL DE STARTUP
+    # ═══════════════════════════════════════════════════════════════
+    
+    @staticmethod
+    def profile_startup(script: str, top: int = 15) -> dict:
+        """
+        Mede o startup de um script rodando-o com --startup-only.
+        
+        Returns:
+            {"wall_ms": tempo total do processo,
+             "imports_ms": soma dos imports de primeiro nível (-X importtime),
+             "modules": [(módulo, self_us, cumulative_us), ...] dos `top` mais caros}
+        """
+        script = os.path.abspath(script)
+        cwd = os.path.dirname(script)
+        
+        started = time.perf_counter()
+        subprocess.run([sys.executable, script, "--startup-only"], cwd=cwd, capture_output=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        
+        proc = subprocess.run([sys.executable, "-X", "importtime", script, "--startup-only"],
+                              cwd=cwd, capture_output=True, text=True)
+        modules = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            # Só imports de primeiro nível (os aninhados já estão no cumulativo do pai)
+            if name.startswith("  "):
+                continue
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        
+        modules.sort(key=lambda module: module[2], reverse=True)
+        return {
+            "wall_ms": wall_ms,
+            "imports_ms": sum(module[2] for module in modules) / 1000,
+            "modules": modules[:top],
+        }
+    
     # ═══════════════════════════════════════════════════════════════
     # FORMATAÇÃO DE DATA/HORA - RFC3339/ISO8601
     # ═══════════════════════════════════════════════════════════════
     
     @staticmethod
     def format_offset(dt: datetime) -> str:
-        """Formata o offset de timezone: -0300 → -03:00"""
-        offset = dt.strftime("%z")
-        return f"{offset[:3]}:{offset[3:]}" if offset else "+00:00"
+        """Formata o offset de timezone: -03:00 (sem tz: +00:00)"""
+        offset = dt.utcoffset()
+        if offset is None:
+            return "+00:00"
+        return TimezoneService.offset_text(offset.days * 86400 + offset.seconds)
     
     @staticmethod
-    def to_rfc3339(dt: datetime) -> str:
+    def to_zone(dt: datetime, timezone: str = None) -> datetime:
+        """
+        Datetime com tz no fuso IANA `timezone` (None = fuso local da máquina).
+        Sem tz, `dt` é o horário de parede no fuso; com tz, é convertido para ele.
+        
+        Raises:
+            ValueError: Timezone desconhecido
+        """
+        if 1000 <= dt.year < 9999:
+            try:
+                return TimezoneService.localize(dt, timezone)
+            except (OSError, OverflowError):
+                pass
+        # Fora da faixa das tabelas de transição: caminho direto do datetime
+        if timezone:
+            zone = TimezoneService.zone(timezone)
+            return dt.replace(tzinfo=zone) if dt.tzinfo is None else dt.astimezone(zone)
+        return dt.astimezone()
+    
+    @staticmethod
+    def to_rfc3339(dt: datetime, timezone: str = None) -> str:
         """
         Converte datetime para RFC3339/ISO8601
         Formato: 2026-02-04T15:30:00-03:00
+        
+        Sem tz, `dt` é tomado como horário de parede de `timezone` (None = fuso local);
+        com tz, mantém o offset, ou é convertido quando `timezone` é informado.
         """
-        if dt.tzinfo is None:
-            dt = dt.astimezone()
+        if dt.tzinfo is None and 1000 <= dt.year < 9999:
+            # Caminho comum (horário digitado): só o offset, sem montar outro datetime
+            try:
+                offset = TimezoneService.offset_text(TimezoneService.wall_offset(timezone, dt))
+                return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}{offset}"
+            except (OSError, OverflowError):
+                pass
+        if dt.tzinfo is None or timezone:
+            dt = tool.to_zone(dt, timezone)
         offset = tool.format_offset(dt)
-        return dt.strftime(f"%Y-%m-%dT%H:%M:%S{offset}")
+        if dt.year < 1000:
+            return dt.strftime(f"%Y-%m-%dT%H:%M:%S{offset}")
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}{offset}"
     
     @staticmethod
-    def now_rfc3339() -> str:
-        """Retorna data/hora atual em RFC3339"""
-        return tool.to_rfc3339(datetime.now().astimezone())
+    def now_rfc3339(timezone: str = None) -> str:
+        """Retorna data/hora atual em RFC3339 (no fuso `timezone` ou no local)"""
+        return tool.to_rfc3339(tool.to_zone(datetime.now(dt_timezone.utc), timezone))
     
     @staticmethod
-    def now_plus_hours_rfc3339(hours: int = 2) -> str:
+    def now_plus_hours_rfc3339(hours: int = 2, timezone: str = None) -> str:
         """Retorna data/hora atual + N horas em RFC3339"""
-        dt = datetime.now().astimezone() + timedelta(hours=hours)
-        return tool.to_rfc3339(dt)
+        dt = datetime.now(dt_timezone.utc) + timedelta(hours=hours)
+        return tool.to_rfc3339(tool.to_zone(dt, timezone))
+    
+    @staticmethod
+    def as_datetime(value) -> datetime:
+        """
+        RFC3339/ISO8601 → datetime; um datetime já convertido (ex: Event.start) passa direto
+        
+        Raises:
+            ValueError: Texto fora do formato ISO
+        """
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(value)
     
     @staticmethod
-    def format_friendly(iso_str: str) -> str:
+    def format_friendly(iso_str) -> str:
         """
-        Formata ISO8601 para exibição amigável
+        Formata ISO8601 (ou datetime) para exibição amigável
         Ex: 2026-02-03T14:30:00-03:00 → 14:30 • 03/02
         """
         try:
-            dt = datetime.fromisoformat(iso_str)
+            dt = tool.as_datetime(iso_str)
             return dt.strftime("%H:%M • %d/%m")
         except:
             return iso_str
@@ -142,16 +256,56 @@ class tool:
     # Data ISO com espaço: "2026-02-05 14:00"
     REGEX_DATE_ISO_SPACE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})\s+(\d{1,2})(?::(\d{2}))?$')
     
+    # Todos os formatos acima numa única alternação: um só match por input.
+    # O grupo externo de cada alternativa é o último a fechar, então `lastgroup`
+    # diz qual formato casou.
+    REGEX_USER_DATETIME = re.compile(
+        r'^(?:'
+        r'(?P<rfc3339>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2})'
+        r'|(?P<iso_no_offset>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2})?Z?)'
+        r'|(?P<hour_only>(?P<ho_hour>\d{1,2}))'
+        r'|(?P<hour_minute>(?P<hm_hour>\d{1,2}):(?P<hm_minute>\d{2}))'
+        r'|(?P<date_br_time>(?P<bt_day>\d{1,2})/(?P<bt_month>\d{1,2})\s+(?P<bt_hour>\d{1,2})(?::(?P<bt_minute>\d{2}))?)'
+        r'|(?P<date_br_full_time>(?P<bf_day>\d{1,2})/(?P<bf_month>\d{1,2})/(?P<bf_year>\d{4})\s+(?P<bf_hour>\d{1,2})(?::(?P<bf_minute>\d{2}))?)'
+        r'|(?P<date_iso_space>(?P<is_year>\d{4})-(?P<is_month>\d{2})-(?P<is_day>\d{2})\s+(?P<is_hour>\d{1,2})(?::(?P<is_minute>\d{2}))?)'
+        r')$'
+    )
+    
+    @staticmethod
+    def _base_datetime(base_date: str = None, timezone: str = None) -> datetime:
+        """Data base para inputs só com hora: base_date se válida, senão agora (no fuso)"""
+        if base_date:
+            try:
+                return datetime.fromisoformat(base_date)
+            except (ValueError, TypeError):
+                pass
+        return tool.to_zone(datetime.now(dt_timezone.utc), timezone)
+    
     @staticmethod
-    def parse_user_datetime(user_input: str, base_date: str = None) -> str:
+    def _on_base_date(base_dt: datetime, hour: int, minute: int, timezone: str = None) -> str:
+        """
+        RFC3339 de hora:minuto no dia da data base.
+        
+        Com `timezone`, é o horário de parede no fuso (offset certo mesmo se o dia tiver
+        mudança de horário de verão); sem, mantém o offset da data base.
+        """
+        dt = base_dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if timezone:
+            dt = dt.replace(tzinfo=None)
+        return tool.to_rfc3339(dt, timezone)
+    
+    @staticmethod
+    def parse_user_datetime(user_input: str, base_date: str = None, timezone: str = None) -> str:
         """
         Transforma input do usuário em RFC3339/ISO8601
-        Usa regex para parsing preciso.
+        Usa uma única regex (REGEX_USER_DATETIME) para identificar o formato.
         
         Args:
             user_input: Input do usuário
             base_date: Data base RFC3339 para usar quando só hora é informada
                       (útil para término de eventos)
+            timezone: Fuso IANA em que o horário digitado é interpretado
+                      (None = fuso local da máquina)
         
         Aceita:
         - "14" ou "9" -> hora (usa base_date ou hoje)
@@ -160,95 +314,145 @@ class tool:
         - "05/02/2026 14:00" -> data completa BR
         - "2026-02-05 14:00" -> formato ISO com espaço
         - RFC3339/ISO8601 completo (mantém como está)
+        
+        Raises:
+            ValueError: Timezone desconhecido
         """
+        if timezone:
+            TimezoneService.zone(timezone)
         if not user_input:
             return ""
         
         user_input = user_input.strip()
         
-        # Determina a data base (para quando só hora é informada)
-        if base_date:
-            try:
-                base_dt = datetime.fromisoformat(base_date)
-            except:
-                base_dt = datetime.now().astimezone()
-        else:
-            base_dt = datetime.now().astimezone()
+        match = tool.REGEX_USER_DATETIME.match(user_input)
+        if match is None:
+            # Se não reconhecer, retorna o input original
+            return user_input
+        
+        kind = match.lastgroup
+        group = match.group
         
-        # 1. RFC3339 completo - retorna direto
-        if tool.REGEX_RFC3339.match(user_input):
+        # RFC3339 completo - retorna direto
+        if kind == "rfc3339":
             return user_input
         
-        # 2. ISO com T mas sem offset
-        match = tool.REGEX_ISO_NO_OFFSET.match(user_input)
-        if match:
-            try:
+        try:
+            # ISO com T mas sem offset
+            if kind == "iso_no_offset":
                 dt = datetime.fromisoformat(user_input.replace('Z', '+00:00'))
-                return tool.to_rfc3339(dt.astimezone())
-            except:
-                pass
+                return tool.to_rfc3339(tool.to_zone(dt, timezone))
+            
+            # Apenas hora: "14" ou "9"
+            if kind == "hour_only":
+                hour = int(group("ho_hour"))
+                if 0 <= hour <= 23:
+                    return tool._on_base_date(tool._base_datetime(base_date, timezone), hour, 0, timezone)
+                return user_input
+            
+            # Hora e minuto: "14:00" ou "9:30"
+            if kind == "hour_minute":
+                hour = int(group("hm_hour"))
+                minute = int(group("hm_minute"))
+                if 0 <= hour <= 23 and 0 <= minute <= 59:
+                    return tool._on_base_date(tool._base_datetime(base_date, timezone), hour, minute, timezone)
+                return user_input
+            
+            # Data BR com hora: "05/02 14:00" ou "05/02 14" (ano da data base)
+            if kind == "date_br_time":
+                year = tool._base_datetime(base_date, timezone).year
+                month, day = int(group("bt_month")), int(group("bt_day"))
+                hour, minute = int(group("bt_hour")), int(group("bt_minute") or 0)
+            
+            # Data BR completa: "05/02/2026 14:00"
+            elif kind == "date_br_full_time":
+                year, month, day = int(group("bf_year")), int(group("bf_month")), int(group("bf_day"))
+                hour, minute = int(group("bf_hour")), int(group("bf_minute") or 0)
+            
+            # Data ISO com espaço: "2026-02-05 14:00"
+            else:
+                year, month, day = int(group("is_year")), int(group("is_month")), int(group("is_day"))
+                hour, minute = int(group("is_hour")), int(group("is_minute") or 0)
+            
+            return tool.to_rfc3339(datetime(year, month, day, hour, minute, 0), timezone)
+        except (ValueError, OverflowError):
+            return user_input
+    
+    # ═══════════════════════════════════════════════════════════════
+    # PARSING EM LOTE (IMPORTAÇÕES)
+    # ═══════════════════════════════════════════════════════════════
+    
+    @staticmethod
+    def parse_many(inputs, base_date: str = None, timezone: str = None) -> list[str]:
+        """
+        Versão em lote de parse_user_datetime para colunas de planilha/CSV.
         
-        # 3. Apenas hora: "14" ou "9"
-        match = tool.REGEX_HOUR_ONLY.match(user_input)
-        if match:
-            hour = int(match.group(1))
-            if 0 <= hour <= 23:
-                dt = base_dt.replace(hour=hour, minute=0, second=0, microsecond=0)
-                return tool.to_rfc3339(dt)
+        Cada valor distinto é identificado uma única vez pela REGEX_USER_DATETIME,
+        os valores são agrupados por formato e cada grupo é convertido de uma vez:
+        a data base é resolvida uma vez por lote e os offsets saem das transições
+        do fuso pré-calculadas por ano (TimezoneService).
         
-        # 4. Hora e minuto: "14:00" ou "9:30"
-        match = tool.REGEX_HOUR_MINUTE.match(user_input)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            if 0 <= hour <= 23 and 0 <= minute <= 59:
-                dt = base_dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                return tool.to_rfc3339(dt)
+        Args:
+            inputs: Iterável de strings digitadas pelo usuário
+            base_date: Data base RFC3339 para inputs só com hora
+            timezone: Fuso IANA dos horários (None = fuso local da máquina)
         
-        # 5. Data BR com hora: "05/02 14:00" ou "05/02 14"
-        match = tool.REGEX_DATE_BR_TIME.match(user_input)
-        if match:
-            day = int(match.group(1))
-            month = int(match.group(2))
-            hour = int(match.group(3))
-            minute = int(match.group(4)) if match.group(4) else 0
-            year = base_dt.year
-            try:
-                dt = datetime(year, month, day, hour, minute, 0).astimezone()
-                return tool.to_rfc3339(dt)
-            except:
-                pass
+        Returns:
+            Lista na mesma ordem, com o mesmo resultado de parse_user_datetime
         
-        # 6. Data BR completa: "05/02/2026 14:00"
-        match = tool.REGEX_DATE_BR_FULL_TIME.match(user_input)
-        if match:
-            day = int(match.group(1))
-            month = int(match.group(2))
-            year = int(match.group(3))
-            hour = int(match.group(4))
-            minute = int(match.group(5)) if match.group(5) else 0
-            try:
-                dt = datetime(year, month, day, hour, minute, 0).astimezone()
-                return tool.to_rfc3339(dt)
-            except:
-                pass
+        Raises:
+            ValueError: Timezone desconhecido
+        """
+        if timezone:
+            TimezoneService.zone(timezone)
+        inputs = list(inputs)
         
-        # 7. Data ISO com espaço: "2026-02-05 14:00"
-        match = tool.REGEX_DATE_ISO_SPACE.match(user_input)
-        if match:
-            year = int(match.group(1))
-            month = int(match.group(2))
-            day = int(match.group(3))
-            hour = int(match.group(4))
-            minute = int(match.group(5)) if match.group(5) else 0
-            try:
-                dt = datetime(year, month, day, hour, minute, 0).astimezone()
-                return tool.to_rfc3339(dt)
-            except:
-                pass
+        # Agrupa os valores distintos por formato
+        groups: dict[str, list] = {}
+        for value in dict.fromkeys(raw.strip() for raw in inputs if raw):
+            match = tool.REGEX_USER_DATETIME.match(value)
+            groups.setdefault(match.lastgroup if match else None, []).append((value, match))
+        
+        parsed: dict[str, str] = {}
+        
+        for value, _ in groups.pop(None, []):
+            parsed[value] = value
+        for value, _ in groups.pop("rfc3339", []):
+            parsed[value] = value
+        for value, _ in groups.pop("iso_no_offset", []):
+            parsed[value] = tool.parse_user_datetime(value, timezone=timezone)
+        
+        # Só hora / hora:minuto: todos caem no mesmo dia da data base
+        time_only = groups.pop("hour_only", []) + groups.pop("hour_minute", [])
+        base_dt = tool._base_datetime(base_date, timezone) if (time_only or "date_br_time" in groups) else None
+        if time_only:
+            for value, match in time_only:
+                if match.lastgroup == "hour_only":
+                    hour, minute = int(match.group("ho_hour")), 0
+                else:
+                    hour, minute = int(match.group("hm_hour")), int(match.group("hm_minute"))
+                if not (0 <= hour <= 23 and 0 <= minute <= 59):
+                    parsed[value] = value
+                else:
+                    parsed[value] = tool._on_base_date(base_dt, hour, minute, timezone)
+        
+        # Datas completas: horário de parede no fuso
+        date_fields = {
+            "date_br_time": (None, "bt_month", "bt_day", "bt_hour", "bt_minute"),
+            "date_br_full_time": ("bf_year", "bf_month", "bf_day", "bf_hour", "bf_minute"),
+            "date_iso_space": ("is_year", "is_month", "is_day", "is_hour", "is_minute"),
+        }
+        for kind, (year_g, month_g, day_g, hour_g, minute_g) in date_fields.items():
+            for value, match in groups.pop(kind, []):
+                year = int(match.group(year_g)) if year_g else base_dt.year
+                month, day = int(match.group(month_g)), int(match.group(day_g))
+                hour, minute = int(match.group(hour_g)), int(match.group(minute_g) or 0)
+                try:
+                    parsed[value] = tool.to_rfc3339(datetime(year, month, day, hour, minute), timezone)
+                except (ValueError, OverflowError):
+                    parsed[value] = value
         
-        # Se não reconhecer, retorna o input original
-        return user_input
+        return [parsed[raw.strip()] if raw else "" for raw in inputs]
     
     # ═══════════════════════════════════════════════════════════════
     # VALIDAÇÕES
@@ -271,42 +475,46 @@ class tool:
         return value
     
     @staticmethod
-    def ensure_end_after_start(date_start: str, date_end: str) -> str:
+    def ensure_end_after_start(date_start, date_end, timezone: str = None):
         """
         Garante que a data de término seja após a data de início.
         Se o término for antes ou igual ao início, ajusta para o dia seguinte.
         
         Args:
-            date_start: Data de início em RFC3339
-            date_end: Data de término em RFC3339
+            date_start: Data de início em RFC3339 (ou datetime já convertido)
+            date_end: Data de término em RFC3339 (ou datetime já convertido)
+            timezone: Fuso do evento (o dia seguinte mantém o horário de parede nele)
             
         Returns:
-            Data de término ajustada se necessário
+            Data de término ajustada se necessário, no mesmo tipo de `date_end`
         """
         try:
-            start_dt = datetime.fromisoformat(date_start)
-            end_dt = datetime.fromisoformat(date_end)
+            start_dt = tool.as_datetime(date_start)
+            end_dt = tool.as_datetime(date_end)
             
             # Se término <= início, adiciona 1 dia ao término
             if end_dt <= start_dt:
-                end_dt = end_dt + timedelta(days=1)
-                return tool.to_rfc3339(end_dt)
+                if timezone:
+                    adjusted = tool.to_rfc3339(tool.to_zone(end_dt, timezone).replace(tzinfo=None) + timedelta(days=1), timezone)
+                else:
+                    adjusted = tool.to_rfc3339(end_dt + timedelta(days=1))
+                return datetime.fromisoformat(adjusted) if isinstance(date_end, datetime) else adjusted
             
             return date_end
         except:
             return date_end
     
     @staticmethod
-    def validate_date_range(date_start: str, date_end: str) -> tuple[bool, str]:
+    def validate_date_range(date_start, date_end) -> tuple[bool, str]:
         """
-        Valida se o range de datas é válido.
+        Valida se o range de datas é válido (RFC3339 ou datetimes já convertidos).
         
         Returns:
             (is_valid, error_message)
         """
         try:
-            start_dt = datetime.fromisoformat(date_start)
-            end_dt = datetime.fromisoformat(date_end)
+            start_dt = tool.as_datetime(date_start)
+            end_dt = tool.as_datetime(date_end)
             
             if end_dt <= start_dt:
                 return False, "Data de término deve ser após a data de início"
@@ -1,27 +1,317 @@
-use reqwest::{Client};
-use serde_json::Value;
+use reqwest::{Client, RequestBuilder};
+use reqwest::header::{HeaderMap, RETRY_AFTER};
+use serde_json::{json, Value};
+use std::collections::HashMap;
+use std::sync::OnceLock;
+use std::time::Duration;
+use crate::submission::{RateLimiter, RetryPolicy, SubmitOptions, SubmitOutcome};
+use crate::trace::Span;
+
+pub const DEFAULT_GRAPH_URL: &str = "https://graph.microsoft.com";
+
+/// Limite de sub-requisições por chamada ao /$batch do Graph
+pub const GRAPH_BATCH_LIMIT: usize = 20;
+
+static GRAPH_URL: OnceLock<String> = OnceLock::new();
 
 pub struct APIController;
 
 impl APIController {
-    pub async fn add_calendar(token: &str, url: &str, body: &Value) -> Result<(), reqwest::Error> {
+    /// URL base do Microsoft Graph (OUTLOOK_GRAPH_URL, útil para apontar para um servidor mock)
+    pub fn graph_url() -> &'static str {
+        GRAPH_URL.get_or_init(|| {
+            std::env::var("OUTLOOK_GRAPH_URL")
+                .map(|url| url.trim_end_matches('/').to_string())
+                .unwrap_or_else(|_| DEFAULT_GRAPH_URL.to_string())
+        })
+    }
+
+    /// Monta a URL completa de um endpoint, ex: endpoint("/v1.0/me/events")
+    pub fn endpoint(path: &str) -> String {
+        format!("{}{}", APIController::graph_url(), path)
+    }
+
+    /// Cliente HTTP com pool de conexões, para ser reutilizado entre vários eventos
+    pub fn pooled_client() -> Client {
+        Client::builder()
+            .pool_max_idle_per_host(16)
+            .pool_idle_timeout(Duration::from_secs(90))
+            .tcp_keepalive(Duration::from_secs(60))
+            .build()
+            .unwrap_or_else(|_| Client::new())
+    }
+
+    pub async fn add_calendar(token: &str, url: &str, body: &Value) -> Result<SubmitOutcome, String> {
         let debug: bool = false; // Local Debug Controler
 
-        let client = Client::new();
-        
-        let response = client.post(url).bearer_auth(token).header("Content-Type", "application/json").json(body).send().await.unwrap();
-        let status = response.status();
-        let text = response.text().await?;
+        let options = SubmitOptions::default();
+        let limiter = RateLimiter::new(options.rate, options.burst);
+        let policy = RetryPolicy::new(options.max_retries);
+
+        let outcome = APIController::submit(&Client::new(), token, url, body, &limiter, &policy).await;
 
         if debug{
-            println!("STATUS: {}", status);
-            println!("RESPONSE: {}", text);
+            println!("STATUS: {:?}", outcome.status);
+            println!("ATTEMPTS: {}", outcome.attempts);
+            println!("RESPONSE: {}", outcome.body);
+        }
+
+        match outcome.error {
+            Some(error) => Err(error),
+            None => Ok(outcome),
+        }
+    }
+
+    /// POST com rate limit e retentativas com backoff. Só falhas transitórias
+    /// (429, 5xx, timeout/conexão) são repetidas; um Retry-After pausa o limiter inteiro.
+    pub async fn submit(client: &Client, token: &str, url: &str, body: &Value,
+                        limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome {
+        APIController::execute(
+            || client.post(url).bearer_auth(token).header("Content-Type", "application/json").json(body),
+            false, limiter, policy,
+        ).await
+    }
+
+    /// GET com a mesma política de rate limit e retentativas do `submit`
+    pub async fn fetch(client: &Client, token: &str, url: &str, headers: &[(&str, &str)],
+                       limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome {
+        APIController::execute(
+            || headers.iter().fold(client.get(url).bearer_auth(token), |request, (name, value)| request.header(*name, *value)),
+            true, limiter, policy,
+        ).await
+    }
+
+    /// POST de consulta (ex: getSchedule) com cabeçalhos extras, mesma política do `submit`.
+    /// Não altera nada no Graph, então é repetido como uma leitura idempotente.
+    pub async fn query(client: &Client, token: &str, url: &str, body: &Value, headers: &[(&str, &str)],
+                       limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome {
+        APIController::execute(
+            || headers.iter().fold(client.post(url).bearer_auth(token).json(body), |request, (name, value)| request.header(*name, *value)),
+            true, limiter, policy,
+        ).await
+    }
+
+    /// DELETE com a mesma política de rate limit e retentativas do `submit`
+    pub async fn delete(client: &Client, token: &str, url: &str,
+                        limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome {
+        APIController::execute(|| client.delete(url).bearer_auth(token), true, limiter, policy).await
+    }
 
-            if !status.is_success() {
-                println!("Microsoft Graph error: {}", status);
+    /// Laço de envio e retentativas; `build` monta a requisição de novo a cada tentativa.
+    /// Em requisições `idempotent`, uma falha ao ler o corpo da resposta também é repetida.
+    async fn execute<F>(build: F, idempotent: bool, limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome
+    where
+        F: Fn() -> RequestBuilder,
+    {
+        let mut attempt: u32 = 0;
+        let mut throttled: u32 = 0;
+        loop {
+            let queued = Span::start("rate_limit");
+            limiter.acquire().await;
+            queued.end();
+            attempt += 1;
+
+            // Até os cabeçalhos da resposta (inclui DNS/TCP/TLS quando a conexão é nova)
+            let request = Span::start("request").with("attempt", attempt);
+            let response = build().send().await;
+            let (status, error, transient, wait) = match response {
+                Ok(response) => {
+                    let status = response.status();
+                    request.with("status", status.as_u16()).end();
+                    if status == reqwest::StatusCode::TOO_MANY_REQUESTS {
+                        throttled += 1;
+                    }
+                    let wait = APIController::retry_after(response.headers());
+                    let reading = Span::start("response").with("attempt", attempt);
+                    match response.text().await {
+                        // Corpo cortado no meio: numa leitura basta pedir de novo
+                        Err(e) if idempotent => {
+                            reading.with("error", e.to_string()).end();
+                            (Some(status.as_u16()), e.to_string(), RetryPolicy::is_transient_error(&e, idempotent), wait)
+                        }
+                        body => {
+                            let text = body.unwrap_or_default();
+                            reading.with("bytes", text.len()).end();
+                            if status.is_success() {
+                                return SubmitOutcome { status: Some(status.as_u16()), attempts: attempt, error: None, permanent: false, body: text, throttled };
+                            }
+                            (Some(status.as_u16()), format!("Microsoft Graph error {}: {}", status.as_u16(), text),
+                             RetryPolicy::is_transient(status), wait)
+                        }
+                    }
+                }
+                Err(e) => {
+                    request.with("error", e.to_string()).end();
+                    // Repetir um POST após timeout é seguro: build_body sempre manda transactionId
+                    let transient = RetryPolicy::is_transient_error(&e, idempotent);
+                    (None, e.to_string(), transient, None)
+                }
+            };
+
+            if !transient || attempt > policy.max_retries {
+                return SubmitOutcome { status, attempts: attempt, error: Some(error), permanent: !transient, body: String::new(), throttled };
+            }
+
+            match wait {
+                Some(delay) => limiter.pause(delay),
+                None => {
+                    let backoff = Span::start("backoff").with("attempt", attempt);
+                    tokio::time::sleep(policy.backoff(attempt - 1)).await;
+                    backoff.end();
+                }
+            }
+        }
+    }
+
+    /// Envia até GRAPH_BATCH_LIMIT POSTs numa única chamada ao JSON batching do Graph (/$batch).
+    ///
+    /// `items` são pares (id, corpo) para `relative_url` (ex: "/me/events"). Cada resposta
+    /// é casada pelo id; só os itens com falha transitória são reenviados na rodada seguinte,
+    /// e os que já tiveram sucesso ou falha permanente saem do lote.
+    pub async fn submit_batch(client: &Client, token: &str, relative_url: &str, items: Vec<(String, Value)>,
+                              limiter: &RateLimiter, policy: &RetryPolicy) -> Vec<(String, SubmitOutcome)> {
+        let url = APIController::endpoint("/v1.0/$batch");
+        let mut done: Vec<(String, SubmitOutcome)> = Vec::with_capacity(items.len());
+        let mut attempts: HashMap<String, u32> = HashMap::new();
+        let mut throttled: HashMap<String, u32> = HashMap::new();
+        let mut pending = items;
+        let mut round: u32 = 0;
+
+        while !pending.is_empty() {
+            // O Graph limita por sub-requisição: cada item da rodada (inclusive reenvios) gasta um token
+            let queued = Span::start("rate_limit").with("tokens", pending.len());
+            limiter.acquire_n(pending.len()).await;
+            queued.end();
+            round += 1;
+            // Os spans da rodada valem para todos os itens ainda pendentes
+            let ids: Vec<&str> = pending.iter().map(|(id, _)| id.as_str()).collect();
+            let ids = json!(ids);
+            for (id, _) in &pending {
+                *attempts.entry(id.clone()).or_insert(0) += 1;
+            }
+
+            let requests: Vec<Value> = pending.iter().map(|(id, body)| json!({
+                "id": id,
+                "method": "POST",
+                "url": relative_url,
+                "headers": { "Content-Type": "application/json" },
+                "body": body,
+            })).collect();
+
+            let request = Span::start("request").with("attempt", round).with("events", ids.clone());
+            let response = client.post(&url).bearer_auth(token).json(&json!({ "requests": requests })).send().await;
+            let reading = Span::start("response").with("attempt", round).with("events", ids);
+
+            // Falha da chamada inteira: todos os itens ficam pendentes (ou falham juntos)
+            let (responses, batch_wait) = match response {
+                Ok(response) if response.status().is_success() => {
+                    request.with("status", response.status().as_u16()).end();
+                    let parsed: Value = response.json().await.unwrap_or(Value::Null);
+                    reading.end();
+                    (parsed["responses"].as_array().cloned().unwrap_or_default(), None)
+                }
+                Ok(response) => {
+                    let status = response.status();
+                    request.with("status", status.as_u16()).end();
+                    let wait = APIController::retry_after(response.headers());
+                    let text = response.text().await.unwrap_or_default();
+                    reading.end();
+                    if status == reqwest::StatusCode::TOO_MANY_REQUESTS {
+                        for (id, _) in &pending {
+                            *throttled.entry(id.clone()).or_insert(0) += 1;
+                        }
+                    }
+                    let transient = RetryPolicy::is_transient(status);
+                    if !transient || round > policy.max_retries {
+                        let error = format!("Microsoft Graph batch error {}: {}", status.as_u16(), text);
+                        for (id, _) in pending.drain(..) {
+                            let (tries, throttles) = (attempts[&id], throttled.get(&id).copied().unwrap_or(0));
+                            done.push((id, SubmitOutcome { status: Some(status.as_u16()), attempts: tries,
+                                error: Some(error.clone()), permanent: !transient, body: String::new(), throttled: throttles }));
+                        }
+                        break;
+                    }
+                    (Vec::new(), wait)
+                }
+                Err(e) => {
+                    request.with("error", e.to_string()).end();
+                    // Cada item do lote leva o transactionId do build_body (reenvio não duplica)
+                    let transient = RetryPolicy::is_transient_error(&e, false);
+                    if !transient || round > policy.max_retries {
+                        for (id, _) in pending.drain(..) {
+                            let (tries, throttles) = (attempts[&id], throttled.get(&id).copied().unwrap_or(0));
+                            done.push((id, SubmitOutcome { status: None, attempts: tries,
+                                error: Some(e.to_string()), permanent: !transient, body: String::new(), throttled: throttles }));
+                        }
+                        break;
+                    }
+                    (Vec::new(), None)
+                }
+            };
+
+            // Casa cada resposta com o item pelo id
+            let mut by_id: HashMap<String, Value> = responses.into_iter()
+                .filter_map(|r| r["id"].as_str().map(|id| (id.to_string(), r.clone())))
+                .collect();
+            let mut retry = Vec::new();
+            let mut wait: Option<Duration> = batch_wait;
+
+            for (id, body) in pending.drain(..) {
+                let tries = attempts[&id];
+                let Some(item) = by_id.remove(&id) else {
+                    let throttles = throttled.get(&id).copied().unwrap_or(0);
+                    // Sem resposta para o item (ou chamada inteira falhou): tenta de novo
+                    if tries > policy.max_retries {
+                        done.push((id, SubmitOutcome { status: None, attempts: tries,
+                            error: Some("Sem resposta no batch".into()), permanent: false, body: String::new(), throttled: throttles }));
+                    } else {
+                        retry.push((id, body));
+                    }
+                    continue;
+                };
+
+                let status = item["status"].as_u64().unwrap_or(0) as u16;
+                let code = reqwest::StatusCode::from_u16(status).unwrap_or(reqwest::StatusCode::BAD_GATEWAY);
+                let throttles = throttled.get(&id).copied().unwrap_or(0) + u32::from(code == reqwest::StatusCode::TOO_MANY_REQUESTS);
+                throttled.insert(id.clone(), throttles);
+                if code.is_success() {
+                    done.push((id, SubmitOutcome { status: Some(status), attempts: tries, error: None,
+                        permanent: false, body: item["body"].to_string(), throttled: throttles }));
+                    continue;
+                }
+
+                let transient = RetryPolicy::is_transient(code);
+                if transient && tries <= policy.max_retries {
+                    let item_wait = item["headers"]["Retry-After"].as_str()
+                        .and_then(|v| v.trim().parse::<u64>().ok())
+                        .map(Duration::from_secs);
+                    wait = wait.max(item_wait);
+                    retry.push((id, body));
+                } else {
+                    done.push((id, SubmitOutcome { status: Some(status), attempts: tries,
+                        error: Some(format!("Microsoft Graph error {}: {}", status, item["body"])),
+                        permanent: !transient, body: String::new(), throttled: throttles }));
+                }
             }
+
+            if !retry.is_empty() {
+                match wait {
+                    Some(delay) => limiter.pause(delay),
+                    None => {
+                        let backoff = Span::start("backoff").with("attempt", round);
+                        tokio::time::sleep(policy.backoff(round - 1)).await;
+                        backoff.end();
+                    }
+                }
+            }
+            pending = retry;
         }
-      
-        Ok(())
+
+        done
+    }
+
+    /// Lê o Retry-After em segundos (a forma que o Graph usa)
+    fn retry_after(headers: &HeaderMap) -> Option<Duration> {
+        headers.get(RETRY_AFTER)?.to_str().ok()?.trim().parse::<u64>().ok().map(Duration::from_secs)
     }
-}
\ No newline at end of file
+}
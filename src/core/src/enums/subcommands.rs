@@ -1,7 +1,19 @@
 use clap::Subcommand;
+use crate::services::batch_service::BatchService;
 use crate::services::calendar_service::CalendarService;
+use crate::services::schedule_service::ScheduleService;
+use crate::services::sync_service::SyncService;
+use crate::services::worker_service::WorkerService;
 
 #[derive(Subcommand)]
 pub enum Commands {
     Create(CalendarService),
+    /// Cria vários eventos a partir de NDJSON no stdin (um evento por linha)
+    CreateBatch(BatchService),
+    /// Worker persistente com protocolo JSON por linha no stdin/stdout
+    Serve(WorkerService),
+    /// Sincronização incremental da agenda (calendarView/delta), NDJSON no stdout
+    Sync(SyncService),
+    /// Horários ocupados de vários participantes (getSchedule), NDJSON no stdout
+    Schedule(ScheduleService),
 }
@@ -1,23 +1,73 @@
 mod api_controller;
+mod submission;
 mod services;
 mod cli;
 mod enums;
+mod trace;
 
 use dotenvy::dotenv;
 use clap::Parser;
 use cli::cli::Cli;
 use enums::subcommands::Commands;
+use trace::Span;
+
+/// OUTLOOK_TOKEN do ambiente (repassado pela TUI já renovado); o .env só é lido se ele faltar
+fn load_token() -> String {
+    if std::env::var_os("OUTLOOK_TOKEN").is_none() {
+        dotenv().ok();
+    }
+    std::env::var("OUTLOOK_TOKEN").expect("[ERROR] OUTLOOK_TOKEN environment variable not found")
+}
 
 #[tokio::main]
 async fn main() -> Result<(), Box<dyn std::error::Error>> {
+    let process = Span::start("core");
+    let parse = Span::start("parse");
     let cli = Cli::parse();
+    parse.end();
+
+    let command = match cli.command {
+        Commands::Create(_) => "create",
+        Commands::CreateBatch(_) => "create-batch",
+        Commands::Serve(_) => "serve",
+        Commands::Sync(_) => "sync",
+        Commands::Schedule(_) => "schedule",
+    };
     
     match cli.command {
         Commands::Create(calendar) => {
-            dotenv().ok();
-            let token = std::env::var("OUTLOOK_TOKEN").expect("[ERROR] OUTLOOK_TOKEN environment variable not found");
-            calendar.add_event(&token).await.unwrap();
+            let token = load_token();
+            if let Err(e) = calendar.add_event(&token).await {
+                eprintln!("[ERROR] {}", e);
+                process.with("command", command).with("ok", false).end();
+                std::process::exit(1);
+            }
+        }
+        Commands::CreateBatch(batch) => {
+            let token = load_token();
+            batch.run(&token).await?;
+        }
+        Commands::Serve(worker) => {
+            let token = load_token();
+            worker.run(&token).await?;
+        }
+        Commands::Sync(sync) => {
+            let token = load_token();
+            if let Err(e) = sync.run(&token).await {
+                eprintln!("[ERROR] {}", e);
+                process.with("command", command).with("ok", false).end();
+                std::process::exit(1);
+            }
+        }
+        Commands::Schedule(schedule) => {
+            let token = load_token();
+            if let Err(e) = schedule.run(&token).await {
+                eprintln!("[ERROR] {}", e);
+                process.with("command", command).with("ok", false).end();
+                std::process::exit(1);
+            }
         }
     }
+    process.with("command", command).with("ok", true).end();
     Ok(())
 }
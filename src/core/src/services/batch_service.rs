@@ -0,0 +1,127 @@
+use std::sync::Arc;
+use clap::Args;
+use reqwest::Client;
+use serde_json::{json, Value};
+use tokio::io::{AsyncBufReadExt, BufReader};
+use tokio::sync::mpsc::UnboundedSender;
+use tokio::sync::Semaphore;
+use crate::api_controller::{APIController, GRAPH_BATCH_LIMIT};
+use crate::services::calendar_service::CalendarService;
+use crate::services::stdout_writer;
+use crate::submission::{RateLimiter, RetryPolicy, SubmitOptions, SubmitOutcome};
+use crate::trace::{self, Span};
+
+/// Cria vários eventos lendo NDJSON (um evento por linha) do stdin.
+/// Cada linha gera uma linha de resultado no stdout:
+/// {"index", "ok", "status", "attempts", "permanent", "error"}
+#[derive(Args, Debug)]
+pub struct BatchService {
+    /// Número máximo de requisições simultâneas ao Microsoft Graph
+    #[arg(long, default_value_t = 4)]
+    concurrency: usize,
+
+    /// Agrupa até 20 eventos por chamada ao /$batch do Graph
+    #[arg(long)]
+    graph_batch: bool,
+
+    #[command(flatten)]
+    submit: SubmitOptions,
+}
+
+/// Estado compartilhado pelas tarefas de envio
+struct Shared {
+    client: Client,
+    token: Arc<str>,
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    tx: UnboundedSender<String>,
+}
+
+impl BatchService {
+    pub async fn run(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let concurrency = self.concurrency.max(1);
+        let limit = Arc::new(Semaphore::new(concurrency));
+        let (tx, writer) = stdout_writer::spawn();
+        let shared = Arc::new(Shared {
+            client: APIController::pooled_client(),
+            token: Arc::from(token),
+            limiter: RateLimiter::new(self.submit.rate, self.submit.burst),
+            policy: RetryPolicy::new(self.submit.max_retries),
+            tx,
+        });
+
+        let mut lines = BufReader::new(tokio::io::stdin()).lines();
+        let mut index: usize = 0;
+        let mut chunk: Vec<(usize, Value)> = Vec::with_capacity(GRAPH_BATCH_LIMIT);
+
+        while let Some(line) = lines.next_line().await? {
+            if line.trim().is_empty() {
+                continue;
+            }
+            let current = index;
+            index += 1;
+
+            let parse = Span::start("parse").with("event", current);
+            let parsed: Result<CalendarService, _> = serde_json::from_str(&line);
+            parse.end();
+            let event: CalendarService = match parsed {
+                Ok(event) => event,
+                Err(e) => {
+                    BatchService::emit(&shared.tx, current, SubmitOutcome::invalid(format!("JSON inválido: {}", e)));
+                    continue;
+                }
+            };
+
+            // Séries com exceções precisam de chamadas extras depois da criação: vão pelo caminho individual
+            if !self.graph_batch || event.has_exceptions() {
+                let permit = limit.clone().acquire_owned().await?;
+                let shared = shared.clone();
+                tokio::spawn(trace::EVENT.scope(json!(current), async move {
+                    let result = event.add_event_with(&shared.client, &shared.token, &shared.limiter, &shared.policy).await;
+                    BatchService::emit(&shared.tx, current, result);
+                    drop(permit);
+                }));
+                continue;
+            }
+
+            let built = trace::EVENT.sync_scope(json!(current), || event.build_body());
+            match built {
+                Ok(body) => chunk.push((current, body)),
+                Err(error) => BatchService::emit(&shared.tx, current, SubmitOutcome::invalid(error)),
+            }
+            if chunk.len() == GRAPH_BATCH_LIMIT {
+                let permit = limit.clone().acquire_owned().await?;
+                let items = std::mem::replace(&mut chunk, Vec::with_capacity(GRAPH_BATCH_LIMIT));
+                tokio::spawn(BatchService::send_chunk(shared.clone(), items, permit));
+            }
+        }
+
+        if !chunk.is_empty() {
+            let permit = limit.clone().acquire_owned().await?;
+            tokio::spawn(BatchService::send_chunk(shared.clone(), chunk, permit));
+        }
+
+        // Todas as permissões de volta = todas as tarefas terminaram
+        let _ = limit.acquire_many(concurrency as u32).await?;
+        drop(shared);
+        let _ = writer.await;
+
+        Ok(())
+    }
+
+    async fn send_chunk(shared: Arc<Shared>, items: Vec<(usize, Value)>, permit: tokio::sync::OwnedSemaphorePermit) {
+        let items = items.into_iter().map(|(index, body)| (index.to_string(), body)).collect();
+        let results = APIController::submit_batch(&shared.client, &shared.token, "/me/events", items,
+                                                  &shared.limiter, &shared.policy).await;
+        for (id, outcome) in results {
+            BatchService::emit(&shared.tx, id.parse().unwrap_or_default(), outcome);
+        }
+        drop(permit);
+    }
+
+    fn emit(tx: &UnboundedSender<String>, index: usize, outcome: SubmitOutcome) {
+        let mut value = outcome.to_json();
+        value["index"] = json!(index);
+        let _ = tx.send(format!("{}\n", value));
+    }
+}
@@ -1,9 +1,27 @@
 use clap::Parser;
-use serde_json::json;
-use chrono::{DateTime, FixedOffset};
+use serde::Deserialize;
+use serde_json::{json, Value};
+use chrono::{DateTime, Duration, FixedOffset, NaiveDate};
+use reqwest::{Client, Url};
 use crate::api_controller::APIController;
+use crate::submission::{new_transaction_id, RateLimiter, RetryPolicy, SubmitOptions, SubmitOutcome};
+use crate::trace::Span;
 
-#[derive(Parser, Debug)]
+pub const EVENTS_PATH: &str = "/v1.0/me/events";
+
+fn default_timezone() -> String {
+    "America/Sao_Paulo".to_string()
+}
+
+fn default_location() -> String {
+    "Online".to_string()
+}
+
+fn parse_json(value: &str) -> Result<Value, String> {
+    serde_json::from_str(value).map_err(|e| format!("JSON inválido: {}", e))
+}
+
+#[derive(Parser, Debug, Deserialize)]
 #[command(name = "Outlook Fusion", version = "0.1", about = "Cria eventos no Outlook Calendar via CLI")]
 pub struct CalendarService {
     /// Assunto do evento
@@ -11,6 +29,7 @@ pub struct CalendarService {
     subject: String,
 
     #[arg(short,long)]
+    #[serde(default)]
     descr: Option<String>,
 
     /// Conteúdo do evento
@@ -27,24 +46,61 @@ pub struct CalendarService {
 
     /// Timezone (ex: America/Sao_Paulo)
     #[arg(short, long, default_value = "America/Sao_Paulo")]
+    #[serde(default = "default_timezone")]
     timezone: String,
 
     /// Local do evento
     #[arg(short, long, default_value = "Online")]
+    #[serde(default = "default_location")]
     location: String,
+
+    /// Recorrência no formato do Graph: {"pattern": {...}, "range": {...}}
+    #[arg(long, value_parser = parse_json)]
+    #[serde(default)]
+    recurrence: Option<Value>,
+
+    /// Data (YYYY-MM-DD) de uma ocorrência a cancelar depois de criar a série (repetível)
+    #[arg(long = "exception")]
+    #[serde(default)]
+    exceptions: Vec<String>,
+
+    /// Chave de idempotência: reenviar com o mesmo transactionId não duplica o evento no Graph
+    /// (sem ela, cada evento recebe um UUID novo)
+    #[arg(long)]
+    #[serde(default)]
+    transaction_id: Option<String>,
 }
 
 impl CalendarService {
-    pub async fn add_event(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
-        print!("trafor data");
+    /// Monta o corpo JSON do evento no formato do Microsoft Graph
+    pub fn build_body(&self) -> Result<Value, String> {
+        let span = Span::start("build_json");
+        let body = self.graph_body();
+        span.with("ok", body.is_ok()).end();
+        body
+    }
+
+    fn graph_body(&self) -> Result<Value, String> {
         let start: DateTime<FixedOffset> = DateTime::parse_from_rfc3339(&self.date_start)
-            .expect("Data de início inválida");
+            .map_err(|e| format!("Data de início inválida: {}", e))?;
         let end: DateTime<FixedOffset> = DateTime::parse_from_rfc3339(&self.date_end)
-            .expect("Data de término inválida");
+            .map_err(|e| format!("Data de término inválida: {}", e))?;
 
         if start > end {
             return Err("Start date cannot be after end date".into());
         }
+        if let Some(recurrence) = &self.recurrence {
+            if !recurrence["pattern"].is_object() || !recurrence["range"].is_object() {
+                return Err("Recorrência precisa de \"pattern\" e \"range\"".into());
+            }
+        }
+        if !self.exceptions.is_empty() && self.recurrence.is_none() {
+            return Err("Exceções só valem para eventos recorrentes".into());
+        }
+        for exception in &self.exceptions {
+            NaiveDate::parse_from_str(exception, "%Y-%m-%d")
+                .map_err(|e| format!("Exceção inválida {}: {}", exception, e))?;
+        }
         
         let mut description = String::new();
 
@@ -52,8 +108,7 @@ impl CalendarService {
             description = some_desc.clone();
         }
 
-        print!("build json");
-        let body = json!({
+        let mut body = json!({
             "subject": self.subject,
             "body": { "contentType": "HTML", "content": description },
             "start": {
@@ -68,10 +123,87 @@ impl CalendarService {
                 "displayName": self.location
             }
         });
+        if let Some(recurrence) = &self.recurrence {
+            body["recurrence"] = recurrence.clone();
+        }
+        // Sempre com transactionId: as retentativas após timeout repetem o mesmo corpo
+        let transaction_id = self.transaction_id.clone().unwrap_or_else(new_transaction_id);
+        body["transactionId"] = json!(transaction_id);
+        Ok(body)
+    }
+
+    /// true quando há ocorrências a cancelar depois da criação (não cabe no /$batch)
+    pub fn has_exceptions(&self) -> bool {
+        !self.exceptions.is_empty()
+    }
+
+    pub async fn add_event(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let body = self.build_body()?;
 
-        APIController::add_calendar(token, "https://graph.microsoft.com/v1.0/me/events", &body).await?;
-        print!("send");
+        let outcome = APIController::add_calendar(token, &APIController::endpoint(EVENTS_PATH), &body).await?;
+
+        if let (true, Some(event_id)) = (self.has_exceptions(), outcome.event_id()) {
+            let options = SubmitOptions::default();
+            let limiter = RateLimiter::new(options.rate, options.burst);
+            let policy = RetryPolicy::new(options.max_retries);
+            self.cancel_exceptions(&Client::new(), token, &event_id, &limiter, &policy).await;
+        }
 
         Ok(())
     }
-}
\ No newline at end of file
+
+    /// Cria o evento reutilizando um cliente HTTP, limiter e política de retry compartilhados
+    pub async fn add_event_with(&self, client: &Client, token: &str,
+                                limiter: &RateLimiter, policy: &RetryPolicy) -> SubmitOutcome {
+        let body = match self.build_body() {
+            Ok(body) => body,
+            Err(error) => return SubmitOutcome::invalid(error),
+        };
+
+        let outcome = APIController::submit(client, token, &APIController::endpoint(EVENTS_PATH), &body, limiter, policy).await;
+        if let (true, Some(event_id)) = (self.has_exceptions(), outcome.event_id()) {
+            self.cancel_exceptions(client, token, &event_id, limiter, policy).await;
+        }
+        outcome
+    }
+
+    /// Remove as ocorrências das datas de exceção (o Graph não aceita exceções na criação).
+    /// A série já foi criada, então falhas aqui só geram aviso no stderr.
+    async fn cancel_exceptions(&self, client: &Client, token: &str, event_id: &str,
+                               limiter: &RateLimiter, policy: &RetryPolicy) {
+        let offset = DateTime::parse_from_rfc3339(&self.date_start).map(|start| *start.offset()).ok();
+        for exception in &self.exceptions {
+            let (Ok(day), Some(offset)) = (NaiveDate::parse_from_str(exception, "%Y-%m-%d"), offset) else {
+                continue;
+            };
+            let Some(start) = day.and_hms_opt(0, 0, 0).and_then(|t| t.and_local_timezone(offset).single()) else {
+                continue;
+            };
+            let end = start + Duration::days(1);
+
+            let path = APIController::endpoint(&format!("{}/{}/instances", EVENTS_PATH, event_id));
+            let url = match Url::parse_with_params(&path, &[("startDateTime", start.to_rfc3339()), ("endDateTime", end.to_rfc3339())]) {
+                Ok(url) => url,
+                Err(e) => {
+                    eprintln!("[WARN] Exceção {} não cancelada: {}", exception, e);
+                    continue;
+                }
+            };
+            let found = APIController::fetch(client, token, url.as_str(), &[], limiter, policy).await;
+            let instances: Value = serde_json::from_str(&found.body).unwrap_or(Value::Null);
+            if let Some(error) = found.error {
+                eprintln!("[WARN] Exceção {} não cancelada: {}", exception, error);
+                continue;
+            }
+
+            for instance in instances["value"].as_array().into_iter().flatten() {
+                let Some(id) = instance["id"].as_str() else { continue };
+                let url = APIController::endpoint(&format!("{}/{}", EVENTS_PATH, id));
+                let deleted = APIController::delete(client, token, &url, limiter, policy).await;
+                if let Some(error) = deleted.error {
+                    eprintln!("[WARN] Exceção {} não cancelada: {}", exception, error);
+                }
+            }
+        }
+    }
+}
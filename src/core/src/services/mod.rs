@@ -1 +1,6 @@
-pub mod calendar_service;
\ No newline at end of file
+pub mod calendar_service;
+pub mod batch_service;
+pub mod worker_service;
+pub mod stdout_writer;
+pub mod sync_service;
+pub mod schedule_service;
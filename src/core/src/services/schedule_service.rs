@@ -0,0 +1,127 @@
+use std::io::Write;
+use chrono::{DateTime, Duration, Utc};
+use clap::Args;
+use serde_json::{json, Value};
+use crate::api_controller::APIController;
+use crate::services::sync_service::SyncService;
+use crate::submission::{RateLimiter, RetryPolicy, SubmitOptions};
+
+pub const SCHEDULE_PATH: &str = "/v1.0/me/calendar/getSchedule";
+
+/// Agendas por chamada ao getSchedule
+pub const SCHEDULE_LIMIT: usize = 20;
+
+/// Maior janela aceita pelo getSchedule
+pub const SCHEDULE_MAX_DAYS: i64 = 62;
+
+/// Horários ocupados de vários participantes (calendar/getSchedule do Graph).
+///
+/// Os participantes vão em grupos de até 20 e a janela é dividida em pedaços de
+/// até 62 dias (limites do Graph). Cada horário não livre sai no stdout como uma
+/// linha NDJSON, já em UTC:
+///
+///   {"schedule": "a@b.com", "status": "busy", "date_start", "date_end"}
+///   {"schedule": "a@b.com", "error": "..."}   agenda que o Graph não conseguiu ler
+#[derive(Args, Debug)]
+pub struct ScheduleService {
+    /// Início da janela (RFC3339)
+    #[arg(long)]
+    start: String,
+
+    /// Fim da janela (RFC3339)
+    #[arg(long)]
+    end: String,
+
+    /// E-mail de um participante (repetir para vários)
+    #[arg(long = "attendee", required = true)]
+    attendees: Vec<String>,
+
+    /// Resolução do availabilityView em minutos (os horários em si saem exatos)
+    #[arg(long, default_value_t = 30)]
+    interval: u32,
+
+    #[command(flatten)]
+    submit: SubmitOptions,
+}
+
+impl ScheduleService {
+    pub async fn run(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let start = ScheduleService::parse(&self.start, "--start")?;
+        let end = ScheduleService::parse(&self.end, "--end")?;
+        if end <= start {
+            return Err("--end precisa ser depois de --start".into());
+        }
+
+        let client = APIController::pooled_client();
+        let limiter = RateLimiter::new(self.submit.rate, self.submit.burst);
+        let policy = RetryPolicy::new(self.submit.max_retries);
+        let headers = [("Prefer", "outlook.timezone=\"UTC\"")];
+        let url = APIController::endpoint(SCHEDULE_PATH);
+
+        let mut window_start = start;
+        while window_start < end {
+            let window_end = (window_start + Duration::days(SCHEDULE_MAX_DAYS)).min(end);
+            for schedules in self.attendees.chunks(SCHEDULE_LIMIT) {
+                let body = json!({
+                    "schedules": schedules,
+                    "startTime": { "dateTime": ScheduleService::graph_text(window_start), "timeZone": "UTC" },
+                    "endTime": { "dateTime": ScheduleService::graph_text(window_end), "timeZone": "UTC" },
+                    "availabilityViewInterval": self.interval,
+                });
+                let outcome = APIController::query(&client, token, &url, &body, &headers, &limiter, &policy).await;
+                if let Some(error) = outcome.error {
+                    return Err(error.into());
+                }
+
+                let page: Value = serde_json::from_str(&outcome.body)
+                    .map_err(|e| format!("Resposta inválida do Graph: {}", e))?;
+                let lines: Vec<Value> = page["value"].as_array()
+                    .map(|items| items.iter().flat_map(ScheduleService::busy_lines).collect())
+                    .unwrap_or_default();
+                ScheduleService::emit(&lines)?;
+            }
+            window_start = window_end;
+        }
+        Ok(())
+    }
+
+    fn parse(value: &str, name: &str) -> Result<DateTime<Utc>, String> {
+        DateTime::parse_from_rfc3339(value)
+            .map(|datetime| datetime.with_timezone(&Utc))
+            .map_err(|e| format!("{} inválido ({}): {}", name, value, e))
+    }
+
+    /// dateTime sem offset, como o Graph espera junto de timeZone
+    fn graph_text(datetime: DateTime<Utc>) -> String {
+        datetime.format("%Y-%m-%dT%H:%M:%S").to_string()
+    }
+
+    /// Converte uma agenda da resposta nas linhas de saída (só o que não está livre)
+    fn busy_lines(schedule: &Value) -> Vec<Value> {
+        let id = schedule["scheduleId"].as_str().unwrap_or("");
+        if let Some(error) = schedule.get("error") {
+            let message = error["message"].as_str().unwrap_or("erro desconhecido");
+            return vec![json!({ "schedule": id, "error": message })];
+        }
+        schedule["scheduleItems"].as_array()
+            .map(|items| items.iter()
+                .filter(|item| item["status"].as_str().unwrap_or("busy") != "free")
+                .filter_map(|item| Some(json!({
+                    "schedule": id,
+                    "status": item["status"].as_str().unwrap_or("busy"),
+                    "date_start": SyncService::graph_datetime(&item["start"])?,
+                    "date_end": SyncService::graph_datetime(&item["end"])?,
+                })))
+                .collect())
+            .unwrap_or_default()
+    }
+
+    /// Escreve as linhas de uma resposta de uma vez
+    fn emit(lines: &[Value]) -> std::io::Result<()> {
+        let mut out = std::io::stdout().lock();
+        for line in lines {
+            writeln!(out, "{}", line)?;
+        }
+        out.flush()
+    }
+}
@@ -0,0 +1,21 @@
+use tokio::io::AsyncWriteExt;
+use tokio::sync::mpsc::{self, UnboundedSender};
+use tokio::task::JoinHandle;
+
+/// Escritor único no stdout para que linhas NDJSON de tarefas concorrentes não se misturem.
+/// Fechar todos os senders encerra a tarefa.
+pub fn spawn() -> (UnboundedSender<String>, JoinHandle<()>) {
+    let (tx, mut rx) = mpsc::unbounded_channel::<String>();
+
+    let handle = tokio::spawn(async move {
+        let mut stdout = tokio::io::stdout();
+        while let Some(line) = rx.recv().await {
+            if stdout.write_all(line.as_bytes()).await.is_err() {
+                break;
+            }
+            let _ = stdout.flush().await;
+        }
+    });
+
+    (tx, handle)
+}
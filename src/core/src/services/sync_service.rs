@@ -0,0 +1,136 @@
+use std::io::Write;
+use chrono::{DateTime, NaiveDateTime};
+use clap::Args;
+use reqwest::Url;
+use serde_json::{json, Value};
+use crate::api_controller::APIController;
+use crate::submission::{RateLimiter, RetryPolicy, SubmitOptions};
+
+pub const DELTA_PATH: &str = "/v1.0/me/calendarView/delta";
+
+/// Sincronização incremental da agenda (calendarView/delta do Graph).
+///
+/// Sem `--delta-link` faz a carga completa da janela `--start`/`--end`; com ele,
+/// busca só o que mudou desde a última sincronização. As páginas são lidas uma
+/// a uma e cada item sai no stdout como uma linha NDJSON:
+///
+///   {"op": "upsert", "id", "change_key", "subject", "descr", "date_start", "date_end", "timezone", "location"}
+///   {"op": "delete", "id"}
+///   {"op": "reset"}                 deltaLink expirou (410); a carga completa recomeça
+///   {"op": "delta", "link": "..."}  última linha: deltaLink para a próxima execução
+#[derive(Args, Debug)]
+pub struct SyncService {
+    /// Início da janela (RFC3339), usado na carga completa
+    #[arg(long)]
+    start: Option<String>,
+
+    /// Fim da janela (RFC3339), usado na carga completa
+    #[arg(long)]
+    end: Option<String>,
+
+    /// deltaLink salvo da última sincronização
+    #[arg(long)]
+    delta_link: Option<String>,
+
+    /// Eventos por página (Prefer: odata.maxpagesize)
+    #[arg(long, default_value_t = 100)]
+    page_size: u32,
+
+    #[command(flatten)]
+    submit: SubmitOptions,
+}
+
+impl SyncService {
+    pub async fn run(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let client = APIController::pooled_client();
+        let limiter = RateLimiter::new(self.submit.rate, self.submit.burst);
+        let policy = RetryPolicy::new(self.submit.max_retries);
+
+        let page_size = format!("odata.maxpagesize={}", self.page_size);
+        let headers = [("Prefer", page_size.as_str()), ("Prefer", "outlook.timezone=\"UTC\"")];
+
+        let mut url = match &self.delta_link {
+            Some(link) => link.clone(),
+            None => self.initial_url()?,
+        };
+        let mut restarted = false;
+
+        loop {
+            let outcome = APIController::fetch(&client, token, &url, &headers, &limiter, &policy).await;
+
+            if outcome.status == Some(410) && self.delta_link.is_some() && !restarted {
+                // Estado de sincronização expirado no Graph: descarta o deltaLink e recomeça
+                restarted = true;
+                url = self.initial_url()?;
+                SyncService::emit(&[json!({ "op": "reset" })])?;
+                continue;
+            }
+            if let Some(error) = outcome.error {
+                return Err(error.into());
+            }
+
+            let page: Value = serde_json::from_str(&outcome.body)
+                .map_err(|e| format!("Resposta inválida do Graph: {}", e))?;
+            let lines: Vec<Value> = page["value"].as_array()
+                .map(|items| items.iter().map(SyncService::change_line).collect())
+                .unwrap_or_default();
+            SyncService::emit(&lines)?;
+
+            if let Some(next) = page["@odata.nextLink"].as_str() {
+                url = next.to_string();
+            } else if let Some(delta) = page["@odata.deltaLink"].as_str() {
+                SyncService::emit(&[json!({ "op": "delta", "link": delta })])?;
+                return Ok(());
+            } else {
+                return Err("Resposta do Graph sem @odata.nextLink nem @odata.deltaLink".into());
+            }
+        }
+    }
+
+    /// URL da carga completa da janela
+    fn initial_url(&self) -> Result<String, String> {
+        let (Some(start), Some(end)) = (&self.start, &self.end) else {
+            return Err("Informe --start e --end (ou --delta-link)".into());
+        };
+        Url::parse_with_params(&APIController::endpoint(DELTA_PATH), &[("startDateTime", start), ("endDateTime", end)])
+            .map(String::from)
+            .map_err(|e| format!("URL inválida: {}", e))
+    }
+
+    /// Converte um item da página de delta numa linha de saída
+    fn change_line(item: &Value) -> Value {
+        if item.get("@removed").is_some() {
+            return json!({ "op": "delete", "id": item["id"] });
+        }
+        json!({
+            "op": "upsert",
+            "id": item["id"],
+            "change_key": item["changeKey"],
+            "subject": item["subject"].as_str().unwrap_or(""),
+            "descr": item["body"]["content"].as_str().unwrap_or(""),
+            "date_start": SyncService::graph_datetime(&item["start"]),
+            "date_end": SyncService::graph_datetime(&item["end"]),
+            "timezone": item["originalStartTimeZone"].as_str().or(item["start"]["timeZone"].as_str()).unwrap_or(""),
+            "location": item["location"]["displayName"].as_str().unwrap_or(""),
+        })
+    }
+
+    /// dateTimeTimeZone do Graph (UTC, sem offset) → RFC3339
+    pub fn graph_datetime(value: &Value) -> Option<String> {
+        let raw = value["dateTime"].as_str()?;
+        if let Ok(datetime) = DateTime::parse_from_rfc3339(raw) {
+            return Some(datetime.to_rfc3339());
+        }
+        NaiveDateTime::parse_from_str(raw, "%Y-%m-%dT%H:%M:%S%.f").ok()
+            .map(|datetime| datetime.and_utc().to_rfc3339())
+    }
+
+    /// Escreve as linhas de uma página de uma vez
+    fn emit(lines: &[Value]) -> std::io::Result<()> {
+        let mut out = std::io::stdout().lock();
+        for line in lines {
+            writeln!(out, "{}", line)?;
+        }
+        out.flush()
+    }
+}
@@ -0,0 +1,119 @@
+use std::sync::Arc;
+use clap::Args;
+use reqwest::Client;
+use serde::Deserialize;
+use serde_json::{json, Value};
+use tokio::io::{AsyncBufReadExt, BufReader};
+use crate::api_controller::APIController;
+use crate::services::calendar_service::CalendarService;
+use crate::services::stdout_writer;
+use crate::submission::{RateLimiter, RetryPolicy, SubmitOptions};
+use crate::trace::{self, Span};
+
+/// Requisição do protocolo do worker (uma linha JSON no stdin)
+#[derive(Deserialize)]
+struct WorkerRequest {
+    id: Value,
+    method: String,
+    #[serde(default)]
+    params: Value,
+    /// Token só para esta requisição (o cliente renova o token sem reiniciar o worker)
+    #[serde(default)]
+    token: Option<String>,
+}
+
+/// Worker persistente: lê requisições JSON por linha no stdin e responde no stdout.
+///
+/// Requisição: {"id": 1, "method": "create" | "validate" | "ping", "params": {...}}
+/// Resposta:   {"id": 1, "ok": true, "result": ...} ou {"id": 1, "ok": false, "error": "...", "details": ...}
+///
+/// Em `create`, `result`/`details` trazem {"status", "attempts", "permanent", "id"}.
+/// Um campo opcional "token" na requisição substitui o token de inicialização.
+///
+/// Cada requisição roda em sua própria tarefa, então as respostas podem sair fora de ordem;
+/// o cliente casa cada resposta pelo `id`.
+#[derive(Args, Debug)]
+pub struct WorkerService {
+    #[command(flatten)]
+    submit: SubmitOptions,
+}
+
+/// Mensagem de erro e detalhes estruturados opcionais
+type WorkerError = (String, Option<Value>);
+
+impl WorkerService {
+    pub async fn run(&self, token: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let client = APIController::pooled_client();
+        let token: Arc<str> = Arc::from(token);
+        let limiter = Arc::new(RateLimiter::new(self.submit.rate, self.submit.burst));
+        let policy = Arc::new(RetryPolicy::new(self.submit.max_retries));
+        let (tx, writer) = stdout_writer::spawn();
+
+        let mut lines = BufReader::new(tokio::io::stdin()).lines();
+
+        while let Some(line) = lines.next_line().await? {
+            if line.trim().is_empty() {
+                continue;
+            }
+
+            let parse = Span::start("parse");
+            let parsed: Result<WorkerRequest, _> = serde_json::from_str(&line);
+            let request: WorkerRequest = match parsed {
+                Ok(request) => {
+                    parse.with("event", request.id.clone()).end();
+                    request
+                }
+                Err(e) => {
+                    let _ = tx.send(WorkerService::response_line(Value::Null, Err((format!("Requisição inválida: {}", e), None))));
+                    continue;
+                }
+            };
+
+            let client = client.clone();
+            let token = request.token.as_deref().map(Arc::from).unwrap_or_else(|| token.clone());
+            let limiter = limiter.clone();
+            let policy = policy.clone();
+            let tx = tx.clone();
+
+            tokio::spawn(trace::EVENT.scope(request.id.clone(), async move {
+                let result = WorkerService::handle(&client, &token, &limiter, &policy, &request.method, request.params).await;
+                let _ = tx.send(WorkerService::response_line(request.id, result));
+            }));
+        }
+
+        // stdin fechado: espera as respostas pendentes antes de sair
+        drop(tx);
+        let _ = writer.await;
+
+        Ok(())
+    }
+
+    async fn handle(client: &Client, token: &str, limiter: &RateLimiter, policy: &RetryPolicy,
+                    method: &str, params: Value) -> Result<Value, WorkerError> {
+        match method {
+            "ping" => Ok(json!("pong")),
+            "validate" => {
+                let event: CalendarService = serde_json::from_value(params).map_err(|e| (e.to_string(), None))?;
+                event.build_body().map_err(|e| (e, None))
+            }
+            "create" => {
+                let event: CalendarService = serde_json::from_value(params).map_err(|e| (e.to_string(), None))?;
+                let outcome = event.add_event_with(client, token, limiter, policy).await;
+                let mut details = outcome.to_json();
+                match details["error"].take().as_str() {
+                    None => Ok(details),
+                    Some(error) => Err((error.to_string(), Some(details))),
+                }
+            }
+            other => Err((format!("Método desconhecido: {}", other), None)),
+        }
+    }
+
+    fn response_line(id: Value, result: Result<Value, WorkerError>) -> String {
+        let value = match result {
+            Ok(result) => json!({ "id": id, "ok": true, "result": result }),
+            Err((error, details)) => json!({ "id": id, "ok": false, "error": error, "details": details }),
+        };
+        format!("{}\n", value)
+    }
+}
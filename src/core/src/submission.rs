@@ -0,0 +1,190 @@
+use std::collections::hash_map::RandomState;
+use std::hash::{BuildHasher, Hasher};
+use std::sync::Mutex;
+use std::time::{Duration, Instant, SystemTime, UNIX_EPOCH};
+use clap::Args;
+use reqwest::StatusCode;
+use serde_json::{json, Value};
+
+/// Opções de envio compartilhadas pelos subcomandos que criam vários eventos
+#[derive(Args, Debug, Clone)]
+pub struct SubmitOptions {
+    /// Requisições por segundo permitidas (token bucket)
+    #[arg(long, default_value_t = 15.0)]
+    pub rate: f64,
+
+    /// Rajada máxima acima da taxa
+    #[arg(long, default_value_t = 15)]
+    pub burst: u32,
+
+    /// Tentativas extras para falhas transitórias (429, 5xx, rede)
+    #[arg(long, default_value_t = 5)]
+    pub max_retries: u32,
+}
+
+impl Default for SubmitOptions {
+    fn default() -> Self {
+        SubmitOptions { rate: 15.0, burst: 15, max_retries: 5 }
+    }
+}
+
+/// Resultado do envio de um evento, já com as tentativas feitas
+#[derive(Debug)]
+pub struct SubmitOutcome {
+    pub status: Option<u16>,
+    pub attempts: u32,
+    pub error: Option<String>,
+    /// true quando repetir não adianta (ex: 400, 401, 403, evento inválido)
+    pub permanent: bool,
+    pub body: String,
+    /// Respostas 429 recebidas antes do resultado final
+    pub throttled: u32,
+}
+
+impl SubmitOutcome {
+    pub fn is_ok(&self) -> bool {
+        self.error.is_none()
+    }
+
+    pub fn invalid(error: String) -> SubmitOutcome {
+        SubmitOutcome { status: None, attempts: 0, error: Some(error), permanent: true, body: String::new(), throttled: 0 }
+    }
+
+    /// Id do evento criado, lido do corpo da resposta do Graph
+    pub fn event_id(&self) -> Option<String> {
+        if !self.is_ok() {
+            return None;
+        }
+        let body: Value = serde_json::from_str(&self.body).ok()?;
+        body["id"].as_str().map(str::to_string)
+    }
+
+    /// Campos do resultado para as linhas NDJSON do core
+    pub fn to_json(&self) -> Value {
+        json!({
+            "ok": self.is_ok(),
+            "status": self.status,
+            "attempts": self.attempts,
+            "throttled": self.throttled,
+            "permanent": self.permanent,
+            "error": self.error,
+            "id": self.event_id(),
+        })
+    }
+}
+
+struct BucketState {
+    tokens: f64,
+    last_refill: Instant,
+    blocked_until: Instant,
+}
+
+/// Token bucket compartilhado entre as tarefas de envio.
+/// Um 429 com Retry-After pausa o bucket inteiro, não só a requisição que o recebeu.
+pub struct RateLimiter {
+    rate: f64,
+    burst: f64,
+    state: Mutex<BucketState>,
+}
+
+impl RateLimiter {
+    pub fn new(rate: f64, burst: u32) -> RateLimiter {
+        let now = Instant::now();
+        let burst = burst.max(1) as f64;
+        RateLimiter {
+            rate: rate.max(0.001),
+            burst,
+            state: Mutex::new(BucketState { tokens: burst, last_refill: now, blocked_until: now }),
+        }
+    }
+
+    /// Espera até haver um token disponível e o consome
+    pub async fn acquire(&self) {
+        self.acquire_n(1).await
+    }
+
+    /// Espera e consome `n` tokens de uma vez (um por sub-requisição de um /$batch).
+    ///
+    /// Com `n` acima do burst, espera o balde encher e fica devendo a diferença: os
+    /// próximos envios esperam a dívida ser paga, então a taxa média continua `rate`.
+    pub async fn acquire_n(&self, n: usize) {
+        let cost = n.max(1) as f64;
+        let needed = cost.min(self.burst);
+        loop {
+            let wait = {
+                let mut state = self.state.lock().unwrap();
+                let now = Instant::now();
+                if state.blocked_until > now {
+                    state.blocked_until - now
+                } else {
+                    let elapsed = now.duration_since(state.last_refill).as_secs_f64();
+                    state.tokens = (state.tokens + elapsed * self.rate).min(self.burst);
+                    state.last_refill = now;
+                    if state.tokens >= needed {
+                        state.tokens -= cost;
+                        return;
+                    }
+                    Duration::from_secs_f64((needed - state.tokens) / self.rate)
+                }
+            };
+            tokio::time::sleep(wait).await;
+        }
+    }
+
+    /// Pausa todos os envios por `delay` (throttling do Graph)
+    pub fn pause(&self, delay: Duration) {
+        let mut state = self.state.lock().unwrap();
+        let until = Instant::now() + delay;
+        if until > state.blocked_until {
+            state.blocked_until = until;
+            state.tokens = 0.0;
+        }
+    }
+}
+
+/// transactionId novo (UUID v4) para eventos enviados sem um.
+///
+/// O Graph deduplica POSTs pelo transactionId: um timeout depois de o evento ter sido
+/// criado pode ser repetido sem duplicar o evento.
+pub fn new_transaction_id() -> String {
+    let random = || {
+        let mut hasher = RandomState::new().build_hasher();
+        hasher.write_u128(SystemTime::now().duration_since(UNIX_EPOCH).unwrap_or_default().as_nanos());
+        hasher.finish()
+    };
+    let high = (random() & 0xffff_ffff_ffff_0fff) | 0x4000;
+    let low = (random() & 0x3fff_ffff_ffff_ffff) | 0x8000_0000_0000_0000;
+    format!("{:08x}-{:04x}-{:04x}-{:04x}-{:012x}",
+            high >> 32, (high >> 16) & 0xffff, high & 0xffff, low >> 48, low & 0xffff_ffff_ffff)
+}
+
+/// Backoff exponencial com jitter total
+pub struct RetryPolicy {
+    pub max_retries: u32,
+    pub base_delay: Duration,
+    pub max_delay: Duration,
+}
+
+impl RetryPolicy {
+    pub fn new(max_retries: u32) -> RetryPolicy {
+        RetryPolicy { max_retries, base_delay: Duration::from_millis(500), max_delay: Duration::from_secs(30) }
+    }
+
+    /// Atraso aleatório em [0, min(max_delay, base * 2^attempt)]
+    pub fn backoff(&self, attempt: u32) -> Duration {
+        let ceiling = self.base_delay.saturating_mul(1u32 << attempt.min(16)).min(self.max_delay);
+        let fraction = (RandomState::new().build_hasher().finish() % 10_000) as f64 / 10_000.0;
+        ceiling.mul_f64(fraction)
+    }
+
+    pub fn is_transient(status: StatusCode) -> bool {
+        matches!(status.as_u16(), 408 | 429 | 500 | 502 | 503 | 504)
+    }
+
+    /// Falhas de rede que vale repetir: timeout e conexão sempre; corpo cortado ou ilegível
+    /// só em leituras idempotentes. Erros ao montar a requisição (URL ou cabeçalho inválido)
+    /// e os demais erros de envio são permanentes.
+    pub fn is_transient_error(error: &reqwest::Error, idempotent: bool) -> bool {
+        error.is_timeout() || error.is_connect() || (idempotent && (error.is_body() || error.is_decode()))
+    }
+}
@@ -0,0 +1,57 @@
+use std::sync::OnceLock;
+use std::time::{Instant, SystemTime, UNIX_EPOCH};
+use serde_json::{json, Map, Value};
+
+static ENABLED: OnceLock<bool> = OnceLock::new();
+
+tokio::task_local! {
+    /// Evento ao qual os spans da tarefa pertencem (índice no batch, id da requisição no worker)
+    pub static EVENT: Value;
+}
+
+/// Spans ligados com OUTLOOK_TRACE=1 (saem como uma linha JSON por span no stderr)
+pub fn enabled() -> bool {
+    *ENABLED.get_or_init(|| std::env::var("OUTLOOK_TRACE").is_ok_and(|v| !v.is_empty() && v != "0"))
+}
+
+/// Intervalo de tempo de uma fase. Emitido no `end`:
+/// {"span": "request", "ts_us": <epoch µs do início>, "dur_us": ..., "pid": ..., "event": ..., ...campos}
+pub struct Span {
+    name: &'static str,
+    started_at: u128,
+    started: Instant,
+    fields: Map<String, Value>,
+}
+
+impl Span {
+    pub fn start(name: &'static str) -> Span {
+        let started_at = if enabled() {
+            SystemTime::now().duration_since(UNIX_EPOCH).map(|d| d.as_micros()).unwrap_or_default()
+        } else {
+            0
+        };
+        Span { name, started_at, started: Instant::now(), fields: Map::new() }
+    }
+
+    /// Campo extra do span (ex: attempt, status)
+    pub fn with(mut self, key: &str, value: impl Into<Value>) -> Span {
+        if enabled() {
+            self.fields.insert(key.to_string(), value.into());
+        }
+        self
+    }
+
+    pub fn end(mut self) {
+        if !enabled() {
+            return;
+        }
+        self.fields.insert("span".into(), json!(self.name));
+        self.fields.insert("ts_us".into(), json!(self.started_at as u64));
+        self.fields.insert("dur_us".into(), json!(self.started.elapsed().as_micros() as u64));
+        self.fields.insert("pid".into(), json!(std::process::id()));
+        if let Ok(event) = EVENT.try_with(Value::clone) {
+            self.fields.entry("event").or_insert(event);
+        }
+        eprintln!("{}", Value::Object(self.fields));
+    }
+}